@@ -0,0 +1,271 @@
+"""
+Batch cube solver.
+
+Reads puzzles from a directory of JSON files, in the format
+`cube.Cube(input_file=...)` parses, or from a JSONL stream with one such
+object per line (an optional "id" field names the puzzle), and solves them on
+a process pool. Solutions are written as JSONL in completion order, one line
+per puzzle with its stats.
+
+Puzzles are grouped by goal into chunks, each submitted as soon as it fills.
+Each goal's heuristic is set up once: pattern databases are built by the
+parent under `--pdb-dir` and memory-mapped by the workers, so their pages
+are shared between processes, and every worker keeps the heuristics it has
+loaded for later chunks. Goals whose pattern databases would be too large
+fall back to misplaced tiles. Identical puzzles are solved once, while their
+result is among the --cache-size most recent, and a puzzle that fails is
+reported with an "error" without stopping the batch.
+
+    python batch_solve.py puzzles/ --workers 8 -o solutions.jsonl
+    cat puzzles.jsonl | python batch_solve.py - --heuristic misplaced
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import multiprocessing as mp
+
+from ast import literal_eval
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Tuple
+
+import cube
+import ps1
+import utils
+import pattern_db
+import bounded_search
+
+SOLVERS = {
+    "astar": ps1.astar_search,
+    "ida": bounded_search.ida_star_search,
+}
+
+# heuristics loaded by this process, by goal
+_heuristics = {}
+
+
+def _parse_state(data) -> cube.State:
+    if isinstance(data, str):
+        data = literal_eval(data)
+    return cube.State(data['shape'], data['layout'])
+
+
+def read_puzzles(source: str) -> Iterator[Tuple[str, cube.State, cube.State]]:
+    r"""
+    Yields (puzzle id, initial, goal) from a directory of puzzle JSON files,
+    a JSONL file, or standard input if source is "-".
+    """
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            if name.endswith(".json"):
+                with open(os.path.join(source, name), 'r') as f:
+                    data = json.load(f)
+                yield name, _parse_state(data['initial']), _parse_state(data['goal'])
+        return
+    stream = sys.stdin if source == "-" else open(source, 'r')
+    try:
+        for line_no, line in enumerate(stream, 1):
+            if line.strip():
+                data = json.loads(line)
+                yield str(data.get('id', line_no)), _parse_state(data['initial']), \
+                    _parse_state(data['goal'])
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def goal_key(goal: cube.State) -> str:
+    r"""Stable name of a goal, used for its pattern database directory"""
+    return hashlib.sha1(repr(goal).encode()).hexdigest()[:16]
+
+
+def _heuristic_for(goal: cube.State, heuristic: str, pdb_dir: str):
+    key = (goal, heuristic)
+    if key not in _heuristics:
+        if heuristic == "pdb":
+            databases = pattern_db.build_databases(
+                goal, pattern_db.disjoint_patterns(goal, 2),
+                os.path.join(pdb_dir, goal_key(goal)))
+            _heuristics[key] = pattern_db.PatternDatabaseHeuristic(databases)
+        else:
+            _heuristics[key] = ps1.heuristic_func
+    return _heuristics[key]
+
+
+def _prepare_goal(goal: cube.State, heuristic: str, pdb_dir: str) -> str:
+    # builds the pattern databases of a goal before the workers map them,
+    # falling back to misplaced tiles on boards too large to pack
+    if heuristic != "pdb":
+        return heuristic
+    try:
+        _heuristic_for(goal, heuristic, pdb_dir)
+    except ValueError as e:
+        print(f"goal {goal_key(goal)}: {e}, using misplaced tiles", file=sys.stderr)
+        return "misplaced"
+    return heuristic
+
+
+def _error(heuristic: str, error: BaseException, expanded: int = 0,
+        wall_time: float = 0.0) -> Dict:
+    # the result of a puzzle that could not be solved
+    return {"solution": None, "cost": None, "expanded": expanded,
+            "heuristic": heuristic, "wall_time": wall_time,
+            "error": f"{type(error).__name__}: {error}"}
+
+
+def _check_puzzle(initial: cube.State, goal: cube.State):
+    # moves only permute tiles, so other shapes or colours never reach the
+    # goal, and a search would run until it exhausts memory
+    if tuple(initial.shape) != tuple(goal.shape):
+        raise ValueError(f"initial shape {list(initial.shape)} is not the goal's "
+                         f"{list(goal.shape)}")
+    if Counter(initial.layout) != Counter(goal.layout):
+        raise ValueError("initial and goal do not have the same tiles")
+
+
+def _solve_chunk(goal: cube.State, initials: List[cube.State], heuristic: str,
+        solver: str, pdb_dir: str) -> List[Dict]:
+    try:
+        h = _heuristic_for(goal, heuristic, pdb_dir)
+    except Exception as e:
+        return [_error(heuristic, e)] * len(initials)
+    results = []
+    for initial in initials:
+        stats = utils.SearchStats()
+        start = time.time()
+        try:
+            _check_puzzle(initial, goal)
+            problem = cube.Cube(initial=initial, goal=goal)
+            solution = SOLVERS[solver](problem, heuristic=h, stats=stats)
+        except Exception as e:
+            # one bad puzzle must not take the rest of the stream with it
+            results.append(_error(heuristic, e, stats.expanded, time.time() - start))
+            continue
+        results.append({"solution": solution,
+                        "cost": len(solution) if solution is not False else None,
+                        "expanded": stats.expanded,
+                        "heuristic": heuristic,
+                        "wall_time": time.time() - start})
+    return results
+
+
+def solve_batch(puzzles, workers: int = 0, heuristic: str = "pdb",
+        solver: str = "astar", pdb_dir: str = "pdb", chunksize: int = 8,
+        cache_size: int = 100000):
+    r"""
+    Solves puzzles on a process pool, yielding results in completion order.
+    Puzzles are read as they are needed: a chunk is submitted as soon as it
+    fills, and finished chunks are yielded while the rest is still read, so
+    that stdin and JSONL input stream.
+
+    Args:
+        puzzles (Iterable[Tuple[str, cube.State, cube.State]]): (id,
+            initial, goal) triples, e.g. from read_puzzles
+        workers (int): the number of worker processes, all cores if 0
+        heuristic (str): "pdb" (pattern databases) or "misplaced"
+            (ps1.heuristic_func); goals whose pattern databases would be
+            too large (see pattern_db.MAX_STATES) fall back to misplaced
+        solver (str): a key of SOLVERS
+        pdb_dir (str): where pattern databases are stored, per goal
+        chunksize (int): puzzles with the same goal sent to a worker at once
+        cache_size (int): the number of most recently solved puzzles whose
+            results are kept for their duplicates
+
+    Yields:
+        a dict per puzzle with its id, solution, cost, nodes expanded,
+        heuristic used and solve time; duplicates of a solved puzzle are
+        marked "cached". A puzzle that failed has a None solution and an
+        "error" instead, and the rest of the batch carries on.
+    """
+    # goal -> heuristic actually used
+    heuristics = {}
+    # goal -> initials of the chunk being filled
+    filling = {}
+    # (goal, initial) -> ids waiting on its chunk, or its result once
+    # solved, for the cache_size most recently used puzzles
+    waiting = {}
+    solved = OrderedDict()
+    futures = {}
+
+    def finished(future):
+        keys = futures.pop(future)
+        try:
+            results = future.result()
+        except Exception as e:
+            # the worker itself failed: every puzzle of the chunk did
+            results = [_error(heuristics[key[0]], e) for key in keys]
+        for key, result in zip(keys, results):
+            if "error" not in result:
+                solved[key] = result
+                if len(solved) > cache_size:
+                    solved.popitem(last=False)
+            for n, puzzle_id in enumerate(waiting.pop(key)):
+                yield {"id": puzzle_id, **result, "cached": n > 0}
+
+    with ProcessPoolExecutor(max_workers=workers or mp.cpu_count()) as pool:
+        def submit(goal):
+            chunk = filling.pop(goal)
+            future = pool.submit(_solve_chunk, goal, chunk, heuristics[goal], solver, pdb_dir)
+            futures[future] = [(goal, initial) for initial in chunk]
+
+        for puzzle_id, initial, goal in puzzles:
+            key = (goal, initial)
+            if key in solved:
+                solved.move_to_end(key)
+                yield {"id": puzzle_id, **solved[key], "cached": True}
+                continue
+            if key in waiting:
+                waiting[key].append(puzzle_id)
+                continue
+            if goal not in heuristics:
+                heuristics[goal] = _prepare_goal(goal, heuristic, pdb_dir)
+            waiting[key] = [puzzle_id]
+            filling.setdefault(goal, []).append(initial)
+            if len(filling[goal]) >= chunksize:
+                submit(goal)
+            for future in [f for f in futures if f.done()]:
+                yield from finished(future)
+        for goal in list(filling):
+            submit(goal)
+        for future in as_completed(list(futures)):
+            yield from finished(future)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("source", help="directory of puzzle JSON files, JSONL file, or -")
+    parser.add_argument("-o", "--output", help="JSONL file of solutions, stdout by default")
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--heuristic", choices=["pdb", "misplaced"], default="pdb")
+    parser.add_argument("--solver", choices=sorted(SOLVERS), default="astar")
+    parser.add_argument("--pdb-dir", default="pdb")
+    parser.add_argument("--chunksize", type=int, default=8)
+    parser.add_argument("--cache-size", type=int, default=100000,
+                        help="solved puzzles remembered for their duplicates")
+    args = parser.parse_args(argv)
+
+    out = open(args.output, 'w') if args.output else sys.stdout
+    start = time.time()
+    n_solved = n_failed = 0
+    try:
+        for result in solve_batch(read_puzzles(args.source), args.workers,
+                                  args.heuristic, args.solver, args.pdb_dir,
+                                  args.chunksize, args.cache_size):
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            n_solved += 1
+            n_failed += "error" in result
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.time() - start
+    print(f"{n_solved} puzzles in {elapsed:.3f}s "
+          f"({n_solved / elapsed if elapsed else 0:.1f} puzzles/sec), {n_failed} failed",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark of bidirectional search against ps1.astar_search on random
+scrambles of depth 6-12 (the scramble length; the optimal solution can be
+shorter). Plain A* is skipped above `astar_max_depth` scramble moves, where it
+takes minutes per board.
+
+    python bench_bidirectional.py [n_per_depth] [max_depth] [astar_max_depth]
+"""
+import sys
+import time
+import random
+
+import cube
+import ps1
+import utils
+from bench_heuristics import CountingCube, scramble
+from bidirectional import bidirectional_search
+
+
+def main(n_per_depth, max_depth, astar_max_depth):
+    rng = random.Random(2109)
+    goal = cube.State([3, 4], [0, 0, 1, 1, 2, 2, 3, 3, 4, 4, 5, 5])
+    print(f"{'depth':>5} {'solver':<12} {'expanded':>9} {'cost':>5} {'seconds':>9}")
+    for depth in range(6, max_depth + 1, 2):
+        for _ in range(n_per_depth):
+            initial = scramble(goal, depth, rng)
+            costs = set()
+
+            for mode in ["bfs", "astar"]:
+                problem = cube.Cube(initial=initial, goal=goal)
+                stats = utils.SearchStats()
+                solution = bidirectional_search(problem, mode=mode, stats=stats)
+                correct, cost = problem.verify_solution(solution)
+                assert correct, f"bidirectional {mode} failed on {initial!r}"
+                costs.add(cost)
+                print(f"{depth:>5} {'bidir-' + mode:<12} {stats.expanded:>9d} "
+                      f"{cost:>5} {stats.wall_time:>9.3f}")
+
+            if depth <= astar_max_depth:
+                problem = CountingCube(initial=initial, goal=goal)
+                start = time.time()
+                solution = ps1.astar_search(problem)
+                costs.add(len(solution))
+                print(f"{depth:>5} {'astar':<12} {problem.expanded:>9d} "
+                      f"{len(solution):>5} {time.time() - start:>9.3f}")
+            assert len(costs) == 1, f"solvers disagree on the optimal cost of {initial!r}"
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*(args + [2, 12, 7][len(args):]))
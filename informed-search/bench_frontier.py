@@ -0,0 +1,128 @@
+"""
+Frontier benchmark: operations per second of utils.PriorityQueue against the
+previous scan-based implementation, on an A*-like workload of pushes,
+membership tests, priority updates and pops. The pop order of
+compact_search.SpillingFrontier over several spilled runs is first checked
+against heapq.
+
+    python bench_frontier.py [sizes...]
+"""
+import sys
+import time
+import heapq
+import random
+import tempfile
+
+import utils
+import compact_search
+
+
+class ScanPriorityQueue:
+    r"""The original utils.PriorityQueue, kept as the benchmark baseline.
+    Membership, lookup and deletion scan the heap, and deletion re-heapifies.
+    """
+    def __init__(self):
+        self.heap = []
+
+    def __contains__(self, node):
+        return any([item == node for _, item in self.heap])
+
+    def __delitem__(self, node):
+        try:
+            del self.heap[[item==node for _,item in self.heap].index(True)]
+        except ValueError:
+            raise KeyError(str(node)+"is not in the queue")
+        heapq.heapify(self.heap)
+
+    def __getitem__(self, node):
+        for value, item in self.heap:
+            if item == node:
+                return value
+        raise KeyError(str(node)+"is not in the queue")
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, priority, node):
+        heapq.heappush(self.heap, (priority, node))
+
+    def pop(self):
+        if self.heap:
+            return heapq.heappop(self.heap)[1]
+        else:
+            raise Exception("Empty Priority Queue")
+
+    def update(self, priority, node):
+        self.__delitem__(node)
+        self.push(priority, node)
+
+    def get_priority(self, node):
+        return self.__getitem__(node)
+
+
+def frontier_workload(queue_cls, size: int, seed: int = 2109):
+    r"""
+    Runs `size` rounds of push / contains / update / pop on a queue.
+
+    Args:
+        queue_cls: the priority queue class to benchmark
+        size (int): number of nodes pushed
+        seed (int): random seed of the workload
+
+    Returns:
+        (n_ops, seconds)
+    """
+    rng = random.Random(seed)
+    nodes = [utils.Node(None, None, i, rng.randint(0, 50)) for i in range(size)]
+    queue = queue_cls()
+    n_ops = 0
+
+    start = time.time()
+    for node in nodes:
+        queue.push(node.g_n, node)
+        n_ops += 1
+    for node in rng.sample(nodes, size // 2):
+        if node in queue:
+            queue.update(queue[node] - 1, node)
+            n_ops += 3
+    while len(queue):
+        queue.pop()
+        n_ops += 1
+    return n_ops, time.time() - start
+
+
+def check_spilling(size: int = 400, max_in_memory: int = 4, seed: int = 2109):
+    r"""
+    Asserts that a SpillingFrontier small enough to spill many runs pops
+    the same entries as heapq, with pops interleaved with the pushes.
+    """
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as directory:
+        frontier = compact_search.SpillingFrontier(
+            compact_search.Arena(0, directory), max_in_memory)
+        reference = []
+        for row in range(size):
+            f = float(rng.randint(0, 20))
+            frontier.push(f, row)
+            heapq.heappush(reference, (f, row))
+            if rng.random() < 0.3:
+                assert frontier.pop() == heapq.heappop(reference)
+        while reference:
+            assert frontier.pop() == heapq.heappop(reference)
+        assert len(frontier) == 0
+
+
+def main(sizes):
+    check_spilling()
+    print(f"{'size':>8} {'scan ops/s':>14} {'indexed ops/s':>14} {'speedup':>8}")
+    for size in sizes:
+        scan_ops, scan_time = frontier_workload(ScanPriorityQueue, size)
+        idx_ops, idx_time = frontier_workload(utils.PriorityQueue, size)
+        scan_rate = scan_ops / scan_time
+        idx_rate = idx_ops / idx_time
+        print(f"{size:>8d} {scan_rate:>14.0f} {idx_rate:>14.0f} "
+              f"{idx_rate / scan_rate:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(s) for s in sys.argv[1:]] or [500, 2000, 8000])
@@ -0,0 +1,63 @@
+"""
+Scaling benchmark of breadth first graph search on growing missionaries and
+cannibals instances: search_engine.breadth_first_graph_search against the
+original bfs_graph_search, which scanned the explored set for every
+successor.
+
+    python bench_graph_search.py [sizes...]
+"""
+import sys
+import time
+
+import utils
+import search_engine
+
+
+def scan_bfs_graph_search(num_mis, num_can):
+    r"""The original comparison.bfs_graph_search, kept as the baseline: a
+    heap keyed by g as the frontier, and a linear scan of the explored
+    nodes for every successor."""
+    problem = search_engine.MissionariesCannibals(num_mis, num_can)
+    start_node = utils.Node(None, None, problem.initial, 0, 0)
+    frontier = utils.PriorityQueue()
+    frontier.push(start_node.g_n, start_node)
+    visited = set()
+    visited.add(start_node)
+    while len(frontier) != 0:
+        curr_node = frontier.pop()
+        if problem.goal_test(curr_node.state):
+            return search_engine.solution(curr_node)
+        for action in problem.actions(curr_node.state):
+            next_state = problem.result(curr_node.state, action)
+            next_visited = False
+            for visited_node in visited:
+                if next_state == visited_node.state:
+                    next_visited = True
+                    break
+            if next_visited:
+                continue
+            next_node = utils.Node(curr_node, action, next_state, curr_node.g_n + 1, 0)
+            frontier.push(next_node.g_n, next_node)
+        visited.add(curr_node)
+    return False
+
+
+def main(sizes):
+    print(f"{'(m, c)':>10} {'states':>7} {'cost':>5} {'scan s':>9} {'indexed s':>10} {'speedup':>8}")
+    for m in sizes:
+        c = m - 1
+        start = time.time()
+        old = scan_bfs_graph_search(m, c)
+        scan_time = time.time() - start
+        start = time.time()
+        new = search_engine.breadth_first_graph_search(search_engine.MissionariesCannibals(m, c))
+        indexed_time = time.time() - start
+        assert (old is False) == (new is False) and (new is False or len(old) == len(new))
+        n_states = 2 * (m + 1) * (c + 1)
+        cost = len(new) if new is not False else "-"
+        print(f"{str((m, c)):>10} {n_states:>7d} {cost!s:>5} {scan_time:>9.4f} "
+              f"{indexed_time:>10.4f} {scan_time / indexed_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(s) for s in sys.argv[1:]] or [8, 32, 128, 512])
@@ -0,0 +1,108 @@
+"""
+Node-expansion benchmark of the A* heuristics: ps1.heuristic_func against
+pattern databases (max and additive rules), on the cube1-cube4 fixtures and
+on randomly scrambled boards. The additive rule is not admissible, so its
+costs may exceed the optimum; it is listed for its expansion counts only.
+
+    python bench_heuristics.py [n_scrambles] [depth]
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+
+import cube
+import ps1
+import utils
+import pattern_db
+import incremental
+
+
+class CountingCube(cube.Cube):
+    r"""Cube that counts the states it expands"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.expanded = 0
+
+    def expand(self, state):
+        self.expanded += 1
+        return super().expand(state)
+
+
+def scramble(goal: cube.State, depth: int, rng: random.Random) -> cube.State:
+    r"""Apply `depth` random moves to the goal, never undoing the last one"""
+    problem = cube.Cube(initial=goal, goal=goal)
+    state = goal
+    undo = None
+    for _ in range(depth):
+        action = rng.choice([a for a in problem.actions(state) if a != undo])
+        state = problem.result(state, action)
+        undo = [action[0], {"left": "right", "right": "left",
+                            "up": "down", "down": "up"}[action[1]]]
+    return state
+
+
+def check_incremental(goal: cube.State, steps: int, rng: random.Random):
+    r"""Assert that the incremental heuristic_func equals the full one at
+    every state of a random walk of `steps` moves, carried parent to child"""
+    problem = cube.Cube(initial=goal, goal=goal)
+    child_h = incremental.evaluator(problem, ps1.heuristic_func)
+    state, h = goal, ps1.heuristic_func(problem, goal)
+    for step in range(steps):
+        action = rng.choice(problem.actions(state))
+        child = problem.result(state, action)
+        h = child_h(state, h, action, child)
+        assert h == ps1.heuristic_func(problem, child), \
+            f"{goal.shape} step {step}: {h} != {ps1.heuristic_func(problem, child)}"
+        state = child
+
+
+def run(name, initial, goal, heuristics):
+    for h_name, heuristic in heuristics:
+        problem = CountingCube(initial=initial, goal=goal)
+        stats = utils.SearchStats()
+        start = time.time()
+        solution = ps1.astar_search(problem, heuristic=heuristic, stats=stats)
+        elapsed = time.time() - start
+        cost = len(solution) if solution is not False else None
+        # every generated child not yet expanded gets an h, by a call or a
+        # delta, so the counted calls must track the search
+        assert stats.expanded <= stats.heuristic_calls <= stats.generated + 1, \
+            f"{stats.heuristic_calls} heuristic calls for {stats.generated} generated"
+        admissible = "yes" if getattr(heuristic, "admissible", True) else "NO"
+        print(f"{name:<12} {h_name:<10} {admissible:>10} {problem.expanded:>9d} {cost!s:>5} "
+              f"{elapsed:>9.3f} {stats.heuristic_calls:>9d}")
+
+
+def heuristics_for(goal, directory):
+    patterns = pattern_db.disjoint_patterns(goal, 2)
+    databases = pattern_db.build_databases(goal, patterns, directory)
+    return [("misplaced", ps1.heuristic_func),
+            ("pdb-max", pattern_db.PatternDatabaseHeuristic(databases, "max")),
+            ("pdb-add", pattern_db.PatternDatabaseHeuristic(databases, "add"))]
+
+
+def main(n_scrambles, depth):
+    rng = random.Random(2109)
+    for shape in ([3, 3], [3, 7], [5, 5]):
+        colours = [i // shape[1] for i in range(shape[0] * shape[1])]
+        check_incremental(cube.State(shape, colours), 5000, rng)
+    print(f"{'puzzle':<12} {'heuristic':<10} {'admissible':>10} {'expanded':>9} {'cost':>5} "
+          f"{'seconds':>9} {'h calls':>9}")
+    with tempfile.TemporaryDirectory() as root:
+        for name in ["cube1", "cube2", "cube3", "cube4"]:
+            problem = cube.Cube(input_dict=getattr(ps1, name)['input_dict'])
+            heuristics = heuristics_for(problem.goal, os.path.join(root, name))
+            run(name, problem.initial, problem.goal, heuristics)
+
+        goal = cube.State([3, 4], [0, 0, 0, 0, 1, 1, 1, 1, 2, 2, 2, 2])
+        heuristics = heuristics_for(goal, os.path.join(root, "scrambled"))
+        for i in range(n_scrambles):
+            run(f"scramble{i}", scramble(goal, depth, rng), goal, heuristics)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*(args + [5, 6][len(args):]))
@@ -0,0 +1,42 @@
+"""
+Speedup-vs-cores benchmark of hash-distributed A* on scrambled 3x4 boards.
+Speedup is measured against the same search with a single worker.
+
+    python bench_parallel.py [n_boards] [depth] [max_workers]
+"""
+import sys
+import random
+import multiprocessing as mp
+
+import cube
+import utils
+from bench_heuristics import scramble
+from parallel_search import hda_star_search
+
+
+def main(n_boards, depth, max_workers):
+    rng = random.Random(2109)
+    goal = cube.State([3, 4], [0, 0, 1, 1, 2, 2, 3, 3, 4, 4, 5, 5])
+    boards = [scramble(goal, depth, rng) for _ in range(n_boards)]
+    workers = [1]
+    while workers[-1] * 2 <= max_workers:
+        workers.append(workers[-1] * 2)
+
+    print(f"{'workers':>7} {'expanded':>10} {'seconds':>9} {'speedup':>8}")
+    baseline = None
+    for n_workers in workers:
+        expanded, seconds = 0, 0.0
+        for initial in boards:
+            problem = cube.Cube(initial=initial, goal=goal)
+            stats = utils.SearchStats()
+            solution = hda_star_search(problem, n_workers=n_workers, stats=stats)
+            assert problem.verify_solution(solution)[0]
+            expanded += stats.expanded
+            seconds += stats.wall_time
+        baseline = baseline or seconds
+        print(f"{n_workers:>7d} {expanded:>10d} {seconds:>9.3f} {baseline / seconds:>7.2f}x")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*(args + [3, 8, mp.cpu_count()][len(args):]))
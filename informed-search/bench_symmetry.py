@@ -0,0 +1,64 @@
+"""
+State-space reduction of symmetry canonicalisation: the number of
+symmetries of each goal, the states and classes reachable from the initial
+state, and the nodes expanded by A*, IDA* and BFS with and without
+canonical states, on the cube1-cube4 fixtures and on scrambled boards.
+
+    python bench_symmetry.py [n_scrambles] [depth]
+"""
+import sys
+import time
+import random
+
+import cube
+import ps1
+import utils
+import symmetry
+import search_engine
+import bounded_search
+from bench_heuristics import scramble
+
+SEARCHES = [
+    ("astar", lambda problem, stats: ps1.astar_search(problem, stats=stats)),
+    ("ida", lambda problem, stats: bounded_search.ida_star_search(
+        problem, table_size=100000, stats=stats)),
+    ("bfs", lambda problem, stats: search_engine.breadth_first_graph_search(problem, stats=stats)),
+]
+
+
+def run(name, problem, max_states):
+    states, classes = symmetry.reduction_factor(problem, max_states)
+    n_symmetries = len(symmetry.Symmetries(problem.goal))
+    print(f"{name}: {n_symmetries} symmetries, {states} states in {classes} classes "
+          f"(reduction {states / classes:.1f}x)")
+    for search_name, search in SEARCHES:
+        counts = []
+        for canonical in (False, True):
+            target = symmetry.CanonicalProblem(problem) if canonical else problem
+            stats = utils.SearchStats()
+            start = time.time()
+            solution = search(target, stats)
+            elapsed = time.time() - start
+            cost = len(solution) if solution is not False else None
+            counts.append((stats.expanded, cost, elapsed))
+        (plain, cost, t_plain), (reduced, cost_reduced, t_reduced) = counts
+        assert cost == cost_reduced, f"{name} {search_name}: {cost} != {cost_reduced}"
+        print(f"  {search_name:<6} expanded {plain:>7d} -> {reduced:>7d} "
+              f"({plain / max(reduced, 1):.1f}x)  cost {cost!s:>3}  "
+              f"{t_plain:.3f}s -> {t_reduced:.3f}s")
+
+
+def main(n_scrambles, depth, max_states=400000):
+    for name in ["cube1", "cube2", "cube3", "cube4"]:
+        run(name, cube.Cube(input_dict=getattr(ps1, name)['input_dict']), max_states)
+
+    rng = random.Random(2109)
+    goal = cube.State([3, 3], [0, 0, 0, 1, 1, 1, 2, 2, 2])
+    for i in range(n_scrambles):
+        problem = cube.Cube(initial=scramble(goal, depth, rng), goal=goal)
+        run(f"scramble{i}", problem, max_states)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*(args + [3, 6][len(args):]))
@@ -0,0 +1,185 @@
+"""
+Bidirectional search for cube.Cube.
+
+Every move has an exact inverse (left <-> right, up <-> down), so the goal
+can be searched backwards with the same transition tables: the predecessors
+of a state are its successors, reached in the forward direction by the
+inverse actions. A forward search from the initial state and a backward
+search from the goal meet in the middle, each only reaching about half the
+solution depth.
+
+    solution = bidirectional_search(problem)              # A*, heuristic_func
+    solution = bidirectional_search(problem, mode="bfs")  # layered BFS
+"""
+import math
+import time
+
+from typing import Callable, Optional
+
+import cube
+import utils
+from ps1 import heuristic_func
+
+INVERSE = {"left": "right", "right": "left", "up": "down", "down": "up"}
+
+
+def inverse_action(action):
+    r"""Return the action undoing `action`"""
+    label, act = action
+    return [label, INVERSE[act]]
+
+
+def _splice(forward: utils.Node, backward: utils.Node):
+    r"""Join the forward path to the meeting state with the backward path
+    from it to the goal. Backward nodes store the forward action leading to
+    their parent, so the backward half is read off in order."""
+    solution = []
+    node = forward
+    while node.act is not None:
+        solution.append(list(node.act))
+        node = node.parent
+    solution.reverse()
+    node = backward
+    while node.act is not None:
+        solution.append(list(node.act))
+        node = node.parent
+    return solution
+
+
+class _Direction:
+    r"""Open list and best-known nodes of one direction of the search"""
+
+    def __init__(self, problem, start, heuristic, backward):
+        self.problem = problem
+        self.heuristic = heuristic
+        self.backward = backward
+        root = utils.Node(None, None, start, 0, heuristic(start))
+        # the open list keyed by f, mirrored by g for the gmin bound
+        self.open = utils.PriorityQueue()
+        self.open_g = utils.PriorityQueue()
+        self.open.push(root.get_fn(), root)
+        self.open_g.push(root.g_n, root)
+        self.best = {start: root}
+
+    def pop(self):
+        node = self.open.pop()
+        del self.open_g[node]
+        return node
+
+    def expand(self, node, stats):
+        r"""Expand node, yielding the children whose g improved"""
+        stats.expanded += 1
+        state = node.state
+        for action, child in self.problem.expand(state):
+            stats.generated += 1
+            g = self.problem.path_cost(node.g_n, state, action, child)
+            known = self.best.get(child)
+            if known is not None and known.g_n <= g:
+                continue
+            # backward nodes store the forward action leading to their parent
+            act = inverse_action(action) if self.backward else action
+            h = known.h_n if known is not None else self.heuristic(child)
+            child_node = utils.Node(node, act, child, g, h)
+            self.best[child] = child_node
+            if child_node in self.open:
+                self.open.update(child_node.get_fn(), child_node)
+                self.open_g.update(g, child_node)
+            else:
+                self.open.push(child_node.get_fn(), child_node)
+                self.open_g.push(g, child_node)
+            yield child_node
+
+
+def bidirectional_search(problem: cube.Cube, heuristic: Optional[Callable] = None,
+        backward_heuristic: Optional[Callable] = None, mode: str = "astar",
+        stats: Optional[utils.SearchStats] = None):
+    r"""
+    Bidirectional search finds an optimal solution by searching forward from
+    the initial state and backward from the goal until the two meet.
+    By default, fail is True and returns False.
+
+    In "astar" mode both directions are A* with front-to-end heuristics: the
+    forward one estimates the distance to the goal, the backward one the
+    distance from the initial state. The search stops once the best meeting
+    cost U found so far satisfies
+    U <= max(fmin_forward, fmin_backward, gmin_forward + gmin_backward + 1),
+    since each term is a lower bound on any path not found yet (moves cost
+    1). The direction with the smaller open list is expanded next.
+
+    In "bfs" mode the directions expand whole layers alternately (the
+    smaller one first), and the first layer that meets finishes before the
+    cheapest meeting is returned.
+
+    Args:
+        problem (cube.Cube): Cube instance with a single goal state
+        heuristic (Callable[[cube.Cube, cube.State], float]): admissible
+            heuristic towards problem.goal, heuristic_func by default
+        backward_heuristic (Callable[[cube.Cube, cube.State], float]):
+            admissible heuristic for the backward search, called with the
+            reversed problem (initial and goal swapped); `heuristic` by
+            default, which must then only depend on problem.goal
+        mode (str): "astar" or "bfs"
+        stats (utils.SearchStats): filled in with the search counters
+
+    Returns:
+        solution (List[Action]): the action sequence
+    """
+    if isinstance(problem.goal, list):
+        raise ValueError("bidirectional search needs a single goal state")
+    if mode not in ("astar", "bfs"):
+        raise ValueError(f"unknown mode {mode}")
+    stats = stats if stats is not None else utils.SearchStats()
+    start = time.time()
+
+    if mode == "bfs":
+        forward_h = backward_h = lambda state: 0
+    else:
+        heuristic = heuristic or heuristic_func
+        backward_heuristic = backward_heuristic or heuristic
+        reverse = cube.Cube(initial=problem.goal, goal=problem.initial)
+        forward_h = lambda state: heuristic(problem, state)
+        backward_h = lambda state: backward_heuristic(reverse, state)
+
+    forward = _Direction(problem, problem.initial, forward_h, backward=False)
+    backward = _Direction(problem, problem.goal, backward_h, backward=True)
+
+    best_cost = math.inf
+    meeting = None
+    if problem.initial in backward.best:
+        best_cost, meeting = 0, (forward.best[problem.initial], backward.best[problem.initial])
+
+    def meet(node, this, other):
+        nonlocal best_cost, meeting
+        opposite = other.best.get(node.state)
+        if opposite is not None and node.g_n + opposite.g_n < best_cost:
+            best_cost = node.g_n + opposite.g_n
+            pair = (node, opposite)
+            meeting = pair if this is forward else pair[::-1]
+
+    while len(forward.open) and len(backward.open):
+        stats.peak_nodes = max(stats.peak_nodes, len(forward.best) + len(backward.best))
+        if mode == "bfs":
+            if meeting is not None:
+                break
+            this, other = (forward, backward) if len(forward.open) <= len(backward.open) \
+                else (backward, forward)
+            # expand the whole layer before checking for the meeting
+            layer = [this.pop() for _ in range(len(this.open))]
+            for node in layer:
+                for child in this.expand(node, stats):
+                    meet(child, this, other)
+            continue
+
+        if best_cost <= max(forward.open.top()[0], backward.open.top()[0],
+                            forward.open_g.top()[0] + backward.open_g.top()[0] + 1):
+            break
+        this, other = (forward, backward) if len(forward.open) <= len(backward.open) \
+            else (backward, forward)
+        node = this.pop()
+        for child in this.expand(node, stats):
+            meet(child, this, other)
+
+    stats.wall_time = time.time() - start
+    if meeting is None:
+        return False
+    return _splice(*meeting)
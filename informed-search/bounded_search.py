@@ -0,0 +1,229 @@
+"""
+Memory-bounded optimal search for cube.Cube: iterative-deepening A* (IDA*)
+and recursive best-first search (RBFS).
+
+Both keep only the current path (and, for RBFS, the siblings along it), so
+memory grows with the solution depth rather than with the number of nodes
+generated. An optional transposition table of fixed capacity remembers
+learned lower bounds on the cost-to-go of states; they tighten the heuristic
+on re-visits in later iterations and are always admissible, so solutions stay
+optimal whatever the table keeps or evicts.
+
+    stats = utils.SearchStats()
+    solution = ida_star_search(problem, table_size=100000, stats=stats)
+"""
+import math
+import time
+import tracemalloc
+
+from typing import Callable, Optional
+
+import cube
+import utils
+from ps1 import heuristic_func
+
+FOUND = "FOUND"
+
+
+class _Bound:
+    r"""Heuristic lookup shared by the solvers: heuristic_func tightened by
+    the bounds learned in the transposition table, if any"""
+
+    def __init__(self, problem, heuristic, table_size, policy):
+        self.problem = problem
+        self.heuristic = heuristic or heuristic_func
+        self.table = utils.TranspositionTable(table_size, policy) if table_size else None
+
+    def __call__(self, state) -> float:
+        h = self.heuristic(self.problem, state)
+        if self.table is not None:
+            h = max(h, self.table.get(state, h))
+        return h
+
+    def learn(self, state, h: float):
+        if self.table is not None:
+            self.table.store(state, h)
+
+    def __len__(self):
+        return len(self.table) if self.table is not None else 0
+
+
+def _trace_solution(path_actions):
+    return [list(action) for action in path_actions]
+
+
+def ida_star_search(problem: cube.Cube, heuristic: Optional[Callable] = None,
+        table_size: int = 0, policy: str = "lru",
+        stats: Optional[utils.SearchStats] = None):
+    r"""
+    Iterative-deepening A* finds an optimal solution by repeated depth first
+    searches bounded by f = g + h, raising the bound to the smallest f that
+    exceeded it until the goal is found. By default, fail is True and
+    returns False.
+
+    Args:
+        problem (cube.Cube): Cube instance
+        heuristic (Callable[[cube.Cube, cube.State], float]): admissible
+            heuristic, heuristic_func by default
+        table_size (int): capacity of the transposition table, 0 disables it
+        policy (str): replacement policy of the table, "lru" or "fifo"
+        stats (utils.SearchStats): filled in with the search counters
+
+    Returns:
+        solution (List[Action]): the action sequence
+    """
+    stats = stats if stats is not None else utils.SearchStats()
+    bound_of = _Bound(problem, heuristic, table_size, policy)
+    path_states = {problem.initial}
+    path_actions = []
+
+    def dfs(state, g, h, bound):
+        r"""Returns (FOUND or the smallest f exceeding bound, lower bound on
+        the cost-to-go of state)"""
+        f = g + h
+        if f > bound:
+            return f, h
+        if problem.goal_test(state):
+            return FOUND, 0
+        stats.expanded += 1
+        stats.peak_nodes = max(stats.peak_nodes, len(path_states) + len(bound_of))
+        next_bound, learned = math.inf, math.inf
+        for action, child in problem.expand(state):
+            stats.generated += 1
+            cost = problem.path_cost(g, state, action, child) - g
+            child_h = bound_of(child)
+            if child in path_states:
+                # not searched from here, its own bound still holds
+                learned = min(learned, cost + child_h)
+                continue
+            path_states.add(child)
+            path_actions.append(action)
+            t, child_learned = dfs(child, g + cost, child_h, bound)
+            if t is FOUND:
+                return FOUND, 0
+            path_states.discard(child)
+            path_actions.pop()
+            next_bound = min(next_bound, t)
+            learned = min(learned, cost + child_learned)
+        learned = max(h, learned)
+        bound_of.learn(state, learned)
+        return next_bound, learned
+
+    start = time.time()
+    bound = bound_of(problem.initial)
+    solution = False
+    while bound < math.inf:
+        t, _ = dfs(problem.initial, 0, bound_of(problem.initial), bound)
+        if t is FOUND:
+            solution = _trace_solution(path_actions)
+            break
+        bound = t
+    stats.wall_time = time.time() - start
+    return solution
+
+
+def rbfs_search(problem: cube.Cube, heuristic: Optional[Callable] = None,
+        table_size: int = 0, policy: str = "lru",
+        stats: Optional[utils.SearchStats] = None):
+    r"""
+    Recursive best-first search expands the best successor while its f stays
+    below the best alternative along the path, backing the f of abandoned
+    subtrees up to their parents. By default, fail is True and returns False.
+
+    Args:
+        problem (cube.Cube): Cube instance
+        heuristic (Callable[[cube.Cube, cube.State], float]): admissible
+            heuristic, heuristic_func by default
+        table_size (int): capacity of the transposition table, 0 disables it
+        policy (str): replacement policy of the table, "lru" or "fifo"
+        stats (utils.SearchStats): filled in with the search counters
+
+    Returns:
+        solution (List[Action]): the action sequence
+    """
+    stats = stats if stats is not None else utils.SearchStats()
+    bound_of = _Bound(problem, heuristic, table_size, policy)
+    path_states = {problem.initial}
+    path_actions = []
+    held = [1]
+
+    def rbfs(state, g, h, f, f_limit):
+        r"""Returns (FOUND or the backed-up f of state, lower bound on the
+        cost-to-go of state)"""
+        if problem.goal_test(state):
+            return FOUND, 0
+        stats.expanded += 1
+        # successors: [f, g, h, learned h, action, state]
+        successors, learned = [], math.inf
+        for action, child in problem.expand(state):
+            stats.generated += 1
+            cost = problem.path_cost(g, state, action, child) - g
+            child_h = bound_of(child)
+            if child in path_states:
+                learned = min(learned, cost + child_h)
+                continue
+            successors.append([max(g + cost + child_h, f), g + cost, child_h,
+                               child_h, action, child])
+        held[0] += len(successors)
+        stats.peak_nodes = max(stats.peak_nodes, held[0] + len(bound_of))
+        result = math.inf
+        while successors:
+            successors.sort(key=lambda s: s[0])
+            best = successors[0]
+            if best[0] > f_limit:
+                result = best[0]
+                break
+            alternative = successors[1][0] if len(successors) > 1 else math.inf
+            path_states.add(best[5])
+            path_actions.append(best[4])
+            t, best[3] = rbfs(best[5], best[1], best[2], best[0],
+                              min(f_limit, alternative))
+            if t is FOUND:
+                return FOUND, 0
+            path_states.discard(best[5])
+            path_actions.pop()
+            best[0] = t
+        for s in successors:
+            learned = min(learned, s[1] - g + s[3])
+        held[0] -= len(successors)
+        learned = max(h, learned)
+        bound_of.learn(state, learned)
+        return result, learned
+
+    start = time.time()
+    h = bound_of(problem.initial)
+    t, _ = rbfs(problem.initial, 0, h, h, math.inf)
+    stats.wall_time = time.time() - start
+    if t is FOUND:
+        return _trace_solution(path_actions)
+    return False
+
+
+def run_solver(solver: Callable, problem: cube.Cube, trace_memory: bool = True,
+        **kwargs):
+    r"""
+    Runs a solver and reports its counters, including the peak traced
+    memory.
+
+    Args:
+        solver (Callable): ida_star_search, rbfs_search or a solver with
+            the same signature
+        problem (cube.Cube): Cube instance
+        trace_memory (bool): trace allocations to report peak_memory, which
+            slows the search down
+        kwargs: passed on to the solver
+
+    Returns:
+        (solution, stats)
+    """
+    stats = utils.SearchStats()
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        solution = solver(problem, stats=stats, **kwargs)
+        if trace_memory:
+            stats.peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return solution, stats
@@ -0,0 +1,350 @@
+"""
+Compact, disk-backed A* for large cube boards.
+
+`ps1.astar_search` keeps a `utils.Node` per generated state: a Python object
+with a parent pointer, an action list and a State, several hundred bytes
+each. Here a node is a row of parallel NumPy arrays instead:
+
+    packed layout   ceil(log2(#colours)) bits per cell, in uint64 words
+    g, h            float32
+    parent          int64 index of the parent row, -1 for the root
+    action          uint8 index into problem.actions()
+
+Rows live in fixed-size chunks, the closed/open index is an open-addressing
+hash table over row numbers, and the frontier is a binary heap of
+(f, row) pairs. Everything is allocated from an arena that hands out
+in-memory arrays until `memory_budget` bytes are used and memory-mapped
+files under a scratch directory after that; the frontier heap spills its
+worst half to sorted on-disk runs whenever it outgrows its share of the
+budget. A search therefore stays within a fixed RAM ceiling (the budget
+plus the per-run bookkeeping) and pages the rest through the OS.
+
+    solution = compact_astar_search(problem, memory_budget=256 << 20)
+"""
+import os
+import math
+import time
+import heapq
+import shutil
+import tempfile
+
+from typing import Callable, Optional
+
+import numpy as np
+
+import cube
+import utils
+import incremental
+from ps1 import heuristic_func
+
+CHUNK_BITS = 16
+CHUNK_SIZE = 1 << CHUNK_BITS
+
+
+class Arena:
+    r"""Allocates arrays in memory up to a byte budget, and as memory-mapped
+    files in `directory` beyond it
+
+    Args:
+        memory_budget (int): bytes of arrays kept in memory
+        directory (str): where spilled arrays are stored
+    """
+
+    def __init__(self, memory_budget: int, directory: str):
+        self.memory_budget = memory_budget
+        self.directory = directory
+        self.in_memory = 0
+        self.n_files = 0
+
+    def alloc(self, shape, dtype, spill: bool = False) -> np.ndarray:
+        r"""Return a zeroed array, memory-mapped if the budget is used up or
+        spill is set"""
+        nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        if not spill and self.in_memory + nbytes <= self.memory_budget:
+            self.in_memory += nbytes
+            return np.zeros(shape, dtype=dtype)
+        self.n_files += 1
+        path = os.path.join(self.directory, f"arena{self.n_files}.bin")
+        return np.memmap(path, dtype=dtype, mode="w+", shape=shape)
+
+    def free(self, array: np.ndarray):
+        r"""Return an array's bytes to the budget, or delete its file"""
+        if isinstance(array, np.memmap):
+            path = array.filename
+            del array
+            os.remove(path)
+        else:
+            self.in_memory -= array.nbytes
+
+
+class StateCodec:
+    r"""Packs layouts into integers of ceil(log2(#colours)) bits per cell
+
+    Args:
+        goal (cube.State): the goal, whose colours are the alphabet
+    """
+
+    def __init__(self, goal: cube.State):
+        self.shape = goal.shape
+        self.colours = sorted(set(goal.layout), key=str)
+        self.codes = {colour: i for i, colour in enumerate(self.colours)}
+        self.bits = max(1, math.ceil(math.log2(len(self.colours))))
+        self.n_cells = len(goal.layout)
+        self.n_words = max(1, math.ceil(self.bits * self.n_cells / 64))
+        self.mask = (1 << self.bits) - 1
+
+    def pack(self, layout) -> int:
+        key = 0
+        codes, bits = self.codes, self.bits
+        for colour in reversed(layout):
+            key = (key << bits) | codes[colour]
+        return key
+
+    def unpack(self, key: int) -> cube.State:
+        layout = []
+        for _ in range(self.n_cells):
+            layout.append(self.colours[key & self.mask])
+            key >>= self.bits
+        return cube.State._make(self.shape, tuple(layout))
+
+    def to_words(self, key: int):
+        return [(key >> (64 * i)) & 0xFFFFFFFFFFFFFFFF for i in range(self.n_words)]
+
+    def from_words(self, words) -> int:
+        key = 0
+        for i, word in enumerate(words):
+            key |= int(word) << (64 * i)
+        return key
+
+
+class NodeStore:
+    r"""Search nodes as rows of parallel arrays, allocated in chunks"""
+
+    def __init__(self, arena: Arena, n_words: int):
+        self.arena = arena
+        self.n_words = n_words
+        self.keys, self.g, self.h, self.parent, self.action = [], [], [], [], []
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, words, g: float, h: float, parent: int, action: int) -> int:
+        chunk, row = self.size >> CHUNK_BITS, self.size & (CHUNK_SIZE - 1)
+        if chunk == len(self.keys):
+            alloc = self.arena.alloc
+            self.keys.append(alloc((CHUNK_SIZE, self.n_words), np.uint64))
+            self.g.append(alloc(CHUNK_SIZE, np.float32))
+            self.h.append(alloc(CHUNK_SIZE, np.float32))
+            self.parent.append(alloc(CHUNK_SIZE, np.int64))
+            self.action.append(alloc(CHUNK_SIZE, np.uint8))
+        self.keys[chunk][row] = words
+        self.g[chunk][row] = g
+        self.h[chunk][row] = h
+        self.parent[chunk][row] = parent
+        self.action[chunk][row] = action
+        self.size += 1
+        return self.size - 1
+
+    def get(self, field: str, index: int):
+        return getattr(self, field)[index >> CHUNK_BITS][index & (CHUNK_SIZE - 1)]
+
+    def set(self, field: str, index: int, value):
+        getattr(self, field)[index >> CHUNK_BITS][index & (CHUNK_SIZE - 1)] = value
+
+
+class StateIndex:
+    r"""Open-addressing hash table from packed state to its best row, stored
+    as one int64 array of row numbers (-1 for empty slots)"""
+
+    def __init__(self, arena: Arena, store: NodeStore, codec: StateCodec,
+            capacity: int = 1 << 12):
+        self.arena = arena
+        self.store = store
+        self.codec = codec
+        self.slots = self._alloc(capacity)
+        self.size = 0
+
+    def _alloc(self, capacity):
+        slots = self.arena.alloc(capacity, np.int64)
+        slots[:] = -1
+        return slots
+
+    def __len__(self):
+        return self.size
+
+    def _find(self, key: int, words) -> int:
+        r"""Return the slot of key, or the empty slot where it belongs"""
+        mask = len(self.slots) - 1
+        slot = hash(key) & mask
+        while True:
+            row = int(self.slots[slot])
+            if row < 0 or list(self.store.keys[row >> CHUNK_BITS][row & (CHUNK_SIZE - 1)]) == words:
+                return slot
+            slot = (slot + 1) & mask
+
+    def get(self, key: int, words) -> int:
+        return int(self.slots[self._find(key, words)])
+
+    def put(self, key: int, words, row: int):
+        slot = self._find(key, words)
+        if self.slots[slot] < 0:
+            self.size += 1
+        self.slots[slot] = row
+        if self.size * 2 > len(self.slots):
+            self._grow()
+
+    def _grow(self):
+        old = self.slots
+        self.slots = self._alloc(len(old) * 2)
+        mask = len(self.slots) - 1
+        for row in old[old >= 0]:
+            row = int(row)
+            key = self.codec.from_words(self.store.keys[row >> CHUNK_BITS][row & (CHUNK_SIZE - 1)])
+            slot = hash(key) & mask
+            while self.slots[slot] >= 0:
+                slot = (slot + 1) & mask
+            self.slots[slot] = row
+        self.arena.free(old)
+
+
+class SpillingFrontier:
+    r"""Min-heap of (f, row) that moves its worst half to a sorted,
+    memory-mapped run whenever it holds more than `max_in_memory` entries"""
+
+    def __init__(self, arena: Arena, max_in_memory: int):
+        self.arena = arena
+        self.max_in_memory = max(2, max_in_memory)
+        self.heap = []
+        # runs: [f array, row array, cursor]
+        self.runs = []
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, f: float, row: int):
+        heapq.heappush(self.heap, (f, row))
+        self.size += 1
+        if len(self.heap) > self.max_in_memory:
+            self._spill()
+
+    def _spill(self):
+        self.heap.sort()
+        keep = len(self.heap) // 2
+        spilled = self.heap[keep:]
+        del self.heap[keep:]
+        f = self.arena.alloc(len(spilled), np.float64, spill=True)
+        rows = self.arena.alloc(len(spilled), np.int64, spill=True)
+        f[:] = [entry[0] for entry in spilled]
+        rows[:] = [entry[1] for entry in spilled]
+        self.runs.append([f, rows, 0])
+
+    def pop(self):
+        best_run = None
+        best = self.heap[0] if self.heap else None
+        for run in self.runs:
+            head = (float(run[0][run[2]]), int(run[1][run[2]]))
+            if best is None or head < best:
+                best, best_run = head, run
+        if best is None:
+            raise Exception("Empty Priority Queue")
+        self.size -= 1
+        if best_run is None:
+            return heapq.heappop(self.heap)
+        best_run[2] += 1
+        if best_run[2] == len(best_run[0]):
+            # by identity: comparing runs would compare their arrays
+            self.runs = [run for run in self.runs if run is not best_run]
+            self.arena.free(best_run[0])
+            self.arena.free(best_run[1])
+        return best
+
+
+def compact_astar_search(problem: cube.Cube, heuristic: Optional[Callable] = None,
+        memory_budget: int = 256 << 20, spill_dir: Optional[str] = None,
+        stats: Optional[utils.SearchStats] = None):
+    r"""
+    A* Search over bit-packed nodes, spilling to memory-mapped files beyond a
+    RAM budget. By default, fail is True and returns False.
+
+    Args:
+        problem (cube.Cube): Cube instance with a single goal state
+        heuristic (Callable[[cube.Cube, cube.State], float]): admissible
+            heuristic, heuristic_func by default
+        memory_budget (int): bytes of node arrays and index kept in memory;
+            a quarter of it bounds the in-memory part of the frontier
+        spill_dir (str): parent directory of the scratch files, the system
+            temporary directory by default
+        stats (utils.SearchStats): filled in with the search counters
+
+    Returns:
+        solution (List[Action]): the action sequence
+    """
+    if isinstance(problem.goal, list):
+        raise ValueError("compact_astar_search needs a single goal state")
+    heuristic = heuristic or heuristic_func
+    stats = stats if stats is not None else utils.SearchStats()
+    start = time.time()
+    actions = problem.actions(problem.initial)
+    codec = StateCodec(problem.goal)
+
+    directory = tempfile.mkdtemp(prefix="cube-frontier-", dir=spill_dir)
+    try:
+        arena = Arena(memory_budget * 3 // 4, directory)
+        store = NodeStore(arena, codec.n_words)
+        index = StateIndex(arena, store, codec)
+        # a heap entry is a tuple of two boxed numbers, about 100 bytes
+        frontier = SpillingFrontier(arena, memory_budget // 4 // 100)
+
+        key = codec.pack(problem.initial.layout)
+        words = codec.to_words(key)
+        h = heuristic(problem, problem.initial)
+        evaluate = incremental.evaluator(problem, heuristic)
+        root = store.add(words, 0, h, -1, 0)
+        index.put(key, words, root)
+        frontier.push(h, root)
+
+        goal_row = None
+        while len(frontier):
+            stats.frontier_peak = max(stats.frontier_peak, len(frontier))
+            _, row = frontier.pop()
+            words = list(store.keys[row >> CHUNK_BITS][row & (CHUNK_SIZE - 1)])
+            key = codec.from_words(words)
+            if index.get(key, words) != row:
+                stats.duplicates += 1
+                continue
+            state = codec.unpack(key)
+            if problem.goal_test(state):
+                goal_row = row
+                break
+            stats.expanded += 1
+            g = float(store.get("g", row))
+            h = float(store.get("h", row))
+            for action_index, (action, child) in enumerate(problem.expand(state)):
+                stats.generated += 1
+                child_g = problem.path_cost(g, state, action, child)
+                child_key = codec.pack(child.layout)
+                child_words = codec.to_words(child_key)
+                known = index.get(child_key, child_words)
+                if known >= 0 and store.get("g", known) <= child_g:
+                    stats.duplicates += 1
+                    continue
+                child_h = float(store.get("h", known)) if known >= 0 \
+                    else evaluate(state, h, action, child)
+                child_row = store.add(child_words, child_g, child_h, row, action_index)
+                index.put(child_key, child_words, child_row)
+                frontier.push(child_g + child_h, child_row)
+
+        stats.peak_nodes = len(store)
+        stats.wall_time = time.time() - start
+        if goal_row is None:
+            return False
+        solution = []
+        while store.get("parent", goal_row) >= 0:
+            solution.append(list(actions[int(store.get("action", goal_row))]))
+            goal_row = int(store.get("parent", goal_row))
+        solution.reverse()
+        return solution
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
@@ -8,6 +8,8 @@ import timeout_decorator
 
 import utils
 import cube
+import instrument
+import search_engine
 
 # For following test cases
 def wrap_test(func):
@@ -39,66 +41,13 @@ def bfs_tree_search(num_mis, num_can):
     Returns:
         solution (List): the action sequence
     """
-    
-    fail = True
-    solution = []
-    
+
     """ YOUR CODE HERE """
-    # Need to track 2 things
-    # - state tuple (m, c, boat), where m is missionary on start bank, c is cannibal on start bank,
-    # and boat = 0 when boat at start and = 1 when boat at end
-    # - action tuple (m, c), where m is missionary on boat, and c is cannibal on boat
-    start_state_tuple = (num_mis, num_can, 0)
-    goal_state = (0, 0, 1)
-    # Generate all possible action tuples, regardless of m and c constraints
-    # Boat can only hold 1 or 2 people
-    possible_action_tuples = [[0, 1], [0, 2], [1, 0], [2, 0], [1, 1]]
-
-    # frontier contains nodes --> tuples of state and solution to reach there
-    start_node = utils.Node(None, None, start_state_tuple, 0, 0)
-    frontier = utils.PriorityQueue()
-    frontier.push(start_node.g_n, start_node)
-    while len(frontier) != 0:
-        curr_node = frontier.pop()
-        curr_state = curr_node.state
-        # Check if state is goal state
-        if curr_state == goal_state:
-            trace_act = curr_node.act
-            while trace_act != None:
-                solution.append(trace_act)
-                curr_node = curr_node.parent
-                trace_act = curr_node.act
-            fail = False
-            solution.reverse()
-            break
-        multiplier = -1 if curr_node.state[2] == 0 else 1
-        next_boat_pos = 1 if curr_node.state[2] == 0 else 0
-        # Calculate all possible actions from this state
-        for action in possible_action_tuples:
-            # Calculate m and c on start side of river
-            next_mis = curr_state[0] + action[0] * multiplier
-            next_can = curr_state[1] + action[1] * multiplier
-            if ((next_can > next_mis and next_mis > 0)
-            or next_can < 0 or next_mis < 0
-            or next_can > num_can or next_mis > num_mis):
-                continue
-
-            # Calculate m and c on other side of the river
-            next_mis_other_bank = num_mis - next_mis
-            next_can_other_bank = num_can - next_can
-            if ((next_can_other_bank > next_mis_other_bank and next_mis_other_bank > 0)
-            or next_can_other_bank < 0 or next_mis_other_bank < 0
-            or next_can_other_bank > num_can or next_mis_other_bank > num_mis):
-                continue
-
-            # State falls within m and c constraints
-            next_state = (next_mis, next_can, next_boat_pos)
-            next_node = utils.Node(curr_node, action, next_state, curr_node.g_n + 1, 0)
-            frontier.push(next_node.g_n, next_node)
+    # the successor generation lives in search_engine.MissionariesCannibals
+    problem = search_engine.MissionariesCannibals(num_mis, num_can)
+    solution = search_engine.breadth_first_tree_search(problem)
     """ END YOUR CODE HERE """
-    
-    if fail:
-        return False
+
     return solution
 
 def dfs_tree_search(num_mis, num_can):
@@ -126,66 +75,12 @@ def dfs_tree_search(num_mis, num_can):
         solution (List): the action sequence
     """
 
-    fail = True
-    solution = []
-    
     """ YOUR CODE HERE """
-    # Need to track 2 things
-    # - state tuple (m, c, boat), where m is missionary on start bank, c is cannibal on start bank,
-    # and boat = 0 when boat at start and = 1 when boat at end
-    # - action tuple (m, c), where m is missionary on boat, and c is cannibal on boat
-    start_state_tuple = (num_mis, num_can, 0)
-    goal_state = (0, 0, 1)
-    # Generate all possible action tuples, regardless of m and c constraints
-    # Boat can only hold 1 or 2 people
-    possible_action_tuples = [[0, 1], [0, 2], [1, 0], [2, 0], [1, 1]]
-
-    # frontier contains nodes --> tuples of state and solution to reach there
-    start_node = utils.Node(None, None, start_state_tuple, 0, 0)
-    stack = utils.Stack()
-    stack.push(start_node)
-    
-    while not stack.is_empty():
-        curr_node = stack.pop()
-        curr_state = curr_node.state
-        # Check if state is goal state
-        if curr_state == goal_state:
-            trace_act = curr_node.act
-            while trace_act != None:
-                solution.append(trace_act)
-                curr_node = curr_node.parent
-                trace_act = curr_node.act
-            fail = False
-            solution.reverse()
-            break
-        multiplier = -1 if curr_node.state[2] == 0 else 1
-        next_boat_pos = 1 if curr_node.state[2] == 0 else 0
-        # Calculate all possible actions from this state and add to stack
-        for action in possible_action_tuples:
-            # Calculate m and c on start side of river
-            next_mis = curr_state[0] + action[0] * multiplier
-            next_can = curr_state[1] + action[1] * multiplier
-            if ((next_can > next_mis and next_mis > 0)
-            or next_can < 0 or next_mis < 0
-            or next_can > num_can or next_mis > num_mis):
-                continue
-
-            # Calculate m and c on other side of the river
-            next_mis_other_bank = num_mis - next_mis
-            next_can_other_bank = num_can - next_can
-            if ((next_can_other_bank > next_mis_other_bank and next_mis_other_bank > 0)
-            or next_can_other_bank < 0 or next_mis_other_bank < 0
-            or next_can_other_bank > num_can or next_mis_other_bank > num_mis):
-                continue
-
-            # State falls within m and c constraints
-            next_state = (next_mis, next_can, next_boat_pos)
-            next_node = utils.Node(curr_node, action, next_state, curr_node.g_n + 1, 0)
-            stack.push(next_node)
+    # the successor generation lives in search_engine.MissionariesCannibals
+    problem = search_engine.MissionariesCannibals(num_mis, num_can)
+    solution = search_engine.depth_first_tree_search(problem)
     """ END YOUR CODE HERE """
-    
-    if fail:
-        return False
+
     return solution
 
 def bfs_graph_search(num_mis, num_can):
@@ -205,80 +100,13 @@ def bfs_graph_search(num_mis, num_can):
     Returns:
         solution (List): the action sequence
     """
-    fail = True
-    solution = []
-    
+
     """ YOUR CODE HERE """
-        # Need to track 2 things
-    # - state tuple (m, c, boat), where m is missionary on start bank, c is cannibal on start bank,
-    # and boat = 0 when boat at start and = 1 when boat at end
-    # - action tuple (m, c), where m is missionary on boat, and c is cannibal on boat
-    start_state_tuple = (num_mis, num_can, 0)
-    goal_state = (0, 0, 1)
-    # Generate all possible action tuples, regardless of m and c constraints
-    # Boat can only hold 1 or 2 people
-    possible_action_tuples = [[0, 1], [0, 2], [1, 0], [2, 0], [1, 1]]
-
-    # frontier contains nodes --> tuples of state and solution to reach there
-    start_node = utils.Node(None, None, start_state_tuple, 0, 0)
-    frontier = utils.PriorityQueue()
-    frontier.push(start_node.g_n, start_node)
-    # ADDITION: Array to track visited nodes
-    visited = set()
-    visited.add(start_node)
-    while len(frontier) != 0:
-        curr_node = frontier.pop()
-        curr_state = curr_node.state
-        # Check if state is goal state
-        if curr_state == goal_state:
-            trace_act = curr_node.act
-            while trace_act != None:
-                solution.append(trace_act)
-                curr_node = curr_node.parent
-                trace_act = curr_node.act
-            fail = False
-            solution.reverse()
-            break
-        multiplier = -1 if curr_node.state[2] == 0 else 1
-        next_boat_pos = 1 if curr_node.state[2] == 0 else 0
-        # Calculate all possible actions from this state
-        for action in possible_action_tuples:
-            # Calculate m and c on start side of river
-            next_mis = curr_state[0] + action[0] * multiplier
-            next_can = curr_state[1] + action[1] * multiplier
-            if ((next_can > next_mis and next_mis > 0)
-            or next_can < 0 or next_mis < 0
-            or next_can > num_can or next_mis > num_mis):
-                continue
-
-            # Calculate m and c on other side of the river
-            next_mis_other_bank = num_mis - next_mis
-            next_can_other_bank = num_can - next_can
-            if ((next_can_other_bank > next_mis_other_bank and next_mis_other_bank > 0)
-            or next_can_other_bank < 0 or next_mis_other_bank < 0
-            or next_can_other_bank > num_can or next_mis_other_bank > num_mis):
-                continue
-
-            # State falls within m and c constraints
-            next_state = (next_mis, next_can, next_boat_pos)
-            # ADDITION: Check if this state has been visited
-            next_visited = False
-            for visited_node in visited:
-                if next_state == visited_node.state:
-                    next_visited = True
-                    break
-            
-            # ADDITION: If state is visited, do not add it to frontier, else do add it to frontier
-            if next_visited:
-                continue
-            next_node = utils.Node(curr_node, action, next_state, curr_node.g_n + 1, 0)
-            frontier.push(next_node.g_n, next_node)
-        # ADDITION: Add every processed node to the visited array for tracking purpose
-        visited.add(curr_node)
+    # the successor generation lives in search_engine.MissionariesCannibals
+    problem = search_engine.MissionariesCannibals(num_mis, num_can)
+    solution = search_engine.breadth_first_graph_search(problem)
     """ END YOUR CODE HERE """
-    
-    if fail:
-        return False
+
     return solution
 
 # Test Task 1
@@ -340,24 +168,58 @@ def test_bfs_graph_search(case):
         assert cost <= answer['cost'], f"Cost is not optimal."
     return "PASSED"
 
-def test_three_mnc(m, c, rounds):
+# Searches compared by test_three_mnc. The tree searches never terminate on
+# unsolvable instances, and DFS tree search loops on the cycles of the
+# missionaries and cannibals state graph, so pass them in explicitly.
+MNC_SEARCHES = {
+    "bfs_tree": search_engine.breadth_first_tree_search,
+    "dfs_tree": search_engine.depth_first_tree_search,
+    "bfs_graph": search_engine.breadth_first_graph_search,
+    "dfs_graph": search_engine.depth_first_graph_search,
+    "ucs_graph": lambda problem, stats: search_engine.uniform_cost_search(
+        problem, unit_costs=True, stats=stats),
+}
+
+def test_three_mnc(m, c, rounds, searches=("bfs_graph", "dfs_graph", "ucs_graph"),
+        report=None):
+    r"""
+    Runs each search `rounds` times on the (m, c) instance and prints one
+    line of counters per run.
+
+    Args:
+        m: the number of the Missionaries
+        c: the number of the Cannibals
+        rounds: the number of runs of every search
+        searches: the names of the searches in MNC_SEARCHES to compare
+        report: if given, the path of a .json or .csv file the records are
+            written to
+
+    Returns:
+        records (List[Dict]): the counters of every run
+    """
+    records = []
     for r in range(1, rounds + 1):
-        print(f"ROUND {r}")
-        start = time.time()
-        # solution = bfs_tree_search(m, c)
-        # print(f"BFS TREE - Time lapsed: {time.time() - start}")
-        start = time.time()
-        solution = dfs_tree_search(m, c)
-        print(f"DFS TREE - Time lapsed: {time.time() - start}")
-        start = time.time()
-        # solution = bfs_graph_search(m, c)
-        # print(f"BFS GRAPH - Time lapsed: {time.time() - start}")
-
-print("TEST 1")
-# test_three_mnc(5, 3, 5)
-
-print("\nTEST 2")
-test_three_mnc(4, 3, 5)
-
-print("\nTEST 3")
-test_three_mnc(4, 4, 5)
+        for name in searches:
+            stats = utils.SearchStats()
+            solution = MNC_SEARCHES[name](search_engine.MissionariesCannibals(m, c), stats=stats)
+            record = {"m": m, "c": c, "round": r, "search": name,
+                      "cost": len(solution) if solution is not False else None,
+                      **stats.as_dict()}
+            records.append(record)
+            print(f"ROUND {r} {name:<10} cost={record['cost']} "
+                  f"expanded={stats.expanded} generated={stats.generated} "
+                  f"duplicates={stats.duplicates} frontier_peak={stats.frontier_peak} "
+                  f"time={stats.wall_time:.6f}")
+    if report:
+        instrument.write_report(records, report)
+    return records
+
+if __name__ == "__main__":
+    print("TEST 1")
+    test_three_mnc(5, 3, 5)
+
+    print("\nTEST 2")
+    test_three_mnc(4, 3, 5)
+
+    print("\nTEST 3")
+    test_three_mnc(4, 4, 5)
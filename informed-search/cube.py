@@ -13,9 +13,13 @@ import json
 import copy
 
 from enum import Enum, unique
+from functools import lru_cache
+from operator import itemgetter
 from typing import Iterable, List, Dict, Tuple, Optional, Union
 from ast import literal_eval
 
+import numpy as np
+
 
 Action = List[Union[int, str]]
 
@@ -33,6 +37,10 @@ class State:
                 0   | 0 | 1 | 2 |
                 1   | 3 | 4 | 5 |
 
+    The layout is stored as a tuple and the hash is computed once, so states
+    are cheap to hash, compare and share; `layout` and `shape` return the
+    stored tuples rather than copies.
+
     Methods:
         left(label): move the @label row left
             returns the copy of new state (State)
@@ -47,26 +55,47 @@ class State:
             returns the copy of new state (State)
     """
 
+    __slots__ = ('__shape', '__layout', '__hash')
+
     def __init__(self, shape: Tuple[int,int], layout: Iterable[int]):
         if len(layout) != shape[0]*shape[1]:
             raise ValueError("layout does not match the shape")
-        self.__shape = list(shape)
-        self.__layout = layout
+        self.__shape = tuple(shape)
+        self.__layout = tuple(layout)
+        self.__hash = hash(self.__layout)
+
+    @classmethod
+    def _make(cls, shape: Tuple[int,int], layout: Tuple) -> "State":
+        r"""Build a State from an already validated shape and layout tuple,
+        skipping the checks and conversions of __init__."""
+        state = cls.__new__(cls)
+        state.__shape = shape
+        state.__layout = layout
+        state.__hash = hash(layout)
+        return state
 
     def __eq__(self, state: "State"):
+        if self is state:
+            return True
         if isinstance(state, State):
-            same_shape = state.shape[0] == self.__shape[0] and \
-                         state.shape[1] == self.__shape[1]
-            same_layout = all([x==y for x,y in zip(self.__layout,state.layout)])
-            return same_shape and same_layout
+            return self.__hash == state.__hash and \
+                   self.__shape == state.__shape and \
+                   self.__layout == state.__layout
         else:
             return False
 
     def __hash__(self) -> int:
-        return hash(tuple(self.__layout))
+        return self.__hash
+
+    def __getstate__(self):
+        return self.__shape, self.__layout
+
+    def __setstate__(self, data):
+        self.__shape, self.__layout = data
+        self.__hash = hash(self.__layout)
     
     def __repr__(self) -> str:
-        return str({'shape': self.__shape, 'layout': self.__layout})
+        return str({'shape': list(self.__shape), 'layout': list(self.__layout)})
         
     def __str__(self):
         # Header
@@ -88,49 +117,63 @@ class State:
     
     @property
     def shape(self):
-        return copy.deepcopy(self.__shape)
+        r"""(rows, cols) of the cube, read-only"""
+        return self.__shape
 
     @property
     def layout(self):
-        return copy.deepcopy(self.__layout)
+        r"""The layout as a read-only tuple, shared rather than copied"""
+        return self.__layout
 
     def left(self, label):
-        layout = self.layout
-        rows, cols = self.shape
-        head = layout[label * cols]
-        for i in range(cols-1):
-            layout[label * cols + i] = layout[label * cols + i + 1]
-        layout[(label+1) * cols - 1] = head
-        return State(self.shape,layout)
+        layout = self.__layout
+        cols = self.__shape[1]
+        head, tail = label * cols, (label + 1) * cols
+        return State._make(self.__shape, layout[:head] + layout[head + 1:tail]
+                           + layout[head:head + 1] + layout[tail:])
 
     def right(self, label):
-        layout = self.layout
-        rows, cols = self.shape
-        tail = layout[(label + 1) * cols - 1]
-        for i in range(cols - 1, 0, -1):
-            layout[label * cols + i] = layout[label * cols + i - 1]
-        layout[label * cols] = tail
-        return State(self.shape,layout)
+        layout = self.__layout
+        cols = self.__shape[1]
+        head, tail = label * cols, (label + 1) * cols
+        return State._make(self.__shape, layout[:head] + layout[tail - 1:tail]
+                           + layout[head:tail - 1] + layout[tail:])
 
     def up(self, label):
-        layout = self.layout
-        rows, cols = self.shape
-        head = layout[label]
-        for i in range(rows-1):
-            layout[label + cols * i] = layout[label + cols * (i + 1)]
-        layout[label + cols * (rows - 1)] = head
-        return State(self.shape,layout)
+        layout = list(self.__layout)
+        cols = self.__shape[1]
+        column = layout[label::cols]
+        layout[label::cols] = column[1:] + column[:1]
+        return State._make(self.__shape, tuple(layout))
 
     def down(self, label):
-        layout = self.layout
-        rows, cols = self.shape
-        tail = layout[label + cols * (rows - 1)]
-        for i in range(rows - 1, 0, -1):
-            layout[label + cols * i] = layout[label + cols * (i - 1)]
-        layout[label] = tail
-        return State(self.shape,layout)
+        layout = list(self.__layout)
+        cols = self.__shape[1]
+        column = layout[label::cols]
+        layout[label::cols] = column[-1:] + column[:-1]
+        return State._make(self.__shape, tuple(layout))
+
 
 
+@lru_cache(maxsize=None)
+def _get_permutations(rows: int, cols: int) -> Dict[Tuple[int, str], Tuple[int, ...]]:
+    r"""Return the permutation of layout indices applied by every action on a
+    (rows, cols) cube, computed once per shape.
+
+    Each move only relocates cells, so applying it to the identity layout
+    ``0..rows*cols-1`` gives the gather indices: the layout after the move is
+    ``[layout[i] for i in permutation]``.
+    """
+    identity = State._make((rows, cols), tuple(range(rows * cols)))
+    permutations = {}
+    for i in range(rows):
+        permutations[(i, "left")] = identity.left(i).layout
+        permutations[(i, "right")] = identity.right(i).layout
+    for i in range(cols):
+        permutations[(i, "up")] = identity.up(i).layout
+        permutations[(i, "down")] = identity.down(i).layout
+    return permutations
+
 
 class Cube:
     r"""Cube problem class 
@@ -139,6 +182,12 @@ class Cube:
         initial (Optional[State]): the initial state of the Cube
         goal (Union[State, Iterable[State]]): the goal 
             state(s) of the cube.
+
+    Transitions are table driven: every action of a given shape is a fixed
+    permutation of the layout indices, built once per shape and shared by
+    all cubes of that shape. `result_many` and `expand` apply them to many
+    states or many actions at once, including to a NumPy matrix of layouts
+    (one row per state) with a single fancy-indexing gather.
     """
     def __init__(
             self, 
@@ -169,6 +218,13 @@ class Cube:
             raise ValueError
 
         self.__actions = self._get_actions(*self.__initial.shape)
+        permutations = _get_permutations(*self.__initial.shape)
+        self.__gathers = {action: itemgetter(*perm) if len(perm) > 1
+                          else (lambda layout, i=perm[0]: (layout[i],))
+                          for action, perm in permutations.items()}
+        self.__perm_table = np.array(
+            [permutations[tuple(action)] for action in self.__actions],
+            dtype=np.intp).reshape(len(self.__actions), -1)
 
     def __repr__(self) -> str:
         return repr({'initial':repr(self.__initial), 'goal':repr(self.__goal)})
@@ -188,13 +244,16 @@ class Cube:
     
 
     # Observable Environment
+    # States are immutable, so they are handed out without copying
     @property
     def initial(self):
-        return copy.deepcopy(self.__initial)
+        return self.__initial
 
     @property
     def goal(self):
-        return copy.deepcopy(self.__goal)
+        if isinstance(self.__goal, list):
+            return list(self.__goal)
+        return self.__goal
 
     def actions(self, state: State):
         r"""Return the actions that can be executed in the given state. 
@@ -205,7 +264,7 @@ class Cube:
         Returns:
             A list of actions can be executed at the provided state.
         """
-        return copy.deepcopy(self.__actions)
+        return [list(action) for action in self.__actions]
     
     # Transition Model (Deterministic)
     def result(self, source: State, action):
@@ -220,19 +279,51 @@ class Cube:
         Returns:
             the state after taking action from source
         """
-        assert list(action) in self.actions(source), \
+        gather = self.__gathers.get(tuple(action))
+        assert gather is not None, \
             f"{action} is illegal action at {source}"
 
-        label, act = action
-        if act == 'left':
-            result = source.left(label)
-        elif act == 'right':
-            result = source.right(label)
-        elif act == 'down':
-            result = source.down(label)
-        elif act == 'up':
-            result = source.up(label)
-        return result
+        return State._make(source.shape, gather(source.layout))
+
+    def result_many(self, states, action):
+        r"""Apply one action to many states.
+
+        Args:
+            states: a list of States, or a NumPy matrix with one layout
+                per row
+            action: the action to be executed on every state
+
+        Returns:
+            the list of resulting States, or a matrix of the resulting 
+            layouts when given a matrix
+        """
+        if isinstance(states, np.ndarray):
+            perm = self.__perm_table[self._action_index(action)]
+            return states[:, perm]
+        return [self.result(state, action) for state in states]
+
+    def expand(self, state):
+        r"""Apply every action of self.actions() to a state (or to many).
+
+        Args:
+            state: a State, or a NumPy matrix with one layout per row
+
+        Returns:
+            for a State, the list of (action, next_state) pairs in the order
+            of self.actions(); for a matrix of shape (n, rows*cols), the 
+            matrix of shape (n, n_actions, rows*cols) of resulting layouts
+        """
+        if isinstance(state, np.ndarray):
+            return state[:, self.__perm_table]
+        shape, layout = state.shape, state.layout
+        return [(list(action), State._make(shape, self.__gathers[tuple(action)](layout)))
+                for action in self.__actions]
+
+    def _action_index(self, action) -> int:
+        try:
+            return self.__actions.index(list(action))
+        except ValueError:
+            raise AssertionError(f"{action} is illegal action")
 
     def path_cost(self, c: float, state1: State, action, 
             state2: State) -> float:
@@ -291,7 +382,7 @@ class Cube:
         for action in solution:
             if _print: 
                 print(curr, action)
-            if list(action) not in self.actions(curr):
+            if tuple(action) not in self.__gathers:
                 return False, 0
             next = self.result(curr, action)
             cost = self.path_cost(cost, curr, action, next)
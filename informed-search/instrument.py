@@ -0,0 +1,126 @@
+"""
+Instrumentation of the search loops.
+
+Searches take an optional `stats` (utils.SearchStats). When it is None they
+run on the problem, frontier and heuristic exactly as given, so disabled
+instrumentation costs nothing per node. When it is given, `attach` wraps
+them in thin proxies that count expansions and generated nodes, track the
+frontier peak and time the heuristic; the search loop itself is unchanged.
+
+Records (flat dicts of counters plus labels) can be exported for
+reproducible benchmark reports:
+
+    stats = utils.SearchStats()
+    search_engine.breadth_first_graph_search(problem, stats=stats)
+    write_report([{"search": "bfs_graph", **stats.as_dict()}], "report.csv")
+"""
+import csv
+import json
+import time
+
+from functools import wraps
+
+from typing import Callable, Dict, List, Optional
+
+import utils
+
+
+class CountingProblem:
+    r"""Problem proxy counting the nodes expanded and generated"""
+
+    def __init__(self, problem, stats: utils.SearchStats):
+        self.problem = problem
+        self.stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+    def actions(self, state):
+        return self.problem.actions(state)
+
+    def result(self, state, action):
+        return self.problem.result(state, action)
+
+    def expand(self, state):
+        self.stats.expanded += 1
+        if hasattr(self.problem, "expand"):
+            successors = self.problem.expand(state)
+        else:
+            successors = [(action, self.problem.result(state, action))
+                          for action in self.problem.actions(state)]
+        self.stats.generated += len(successors)
+        return successors
+
+
+class CountingFrontier:
+    r"""Frontier proxy tracking its peak size"""
+
+    def __init__(self, frontier, stats: utils.SearchStats):
+        self.frontier = frontier
+        self.stats = stats
+
+    def __len__(self):
+        return len(self.frontier)
+
+    def __contains__(self, node):
+        return node in self.frontier
+
+    def push(self, priority, node):
+        self.frontier.push(priority, node)
+        if len(self.frontier) > self.stats.frontier_peak:
+            self.stats.frontier_peak = len(self.frontier)
+
+    def pop(self):
+        return self.frontier.pop()
+
+
+def timed_heuristic(heuristic: Callable, stats: utils.SearchStats) -> Callable:
+    r"""Wrap heuristic to count its calls and the time spent in it. The
+    wrapper keeps its stats, so that incremental.evaluator counts and times
+    the delta evaluations it makes in place of calls"""
+    @wraps(heuristic)
+    def timed(problem, state):
+        start = time.perf_counter()
+        h = heuristic(problem, state)
+        stats.heuristic_time += time.perf_counter() - start
+        stats.heuristic_calls += 1
+        return h
+    timed.stats = stats
+    return timed
+
+
+def attach(stats: Optional[utils.SearchStats], problem, frontier=None,
+        heuristic: Optional[Callable] = None):
+    r"""
+    Returns (problem, frontier, heuristic), wrapped to fill in stats, or
+    unchanged when stats is None.
+    """
+    if stats is None:
+        return problem, frontier, heuristic
+    problem = CountingProblem(problem, stats)
+    if frontier is not None:
+        frontier = CountingFrontier(frontier, stats)
+    if heuristic is not None:
+        heuristic = timed_heuristic(heuristic, stats)
+    return problem, frontier, heuristic
+
+
+def finish(stats: utils.SearchStats, start: float):
+    r"""Record the wall time once a search returns"""
+    stats.wall_time += time.time() - start
+    stats.peak_nodes = max(stats.peak_nodes, stats.frontier_peak)
+
+
+def write_report(records: List[Dict], path: str):
+    r"""Write records to path as JSON, or as CSV if path ends with .csv"""
+    if path.endswith(".csv"):
+        fields = []
+        for record in records:
+            fields += [key for key in record if key not in fields]
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(records)
+    else:
+        with open(path, "w") as f:
+            json.dump(records, f, indent=2)
@@ -0,0 +1,227 @@
+"""
+Hash-distributed A* (HDA*) for cube.Cube across worker processes.
+
+Every state is owned by exactly one worker, chosen by a hash of its layout
+that is stable across processes. A worker expands the best node of its own
+open list and sends each child to the child's owner, batching the nodes per
+destination. Since a state is only ever opened and closed by its owner,
+duplicate detection stays local and needs no locks.
+
+The first goal found gives an incumbent cost U shared by all workers; nodes
+with f >= U are pruned. The search ends once every worker is idle (its open
+list is empty or only holds f >= U) and no batch is in flight, which the
+parent detects by comparing the counts of nodes sent and received under the
+same lock the workers use to report idleness. With an admissible heuristic
+the incumbent is then optimal.
+
+    solution = hda_star_search(problem, n_workers=8)
+"""
+import math
+import time
+import zlib
+import queue
+import multiprocessing as mp
+
+from typing import Callable, Optional
+
+import cube
+import utils
+from ps1 import heuristic_func
+
+
+# seconds between checks on the workers while waiting for their results
+RESULT_TIMEOUT = 1.0
+
+
+def owner(state: cube.State, n_workers: int) -> int:
+    r"""Return the worker owning state. Python's hash() of strings differs
+    between processes, so a CRC of the layout is used instead."""
+    return zlib.crc32(repr(state.layout).encode()) % n_workers
+
+
+class _Shared:
+    r"""Counters shared by the parent and the workers, guarded by one lock"""
+
+    def __init__(self, ctx, n_workers):
+        self.lock = ctx.Lock()
+        self.sent = ctx.Value('q', 0, lock=False)
+        self.received = ctx.Value('q', 0, lock=False)
+        self.idle = ctx.Array('b', [0] * n_workers, lock=False)
+        self.incumbent = ctx.Value('d', math.inf, lock=False)
+        self.done = ctx.Event()
+
+
+def _worker(rank, n_workers, initial, goal, heuristic, batch_size,
+        inboxes, results, shared):
+    problem = cube.Cube(initial=initial, goal=goal)
+    inbox = inboxes[rank]
+    open_list = utils.PriorityQueue()
+    closed = {}
+    outboxes = [[] for _ in range(n_workers)]
+    expanded = generated = 0
+
+    def flush(dest):
+        batch = outboxes[dest]
+        if batch:
+            with shared.lock:
+                shared.sent.value += len(batch)
+            inboxes[dest].put(batch)
+            outboxes[dest] = []
+
+    def receive(batch):
+        with shared.lock:
+            shared.received.value += len(batch)
+            shared.idle[rank] = 0
+        for g, h, path, state in batch:
+            # a node's act holds its whole action path, since the parents
+            # live in other processes
+            node = utils.Node(None, path, state, g, h)
+            if closed.get(state, math.inf) <= g:
+                continue
+            if node in open_list:
+                if open_list[node] > node.get_fn():
+                    open_list.update(node.get_fn(), node)
+            else:
+                open_list.push(node.get_fn(), node)
+
+    if owner(initial, n_workers) == rank:
+        with shared.lock:
+            shared.sent.value += 1
+        receive([(0, heuristic(problem, initial), (), initial)])
+
+    while not shared.done.is_set():
+        try:
+            while True:
+                receive(inbox.get_nowait())
+        except queue.Empty:
+            pass
+
+        incumbent = shared.incumbent.value
+        if not len(open_list) or open_list.top()[0] >= incumbent:
+            for dest in range(n_workers):
+                flush(dest)
+            with shared.lock:
+                shared.idle[rank] = 1
+            try:
+                receive(inbox.get(timeout=0.01))
+            except queue.Empty:
+                pass
+            continue
+
+        node = open_list.pop()
+        state = node.state
+        if closed.get(state, math.inf) <= node.g_n:
+            continue
+        closed[state] = node.g_n
+        if problem.goal_test(state):
+            with shared.lock:
+                if node.g_n < shared.incumbent.value:
+                    shared.incumbent.value = node.g_n
+                    results.put(("solution", node.g_n, node.act))
+            continue
+
+        expanded += 1
+        for index, (action, child) in enumerate(problem.expand(state)):
+            generated += 1
+            g = problem.path_cost(node.g_n, state, action, child)
+            h = heuristic(problem, child)
+            if g + h >= incumbent:
+                continue
+            outboxes[owner(child, n_workers)].append((g, h, node.act + (index,), child))
+        for dest in range(n_workers):
+            if len(outboxes[dest]) >= batch_size:
+                flush(dest)
+    results.put(("stats", expanded, generated, len(closed)))
+
+
+def _check_workers(workers) -> None:
+    r"""Raise if a worker died, e.g. killed or out of memory, instead of
+    waiting for messages it will never send"""
+    for worker in workers:
+        if worker.exitcode not in (None, 0):
+            raise RuntimeError(f"search worker {worker.name} died "
+                               f"with exit code {worker.exitcode}")
+
+
+def hda_star_search(problem: cube.Cube, n_workers: int = 0,
+        heuristic: Optional[Callable] = None, batch_size: int = 64,
+        stats: Optional[utils.SearchStats] = None):
+    r"""
+    Hash-distributed A* finds an optimal solution with one A* per worker
+    process, each owning the states that hash to it. By default, fail is
+    True and returns False.
+
+    Args:
+        problem (cube.Cube): Cube instance with a single goal state
+        n_workers (int): the number of worker processes, all cores if 0
+        heuristic (Callable[[cube.Cube, cube.State], float]): admissible
+            heuristic, heuristic_func by default; it is sent to the workers
+            so it has to be picklable
+        batch_size (int): nodes buffered per destination before sending
+        stats (utils.SearchStats): filled in with the counters summed over
+            the workers (peak_nodes is the total size of the closed lists)
+
+    Returns:
+        solution (List[Action]): the action sequence
+    """
+    if isinstance(problem.goal, list):
+        raise ValueError("hda_star_search needs a single goal state")
+    n_workers = n_workers or mp.cpu_count()
+    heuristic = heuristic or heuristic_func
+    stats = stats if stats is not None else utils.SearchStats()
+    start = time.time()
+
+    ctx = mp.get_context()
+    shared = _Shared(ctx, n_workers)
+    inboxes = [ctx.Queue() for _ in range(n_workers)]
+    results = ctx.Queue()
+    workers = [ctx.Process(target=_worker, daemon=True,
+                           args=(rank, n_workers, problem.initial, problem.goal,
+                                 heuristic, batch_size, inboxes, results, shared))
+               for rank in range(n_workers)]
+    for worker in workers:
+        worker.start()
+
+    best = None
+    try:
+        while True:
+            time.sleep(0.005)
+            _check_workers(workers)
+            if not any(worker.is_alive() for worker in workers):
+                raise RuntimeError("all search workers exited early")
+            with shared.lock:
+                finished = all(shared.idle) and shared.sent.value == shared.received.value
+            if finished:
+                shared.done.set()
+                break
+        n_stats = 0
+        while n_stats < n_workers:
+            try:
+                message = results.get(timeout=RESULT_TIMEOUT)
+            except queue.Empty:
+                # workers exit once their stats are sent, so a missing
+                # report with no worker left to send it will never come
+                _check_workers(workers)
+                if not any(worker.is_alive() for worker in workers):
+                    raise RuntimeError("search workers exited without reporting")
+                continue
+            if message[0] == "solution":
+                if best is None or message[1] < best[0]:
+                    best = message[1:]
+            else:
+                n_stats += 1
+                stats.expanded += message[1]
+                stats.generated += message[2]
+                stats.peak_nodes += message[3]
+    finally:
+        shared.done.set()
+        for worker in workers:
+            worker.join(timeout=1)
+            if worker.is_alive():
+                worker.terminate()
+
+    stats.wall_time = time.time() - start
+    if best is None:
+        return False
+    actions = problem.actions(problem.initial)
+    return [actions[index] for index in best[1]]
@@ -0,0 +1,227 @@
+"""
+Pattern databases for the Cube puzzle.
+
+A pattern keeps a subset of the goal colours and masks every other cell out.
+Abstract layouts are enumerated once by a backward breadth first search from
+the abstract goal (every move has an inverse, so the move graph is
+undirected), and the distance of every reachable abstract layout is an
+admissible estimate of the moves left. Distances are stored on disk as two
+sorted `.npy` arrays (packed layout keys and uint16 distances) which are
+memory-mapped at search time and probed with a binary search.
+
+Only the largest of several pattern distances is admissible: one rotation
+moves the tiles of several patterns at once, so their sum may overestimate.
+
+Example:
+    dbs = build_databases(problem.goal, disjoint_patterns(problem.goal, 2),
+                          "pdb/cube4")
+    h = PatternDatabaseHeuristic(dbs)
+    astar_search(problem, heuristic=h)
+"""
+import os
+import json
+import math
+
+from collections import Counter, deque
+from operator import itemgetter
+from typing import Iterable, List, Sequence
+
+import numpy as np
+
+import cube
+
+# dtype of the stored distances, part of the metadata so that tables of
+# another dtype are rebuilt
+DIST_DTYPE = np.uint16
+# patterns with more abstract layouts than this are refused rather than
+# enumerated, the table of each taking about 200 bytes per layout to build
+MAX_STATES = 1 << 21
+
+
+class PatternDatabase:
+    r"""Distance table of one abstraction of the cube
+
+    Args:
+        shape (Sequence[int]): (rows, cols) of the cube
+        goal (Sequence): the goal layout the distances are measured to
+        colours (Sequence): the colours kept by the pattern, every other
+            colour is masked out
+        keys (np.ndarray): sorted packed abstract layouts (uint64)
+        distances (np.ndarray): the number of moves from each abstract
+            layout in `keys` to the abstract goal (DIST_DTYPE)
+    """
+
+    def __init__(self, shape: Sequence[int], goal: Sequence, colours: Sequence,
+            keys: np.ndarray, distances: np.ndarray):
+        self.shape = tuple(shape)
+        self.goal = list(goal)
+        self.colours = list(colours)
+        self.keys = keys
+        self.distances = distances
+        # masked cells pack to 0, kept colours to 1..len(colours)
+        self.codes = {colour: i + 1 for i, colour in enumerate(self.colours)}
+        self.base = len(self.colours) + 1
+        self.weights = [self.base ** i for i in range(self.shape[0] * self.shape[1])]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __repr__(self) -> str:
+        return f"PatternDatabase(shape={self.shape}, colours={self.colours}, size={len(self)})"
+
+    def pack(self, layout: Iterable) -> int:
+        r"""Pack the abstraction of a layout into an integer key"""
+        codes = self.codes
+        return sum(codes.get(colour, 0) * weight
+                   for colour, weight in zip(layout, self.weights))
+
+    def lookup(self, state: cube.State) -> float:
+        r"""Return the pattern distance of a state, inf if it cannot reach the
+        goal abstraction"""
+        key = self.pack(state.layout)
+        i = int(np.searchsorted(self.keys, key))
+        if i == len(self.keys) or int(self.keys[i]) != key:
+            return math.inf
+        return float(self.distances[i])
+
+    @classmethod
+    def build(cls, goal: cube.State, colours: Sequence,
+            max_states: int = MAX_STATES) -> "PatternDatabase":
+        r"""Enumerate the abstract layouts of a pattern by backward BFS from
+        the goal.
+
+        Args:
+            goal (cube.State): the goal state of the problem
+            colours (Sequence): the goal colours kept by the pattern
+            max_states (int): refuse patterns that may have more abstract
+                layouts than this, see `n_abstract_states`
+
+        Returns:
+            the PatternDatabase of the pattern, held in memory
+        """
+        rows, cols = goal.shape
+        codes = {colour: i + 1 for i, colour in enumerate(colours)}
+        base = len(colours) + 1
+        if base ** (rows * cols) > np.iinfo(np.uint64).max:
+            raise ValueError("pattern is too large to pack into 64 bits")
+        n_states = n_abstract_states(goal, colours)
+        if n_states > max_states:
+            raise ValueError(f"pattern has up to {n_states} abstract layouts, "
+                             f"more than {max_states}")
+        weights = [base ** i for i in range(rows * cols)]
+        gathers = [itemgetter(*perm) if len(perm) > 1 else (lambda l, i=perm[0]: (l[i],))
+                   for perm in cube._get_permutations(rows, cols).values()]
+
+        start = tuple(codes.get(colour, 0) for colour in goal.layout)
+        distances = {start: 0}
+        frontier = deque([start])
+        while frontier:
+            layout = frontier.popleft()
+            dist = distances[layout] + 1
+            for gather in gathers:
+                next_layout = gather(layout)
+                if next_layout not in distances:
+                    distances[next_layout] = dist
+                    frontier.append(next_layout)
+
+        depth = max(distances.values())
+        if depth > np.iinfo(DIST_DTYPE).max:
+            raise ValueError(f"pattern depth {depth} does not fit in {np.dtype(DIST_DTYPE).name}")
+        keys = np.fromiter((sum(c * w for c, w in zip(layout, weights))
+                            for layout in distances), dtype=np.uint64, count=len(distances))
+        dists = np.fromiter(distances.values(), dtype=DIST_DTYPE, count=len(distances))
+        order = np.argsort(keys)
+        return cls(goal.shape, goal.layout, colours, keys[order], dists[order])
+
+    def save(self, path: str):
+        r"""Write the table to `path`.keys.npy / .dist.npy / .json"""
+        np.save(path + ".keys.npy", np.asarray(self.keys))
+        np.save(path + ".dist.npy", np.asarray(self.distances))
+        with open(path + ".json", "w") as f:
+            json.dump(self.meta(), f)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "PatternDatabase":
+        r"""Load a table written by `save`, memory-mapped by default"""
+        with open(path + ".json", "r") as f:
+            meta = json.load(f)
+        mode = "r" if mmap else None
+        keys = np.load(path + ".keys.npy", mmap_mode=mode)
+        distances = np.load(path + ".dist.npy", mmap_mode=mode)
+        return cls(meta["shape"], meta["goal"], meta["colours"], keys, distances)
+
+    def meta(self) -> dict:
+        r"""What the table was built for, as stored next to it on disk"""
+        return {"shape": list(self.shape), "goal": self.goal, "colours": self.colours,
+                "dtype": np.dtype(DIST_DTYPE).name}
+
+
+class PatternDatabaseHeuristic:
+    r"""Heuristic combining several pattern databases, usable wherever
+    `heuristic_func(problem, state)` is.
+
+    Args:
+        databases (List[PatternDatabase]): the databases to consult
+        combine (str): "max" takes the largest distance and is admissible.
+            "add" sums them and is NOT admissible: one rotation can move
+            tiles of several patterns, so the sum may overestimate and A*
+            may return a longer path, in exchange for fewer expansions.
+    """
+
+    def __init__(self, databases: List[PatternDatabase], combine: str = "max"):
+        if combine not in ("max", "add"):
+            raise ValueError(f"unknown combine rule {combine}")
+        self.databases = databases
+        self.combine = max if combine == "max" else sum
+        self.admissible = combine == "max"
+
+    def __call__(self, problem: cube.Cube, state: cube.State) -> float:
+        return self.combine(db.lookup(state) for db in self.databases)
+
+
+def n_abstract_states(goal: cube.State, colours: Sequence) -> int:
+    r"""Return the number of arrangements of a pattern's abstract goal, the
+    kept colours and the masked cells, an upper bound on its table size"""
+    counts = Counter(colour if colour in colours else None for colour in goal.layout)
+    n_states = math.factorial(len(goal.layout))
+    for count in counts.values():
+        n_states //= math.factorial(count)
+    return n_states
+
+
+def disjoint_patterns(goal: cube.State, group_size: int) -> List[List]:
+    r"""Split the goal colours into disjoint groups of `group_size` colours"""
+    colours = sorted(set(goal.layout), key=str)
+    return [colours[i:i + group_size] for i in range(0, len(colours), group_size)]
+
+
+def build_databases(goal: cube.State, patterns: Iterable[Sequence],
+        directory: str, mmap: bool = True,
+        max_states: int = MAX_STATES) -> List[PatternDatabase]:
+    r"""
+    Build (or reuse) one database per pattern under `directory` and load them.
+
+    Args:
+        goal (cube.State): the goal state of the problem
+        patterns (Iterable[Sequence]): the colours kept by each database
+        directory (str): where the tables are stored
+        mmap (bool): memory-map the tables instead of reading them in
+        max_states (int): refuse patterns with more abstract layouts, see
+            `PatternDatabase.build`
+
+    Returns:
+        the list of loaded PatternDatabase
+    """
+    os.makedirs(directory, exist_ok=True)
+    databases = []
+    for i, colours in enumerate(patterns):
+        path = os.path.join(directory, f"pdb{i}")
+        meta = None
+        if os.path.exists(path + ".json"):
+            with open(path + ".json", "r") as f:
+                meta = json.load(f)
+        if meta != {"shape": list(goal.shape), "goal": list(goal.layout),
+                    "colours": list(colours), "dtype": np.dtype(DIST_DTYPE).name}:
+            PatternDatabase.build(goal, colours, max_states).save(path)
+        databases.append(PatternDatabase.load(path, mmap=mmap))
+    return databases
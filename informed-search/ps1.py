@@ -8,6 +8,9 @@ import timeout_decorator
 
 import utils
 import cube
+import instrument
+import incremental
+import search_engine
 
 # For following test cases
 def wrap_test(func):
@@ -39,69 +42,13 @@ def bfs_tree_search(num_mis, num_can):
     Returns:
         solution (List): the action sequence
     """
-    
-    fail = True
-    solution = []
-    
-    """ YOUR CODE HERE """
-    # Need to track 2 things
-    # - state tuple (m, c, boat), where m is missionary on start bank, c is cannibal on start bank,
-    # and boat = 0 when boat at start and = 1 when boat at end
-    # - action tuple (m, c), where m is missionary on boat, and c is cannibal on boat
-    start_state_tuple = (num_mis, num_can, 0)
-    goal_state = (0, 0, 1)
-    # Generate all possible action tuples, regardless of m and c constraints
-    # Boat can only hold 1 or 2 people
-    possible_action_tuples = [[0, 1], [0, 2], [1, 0], [2, 0], [1, 1]]
-
-    # frontier contains nodes --> tuples of state and solution to reach there
-    start_node = utils.Node(None, None, start_state_tuple, 0, 0)
-    # TODO: Change to prio queue
-    frontier = utils.PriorityQueue()
-    frontier.push(start_node.g_n, start_node)
-    while len(frontier) != 0:
-        print(len(frontier))
-        curr_node = frontier.pop()
-        curr_state = curr_node.state
-        # Check if state is goal state
-        if curr_state == goal_state:
-            trace_act = curr_node.act
-            while trace_act != None:
-                solution.append(trace_act)
-                curr_node = curr_node.parent
-                trace_act = curr_node.act
-            fail = False
-            solution.reverse()
-            break
-        multiplier = -1 if curr_node.state[2] == 0 else 1
-        next_boat_pos = 1 if curr_node.state[2] == 0 else 0
-        # Calculate all possible actions from this state
-        for action in possible_action_tuples:
-            # Calculate m and c on start side of river
-            next_mis = curr_state[0] + action[0] * multiplier
-            next_can = curr_state[1] + action[1] * multiplier
-            if ((next_can > next_mis and next_mis > 0)
-            or next_can < 0 or next_mis < 0
-            or next_can > num_can or next_mis > num_mis):
-                continue
-
-            # Calculate m and c on other side of the river
-            next_mis_other_bank = num_mis - next_mis
-            next_can_other_bank = num_can - next_can
-            if ((next_can_other_bank > next_mis_other_bank and next_mis_other_bank > 0)
-            or next_can_other_bank < 0 or next_mis_other_bank < 0
-            or next_can_other_bank > num_can or next_mis_other_bank > num_mis):
-                continue
 
-            # State falls within m and c constraints
-            next_state = (next_mis, next_can, next_boat_pos)
-            print(next_state)
-            next_node = utils.Node(curr_node, action, next_state, curr_node.g_n + 1, 0)
-            frontier.push(next_node.g_n, next_node)
+    """ YOUR CODE HERE """
+    # the successor generation lives in search_engine.MissionariesCannibals
+    problem = search_engine.MissionariesCannibals(num_mis, num_can)
+    solution = search_engine.breadth_first_tree_search(problem)
     """ END YOUR CODE HERE """
-    
-    if fail:
-        return False
+
     return solution
 
 def dfs_tree_search(num_mis, num_can):
@@ -129,67 +76,12 @@ def dfs_tree_search(num_mis, num_can):
         solution (List): the action sequence
     """
 
-    fail = True
-    solution = []
-    
     """ YOUR CODE HERE """
-    # Need to track 2 things
-    # - state tuple (m, c, boat), where m is missionary on start bank, c is cannibal on start bank,
-    # and boat = 0 when boat at start and = 1 when boat at end
-    # - action tuple (m, c), where m is missionary on boat, and c is cannibal on boat
-    start_state_tuple = (num_mis, num_can, 0)
-    goal_state = (0, 0, 1)
-    # Generate all possible action tuples, regardless of m and c constraints
-    # Boat can only hold 1 or 2 people
-    possible_action_tuples = [[0, 1], [0, 2], [1, 0], [2, 0], [1, 1]]
-
-    # frontier contains nodes --> tuples of state and solution to reach there
-    start_node = utils.Node(None, None, start_state_tuple, 0, 0)
-    stack = utils.Stack()
-    stack.push(start_node)
-    
-    while not stack.is_empty():
-        curr_node = stack.pop()
-        curr_state = curr_node.state
-        print(curr_state)
-        # Check if state is goal state
-        if curr_state == goal_state:
-            trace_act = curr_node.act
-            while trace_act != None:
-                solution.append(trace_act)
-                curr_node = curr_node.parent
-                trace_act = curr_node.act
-            fail = False
-            solution.reverse()
-            break
-        multiplier = -1 if curr_node.state[2] == 0 else 1
-        next_boat_pos = 1 if curr_node.state[2] == 0 else 0
-        # Calculate all possible actions from this state and add to stack
-        for action in possible_action_tuples:
-            # Calculate m and c on start side of river
-            next_mis = curr_state[0] + action[0] * multiplier
-            next_can = curr_state[1] + action[1] * multiplier
-            if ((next_can > next_mis and next_mis > 0)
-            or next_can < 0 or next_mis < 0
-            or next_can > num_can or next_mis > num_mis):
-                continue
-
-            # Calculate m and c on other side of the river
-            next_mis_other_bank = num_mis - next_mis
-            next_can_other_bank = num_can - next_can
-            if ((next_can_other_bank > next_mis_other_bank and next_mis_other_bank > 0)
-            or next_can_other_bank < 0 or next_mis_other_bank < 0
-            or next_can_other_bank > num_can or next_mis_other_bank > num_mis):
-                continue
-
-            # State falls within m and c constraints
-            next_state = (next_mis, next_can, next_boat_pos)
-            next_node = utils.Node(curr_node, action, next_state, curr_node.g_n + 1, 0)
-            stack.push(next_node)
+    # the successor generation lives in search_engine.MissionariesCannibals
+    problem = search_engine.MissionariesCannibals(num_mis, num_can)
+    solution = search_engine.depth_first_tree_search(problem)
     """ END YOUR CODE HERE """
-    
-    if fail:
-        return False
+
     return solution
 
 # Test cases for Task 1
@@ -248,11 +140,11 @@ def heuristic_func(problem: cube.Cube, state) -> float:
     """ YOUR CODE HERE """
     # Calculate how many tiles are not in the right place, and divide
     # that number by the max(rows, columns)
-    shape = goals.shape
-    max_dim = max(shape)
+    goal_layout, layout = goals.layout, state.layout
+    max_dim = max(goals.shape)
 
-    for i in range(len(goals.layout)):
-        if goals.layout[i] == state.layout[i]:
+    for i in range(len(goal_layout)):
+        if goal_layout[i] == layout[i]:
             continue
         h_n += 1
 
@@ -261,13 +153,38 @@ def heuristic_func(problem: cube.Cube, state) -> float:
 
     return h_n
 
-def astar_search(problem: cube.Cube):
+@incremental.delta_for(heuristic_func, scale=lambda goal: max(goal.shape))
+def heuristic_delta(goal, parent, child, cells) -> int:
+    r"""
+    Change of the misplaced tiles heuristic_func counts between a state and
+    its child, over the cells the move changed
+
+    Args:
+        goal (cube.State): the goal state
+        parent (cube.State): the state before the move
+        child (cube.State): the state after the move
+        cells (Tuple[int]): the layout indices the move changed
+
+    Returns:
+        delta (int): (heuristic_func(child) - heuristic_func(parent)) *
+            max(goal.shape)
+    """
+    goal_layout, before, after = goal.layout, parent.layout, child.layout
+    delta = 0
+    for i in cells:
+        delta += (after[i] != goal_layout[i]) - (before[i] != goal_layout[i])
+    return delta
+
+def astar_search(problem: cube.Cube, heuristic=None, stats=None):
     r"""
     A* Search finds the solution to reach the goal from the initial.
     By default, fail is True and returns False.
     
     Args:
         problem (cube.Cube): Cube instance
+        heuristic (Callable[[cube.Cube, cube.State], float]): the heuristic
+            to search with, heuristic_func by default
+        stats (utils.SearchStats): filled in with the search counters
 
     Returns:
         solution (List[Action]): the action sequence
@@ -276,14 +193,24 @@ def astar_search(problem: cube.Cube):
     solution = []
     
     """ YOUR CODE HERE """
-    start_node = utils.Node(None, None, problem.initial, 0, heuristic_func(problem, problem.initial))
-    frontier = utils.PriorityQueue()
+    if heuristic is None:
+        heuristic = heuristic_func
+    start = time.time()
+    problem, frontier, heuristic = instrument.attach(stats, problem, utils.PriorityQueue(),
+        heuristic)
+    child_h = incremental.evaluator(problem, heuristic)
+    start_node = utils.Node(None, None, problem.initial, 0, heuristic(problem, problem.initial))
     frontier.push(start_node.get_fn(), start_node)
     visited = set()
     visited.add(start_node)
+    if stats is not None:
+        # states expanded so far, only to count duplicates
+        expanded = set()
     while len(frontier) != 0:
         curr_node = frontier.pop()
         curr_state = curr_node.state
+        if stats is not None:
+            expanded.add(curr_state)
         # Check if state is goal state
         if problem.goal_test(curr_state):
             trace_act = curr_node.act
@@ -295,15 +222,20 @@ def astar_search(problem: cube.Cube):
             solution.reverse()
             break
         # Calculate all possible actions from this state
-        for action in problem.actions(curr_state):
-            next_state = problem.result(curr_state, action)
+        for action, next_state in problem.expand(curr_state):
             if next_state in visited:
                 continue
             next_node = utils.Node(curr_node, action, next_state,
-                problem.path_cost(curr_node.g_n, curr_state, action, next_state), heuristic_func(problem, next_state))
+                problem.path_cost(curr_node.g_n, curr_state, action, next_state),
+                child_h(curr_state, curr_node.h_n, action, next_state))
+            if stats is not None and (next_state in expanded or next_node in frontier):
+                # pushed again: its stale entries are expanded again too
+                stats.duplicates += 1
             frontier.push(next_node.get_fn(), next_node)
         visited.add(curr_node)
     """ END YOUR CODE HERE """
+    if stats is not None:
+        instrument.finish(stats, start)
     
     if fail:
         return False
@@ -351,7 +283,8 @@ cube4 = {'input_dict':{"initial": {'shape': [3, 4], 'layout': [1, 1, 9, 0,
     9, 2, 1, 0, 9, 2, 1, 0, 9]}}, 'answer': {"solution": [[3, "up"], 
     [1, "down"], [2, "left"], [0, "right"]], "cost": 4}}
 
-print('cube1: ' + test_astar(cube1))
-print('cube2: ' + test_astar(cube2))
-print('cube3: ' + test_astar(cube3))
-print('cube4: ' + test_astar(cube4))
\ No newline at end of file
+if __name__ == "__main__":
+    print('cube1: ' + test_astar(cube1))
+    print('cube2: ' + test_astar(cube2))
+    print('cube3: ' + test_astar(cube3))
+    print('cube4: ' + test_astar(cube4))
@@ -0,0 +1,314 @@
+"""
+Problem-agnostic search engine.
+
+A search is a problem plus a frontier strategy. Any object with the problem
+protocol below can be searched; `cube.Cube` already has it and
+`MissionariesCannibals` wraps the river-crossing puzzle.
+
+    problem.initial                         the initial state
+    problem.actions(state)                  the actions available in state
+    problem.result(state, action)           the state action leads to
+    problem.goal_test(state)                whether state is a goal
+    problem.path_cost(c, state1, action, state2)
+                                            the cost of reaching state2
+
+If the problem also has `expand(state)` returning (action, next_state)
+pairs, as `cube.Cube` does, the engine uses it to generate all successors
+in one call.
+
+Frontiers share the `utils.PriorityQueue` interface (push(priority, node),
+pop(), len()); each strategy only uses the priority it needs:
+
+    FIFOFrontier        deque, O(1), breadth first
+    LIFOFrontier        list, O(1), depth first
+    utils.PriorityQueue binary heap, O(log n), uniform cost / A*
+    BucketFrontier      one FIFO per integer priority, O(1) for unit costs
+
+Every search takes an optional `stats` (utils.SearchStats) to fill in; see
+the instrument module.
+"""
+import time
+
+from collections import deque
+from typing import Callable, Optional
+
+import utils
+import instrument
+import incremental
+
+
+class Problem:
+    r"""Base class of a search problem, to be subclassed
+
+    Args:
+        initial: the initial state
+        goal: the goal state
+    """
+    def __init__(self, initial, goal=None):
+        self.initial = initial
+        self.goal = goal
+
+    def actions(self, state):
+        raise NotImplementedError
+
+    def result(self, state, action):
+        raise NotImplementedError
+
+    def goal_test(self, state) -> bool:
+        return state == self.goal
+
+    def path_cost(self, c: float, state1, action, state2) -> float:
+        """Every action costs 1 by default"""
+        return c + 1
+
+
+class MissionariesCannibals(Problem):
+    r"""Missionaries and cannibals problem
+
+    A state is a tuple (m, c, boat): the missionaries and cannibals on the
+    starting bank, and the side of the boat (0 at the start, 1 across). An
+    action [m, c] carries m missionaries and c cannibals across in the boat,
+    which holds 1 or 2 people. Cannibals may never outnumber the
+    missionaries on a bank that has any.
+
+    Args:
+        num_mis: the number of the Missionaries
+        num_can: the number of the Cannibals
+    """
+    BOAT_LOADS = [[0, 1], [0, 2], [1, 0], [2, 0], [1, 1]]
+
+    def __init__(self, num_mis: int, num_can: int):
+        super().__init__((num_mis, num_can, 0), (0, 0, 1))
+        self.num_mis = num_mis
+        self.num_can = num_can
+
+    def _is_safe(self, mis: int, can: int) -> bool:
+        return 0 <= mis <= self.num_mis and 0 <= can <= self.num_can \
+            and not (can > mis > 0)
+
+    def actions(self, state):
+        mis, can, boat = state
+        sign = -1 if boat == 0 else 1
+        actions = []
+        for load in self.BOAT_LOADS:
+            next_mis = mis + load[0] * sign
+            next_can = can + load[1] * sign
+            if self._is_safe(next_mis, next_can) and \
+                    self._is_safe(self.num_mis - next_mis, self.num_can - next_can):
+                actions.append(list(load))
+        return actions
+
+    def result(self, state, action):
+        mis, can, boat = state
+        sign = -1 if boat == 0 else 1
+        return (mis + action[0] * sign, can + action[1] * sign, 1 - boat)
+
+
+class FIFOFrontier:
+    r"""First-in first-out frontier, priorities are ignored"""
+    def __init__(self):
+        self.queue = deque()
+
+    def __len__(self):
+        return len(self.queue)
+
+    def push(self, priority, node):
+        self.queue.append(node)
+
+    def pop(self):
+        return self.queue.popleft()
+
+
+class LIFOFrontier:
+    r"""Last-in first-out frontier, priorities are ignored"""
+    def __init__(self):
+        self.stack = []
+
+    def __len__(self):
+        return len(self.stack)
+
+    def push(self, priority, node):
+        self.stack.append(node)
+
+    def pop(self):
+        return self.stack.pop()
+
+
+class BucketFrontier:
+    r"""Priority frontier for small integer priorities, e.g. unit-cost path
+    lengths: one FIFO bucket per priority and a cursor on the lowest
+    non-empty bucket, so push and pop are O(1) amortised."""
+    def __init__(self):
+        self.buckets = []
+        self.cursor = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, priority, node):
+        priority = int(priority)
+        while len(self.buckets) <= priority:
+            self.buckets.append(deque())
+        self.buckets[priority].append(node)
+        self.cursor = min(self.cursor, priority)
+        self.size += 1
+
+    def pop(self):
+        if not self.size:
+            raise Exception("Empty Bucket Frontier")
+        while not self.buckets[self.cursor]:
+            self.cursor += 1
+        self.size -= 1
+        return self.buckets[self.cursor].popleft()
+
+
+def solution(node: utils.Node):
+    r"""Return the actions leading from the root to node"""
+    actions = []
+    while node.act is not None:
+        actions.append(node.act)
+        node = node.parent
+    actions.reverse()
+    return actions
+
+
+def expand(problem, node: utils.Node, child_h: Optional[Callable] = None):
+    r"""Yield the child nodes of node, with h from child_h, an
+    incremental.evaluator of the problem (0 if None)"""
+    state = node.state
+    if hasattr(problem, "expand"):
+        successors = problem.expand(state)
+    else:
+        successors = ((action, problem.result(state, action))
+                      for action in problem.actions(state))
+    for action, child in successors:
+        h = child_h(state, node.h_n, action, child) if child_h else 0
+        yield utils.Node(node, action, child,
+                         problem.path_cost(node.g_n, state, action, child), h)
+
+
+def tree_search(problem, frontier, heuristic: Optional[Callable] = None,
+        stats: Optional[utils.SearchStats] = None):
+    r"""
+    Tree search pushes a child node for every successor, revisiting states
+    reached along different paths. The frontier decides the order in which
+    nodes are explored; they are pushed with priority f = g + h.
+    By default, fail is True and returns False.
+
+    Args:
+        problem: a problem following the protocol of this module
+        frontier: an empty frontier
+        heuristic (Callable[[problem, state], float]): h, 0 by default
+        stats (utils.SearchStats): filled in with the search counters
+
+    Returns:
+        solution (List): the action sequence
+    """
+    if stats is not None:
+        start = time.time()
+        problem, frontier, heuristic = instrument.attach(stats, problem, frontier, heuristic)
+        result = tree_search(problem, frontier, heuristic)
+        instrument.finish(stats, start)
+        return result
+
+    h = heuristic(problem, problem.initial) if heuristic else 0
+    child_h = incremental.evaluator(problem, heuristic)
+    root = utils.Node(None, None, problem.initial, 0, h)
+    frontier.push(root.get_fn(), root)
+    while len(frontier):
+        node = frontier.pop()
+        if problem.goal_test(node.state):
+            return solution(node)
+        for child in expand(problem, node, child_h):
+            frontier.push(child.get_fn(), child)
+    return False
+
+
+def graph_search(problem, frontier, heuristic: Optional[Callable] = None,
+        early_goal_test: bool = False, stats: Optional[utils.SearchStats] = None):
+    r"""
+    Graph search is tree search that only revisits a state when it reaches
+    it more cheaply. A table keyed by state holds the best node reached for
+    every state, whether it is still on the frontier or already explored,
+    so a duplicate successor is detected with one lookup when it is
+    generated, and dropped unless its path is cheaper. Nodes superseded
+    that way are skipped when popped. By default, fail is True and returns
+    False.
+
+    Args:
+        problem: a problem following the protocol of this module
+        frontier: an empty frontier
+        heuristic (Callable[[problem, state], float]): h, 0 by default
+        early_goal_test (bool): test successors when they are generated
+            instead of when they are popped; only optimal when nodes are
+            popped in order of depth with unit costs, i.e. breadth first
+        stats (utils.SearchStats): filled in with the search counters
+
+    Returns:
+        solution (List): the action sequence
+    """
+    if stats is not None:
+        start = time.time()
+        problem, frontier, heuristic = instrument.attach(stats, problem, frontier, heuristic)
+        result, duplicates = _graph_search(problem, frontier, heuristic, early_goal_test)
+        stats.duplicates += duplicates
+        instrument.finish(stats, start)
+        return result
+    return _graph_search(problem, frontier, heuristic, early_goal_test)[0]
+
+
+def _graph_search(problem, frontier, heuristic, early_goal_test):
+    r"""graph_search, returning (solution, duplicate hits)"""
+    duplicates = 0
+    h = heuristic(problem, problem.initial) if heuristic else 0
+    child_h = incremental.evaluator(problem, heuristic)
+    root = utils.Node(None, None, problem.initial, 0, h)
+    if early_goal_test and problem.goal_test(root.state):
+        return solution(root), duplicates
+    frontier.push(root.get_fn(), root)
+    reached = {root.state: root}
+    while len(frontier):
+        node = frontier.pop()
+        if reached[node.state] is not node:
+            continue
+        if not early_goal_test and problem.goal_test(node.state):
+            return solution(node), duplicates
+        for child in expand(problem, node, child_h):
+            known = reached.get(child.state)
+            if known is not None and known.g_n <= child.g_n:
+                duplicates += 1
+                continue
+            if early_goal_test and problem.goal_test(child.state):
+                return solution(child), duplicates
+            reached[child.state] = child
+            frontier.push(child.get_fn(), child)
+    return False, duplicates
+
+
+def breadth_first_tree_search(problem, stats: Optional[utils.SearchStats] = None):
+    return tree_search(problem, FIFOFrontier(), stats=stats)
+
+
+def depth_first_tree_search(problem, stats: Optional[utils.SearchStats] = None):
+    return tree_search(problem, LIFOFrontier(), stats=stats)
+
+
+def breadth_first_graph_search(problem, stats: Optional[utils.SearchStats] = None):
+    return graph_search(problem, FIFOFrontier(), early_goal_test=True, stats=stats)
+
+
+def depth_first_graph_search(problem, stats: Optional[utils.SearchStats] = None):
+    return graph_search(problem, LIFOFrontier(), stats=stats)
+
+
+def uniform_cost_search(problem, unit_costs: bool = False,
+        stats: Optional[utils.SearchStats] = None):
+    r"""Graph search ordered by g, on buckets when every action costs 1"""
+    frontier = BucketFrontier() if unit_costs else utils.PriorityQueue()
+    return graph_search(problem, frontier, stats=stats)
+
+
+def astar_search(problem, heuristic: Callable, stats: Optional[utils.SearchStats] = None):
+    r"""Graph search ordered by f = g + h"""
+    return graph_search(problem, utils.PriorityQueue(), heuristic, stats=stats)
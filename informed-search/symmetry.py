@@ -0,0 +1,194 @@
+"""
+Symmetry reduction of the cube state space.
+
+Cycling all rows (or all columns) of a board by the same offset, reversing
+their order, and transposing a square board map every row or column move
+onto another row or column move, so they preserve distances between states.
+Relabelling colours does too, since moves only relocate cells. A
+combination of the two that maps the goal onto itself therefore maps every
+state onto one at the same distance from the goal. The goals of the ps1
+fixtures, with one colour per row or per column, have many such symmetries.
+
+`Symmetries(goal)` finds them, and `canonical(state)` picks one
+representative of each equivalence class. `CanonicalProblem` wraps a
+cube.Cube so that its states hash and compare by class: the closed sets,
+visited sets and transposition tables of A*, IDA* and BFS then hold one
+entry per class, while the searches still move real states and return real
+action sequences.
+
+    problem = CanonicalProblem(cube.Cube(input_dict=...))
+    solution = ps1.astar_search(problem)
+"""
+from collections import deque
+from operator import itemgetter
+from typing import List, Tuple
+
+import cube
+
+
+def _positional_symmetries(rows: int, cols: int) -> List[Tuple[int, ...]]:
+    r"""Return the layout permutations (new[k] = old[perm[k]]) made of row
+    and column cycles and reversals, and transposes of square boards"""
+    perms = set()
+    transposes = (False, True) if rows == cols else (False,)
+    for row_shift in range(rows):
+        for row_flip in (False, True):
+            for col_shift in range(cols):
+                for col_flip in (False, True):
+                    for transpose in transposes:
+                        perm = []
+                        for r in range(rows):
+                            for c in range(cols):
+                                a = (r + row_shift) % rows
+                                b = (c + col_shift) % cols
+                                a = rows - 1 - a if row_flip else a
+                                b = cols - 1 - b if col_flip else b
+                                a, b = (b, a) if transpose else (a, b)
+                                perm.append(a * cols + b)
+                        perms.add(tuple(perm))
+    return sorted(perms)
+
+
+class CanonicalState:
+    r"""A cube.State that hashes and compares by its equivalence class
+
+    Args:
+        state (cube.State): the underlying state
+        key (Tuple[int]): the canonical key of its class
+    """
+    __slots__ = ('state', 'key', '_hash')
+
+    def __init__(self, state: cube.State, key: Tuple[int, ...]):
+        self.state = state
+        self.key = key
+        self._hash = hash(key)
+
+    def __eq__(self, other):
+        return isinstance(other, CanonicalState) and self.key == other.key
+
+    def __hash__(self):
+        return self._hash
+
+    def __repr__(self):
+        return repr(self.state)
+
+    def __str__(self):
+        return str(self.state)
+
+    @property
+    def shape(self):
+        return self.state.shape
+
+    @property
+    def layout(self):
+        return self.state.layout
+
+
+class Symmetries:
+    r"""The symmetries of the cube graph that fix a goal
+
+    Each symmetry is a positional permutation together with the colour
+    relabelling that takes the permuted goal back to the goal.
+
+    Args:
+        goal (cube.State): the goal state
+    """
+
+    def __init__(self, goal: cube.State):
+        self.goal = goal
+        self.codes = {}
+        for colour in goal.layout:
+            self.codes.setdefault(colour, len(self.codes))
+        goal_codes = tuple(self.codes[colour] for colour in goal.layout)
+
+        self.transforms = []
+        for perm in _positional_symmetries(*goal.shape):
+            relabel = {}
+            for k, source in enumerate(perm):
+                if relabel.setdefault(goal_codes[source], goal_codes[k]) != goal_codes[k]:
+                    break
+            else:
+                if len(set(relabel.values())) == len(relabel):
+                    relabel = tuple(relabel[code] for code in range(len(self.codes)))
+                    self.transforms.append((itemgetter(*perm), relabel.__getitem__))
+
+    def __len__(self):
+        return len(self.transforms)
+
+    def key(self, state: cube.State) -> Tuple[int, ...]:
+        r"""Return the smallest image of state under the symmetries, as
+        colour codes; equivalent states have the same key"""
+        codes = self.codes
+        layout = [codes[colour] for colour in state.layout]
+        return min(tuple(map(relabel, gather(layout)))
+                   for gather, relabel in self.transforms)
+
+    def canonical(self, state: cube.State) -> CanonicalState:
+        return CanonicalState(state, self.key(state))
+
+
+class CanonicalProblem:
+    r"""A cube.Cube searched over equivalence classes of states
+
+    States are CanonicalStates; `goal` stays the plain goal state, so
+    heuristics written against cube.Cube work unchanged, as long as they
+    are invariant under the symmetries (heuristic_func and the pattern
+    databases of a symmetric goal are).
+
+    Args:
+        problem (cube.Cube): Cube instance with a single goal state
+    """
+
+    def __init__(self, problem: cube.Cube):
+        if isinstance(problem.goal, list):
+            raise ValueError("canonicalisation needs a single goal state")
+        self.problem = problem
+        self.symmetries = Symmetries(problem.goal)
+        self.initial = self.symmetries.canonical(problem.initial)
+        self.goal = problem.goal
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+    def actions(self, state: CanonicalState):
+        return self.problem.actions(state.state)
+
+    def result(self, state: CanonicalState, action) -> CanonicalState:
+        return self.symmetries.canonical(self.problem.result(state.state, action))
+
+    def expand(self, state: CanonicalState):
+        canonical = self.symmetries.canonical
+        return [(action, canonical(child))
+                for action, child in self.problem.expand(state.state)]
+
+    def path_cost(self, c: float, state1: CanonicalState, action,
+            state2: CanonicalState) -> float:
+        return self.problem.path_cost(c, state1.state, action, state2.state)
+
+    def goal_test(self, state: CanonicalState) -> bool:
+        return self.problem.goal_test(state.state)
+
+    def verify_solution(self, solution, _print=False):
+        return self.problem.verify_solution(solution, _print)
+
+
+def reduction_factor(problem: cube.Cube, max_states: int = 10 ** 6) -> Tuple[int, int]:
+    r"""
+    Breadth-first enumeration of the states reachable from problem.initial,
+    up to max_states of them.
+
+    Returns:
+        (states, classes): the states reached and their equivalence classes;
+        states / classes is the reduction of the closed set
+    """
+    symmetries = Symmetries(problem.goal)
+    seen = {problem.initial}
+    classes = {symmetries.key(problem.initial)}
+    queue = deque([problem.initial])
+    while queue and len(seen) < max_states:
+        for _, child in problem.expand(queue.popleft()):
+            if child not in seen:
+                seen.add(child)
+                classes.add(symmetries.key(child))
+                queue.append(child)
+    return len(seen), len(classes)
@@ -1,5 +1,7 @@
 import heapq
 
+from collections import OrderedDict
+
 class Node:
     r"""Node class for search tree
     Args:
@@ -70,41 +72,59 @@ class Stack:
     
 
 class PriorityQueue:
+    r"""Min-priority queue indexed by node (state)
+
+    Entries live in a binary heap of ``[priority, node, alive]`` lists, and
+    an index maps every node (hashed by its state) to its live entries, so
+    membership and priority lookups are O(1). Deleting or updating a node
+    only marks its entry as dead (lazy deletion), which is O(1); dead
+    entries are skipped by ``pop`` and the heap is compacted once they
+    outnumber the live ones, keeping ``update`` at O(log n) amortised.
+
+    Pushing a node whose state is already queued keeps both entries, as
+    before; ``get_priority``, ``__delitem__`` and ``update`` act on the
+    entry with the lowest priority.
+    """
     def __init__(self):
         self.heap = []
+        self.index = {}
+        self.n_dead = 0
 
     def __contains__(self, node):
         """Decide whether the node (state) is in the queue"""
-        return any([item == node for _, item in self.heap])
+        return node in self.index
 
     def __delitem__(self, node):
         """Delete the an existing node in the queue"""
-        try: 
-            del self.heap[[item==node for _,item in self.heap].index(True)]
-        except ValueError:
-            raise KeyError(str(node)+"is not in the queue")
-        heapq.heapify(self.heap) # O(n)
+        entry = self._best_entry(node)
+        entry[2] = False
+        self._unindex(entry)
+        self.n_dead += 1
+        if self.n_dead > len(self.heap) // 2:
+            self._compact()
 
     def __getitem__(self, node):
         """Return the priority of the given node in the queue"""
-        for value, item in self.heap:
-            if item == node:
-                return value
-        raise KeyError(str(node)+"is not in the queue")
+        return self._best_entry(node)[0]
 
     def __len__(self):
-        return len(self.heap)
+        return len(self.heap) - self.n_dead
 
     def push(self, priority, node):
         """Enqueue node with priority"""
-        heapq.heappush(self.heap, (priority, node))
+        entry = [priority, node, True]
+        self.index.setdefault(node, []).append(entry)
+        heapq.heappush(self.heap, entry)
 
     def pop(self):
         """Dequeue node with highest priority (the minimum one)"""
-        if self.heap:
-            return heapq.heappop(self.heap)[1]
-        else:
-            raise Exception("Empty Priority Queue")
+        while self.heap:
+            entry = heapq.heappop(self.heap)
+            if entry[2]:
+                self._unindex(entry)
+                return entry[1]
+            self.n_dead -= 1
+        raise Exception("Empty Priority Queue")
 
     def update(self, priority, node):
         """Update the node with the input priority"""
@@ -114,3 +134,120 @@ class PriorityQueue:
     def get_priority(self, node):
         return self.__getitem__(node)
 
+    def top(self):
+        """Return (priority, node) of the node pop would return, without
+        removing it"""
+        while self.heap and not self.heap[0][2]:
+            heapq.heappop(self.heap)
+            self.n_dead -= 1
+        if self.heap:
+            return self.heap[0][0], self.heap[0][1]
+        raise Exception("Empty Priority Queue")
+
+    def _best_entry(self, node):
+        """Return the live entry of node with the lowest priority"""
+        try:
+            return min(self.index[node], key=lambda entry: entry[0])
+        except KeyError:
+            raise KeyError(str(node)+"is not in the queue")
+
+    def _unindex(self, entry):
+        """Drop entry (by identity) from the node index"""
+        entries = self.index[entry[1]]
+        if len(entries) == 1:
+            del self.index[entry[1]]
+        else:
+            entries[:] = [e for e in entries if e is not entry]
+
+    def _compact(self):
+        """Remove dead entries and restore the heap invariant, O(n)"""
+        self.heap = [entry for entry in self.heap if entry[2]]
+        heapq.heapify(self.heap)
+        self.n_dead = 0
+
+class TranspositionTable:
+    r"""Size-capped map from state to a stored value
+
+    Args:
+        capacity (int): the maximum number of entries kept
+        policy (str): which entry makes room for a new one once the table 
+            is full, "lru" (least recently used) or "fifo" (oldest stored)
+    """
+    def __init__(self, capacity: int, policy: str = "lru"):
+        if policy not in ("lru", "fifo"):
+            raise ValueError(f"unknown replacement policy {policy}")
+        self.capacity = capacity
+        self.policy = policy
+        self.table = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.table)
+
+    def __contains__(self, state):
+        return state in self.table
+
+    def get(self, state, default=None):
+        """Return the value stored for state, default if there is none"""
+        try:
+            value = self.table[state]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.hits += 1
+        if self.policy == "lru":
+            self.table.move_to_end(state)
+        return value
+
+    def store(self, state, value):
+        """Store value for state, evicting an entry if the table is full"""
+        if state in self.table:
+            self.table[state] = value
+            if self.policy == "lru":
+                self.table.move_to_end(state)
+            return
+        if len(self.table) >= self.capacity:
+            if self.capacity <= 0:
+                return
+            self.table.popitem(last=False)
+        self.table[state] = value
+
+class SearchStats:
+    r"""Counters reported by a search
+
+    Attributes:
+        expanded (int): the number of nodes expanded
+        generated (int): the number of nodes generated
+        peak_nodes (int): the largest number of nodes held at once
+        peak_memory (int): the peak traced allocation in bytes, 0 if 
+            memory was not traced
+        wall_time (float): seconds spent searching
+        frontier_peak (int): the largest frontier size
+        duplicates (int): generated nodes dropped as already reached
+        heuristic_calls (int): the number of heuristic evaluations
+        heuristic_time (float): seconds spent evaluating the heuristic
+    """
+    def __init__(self):
+        self.expanded = 0
+        self.generated = 0
+        self.peak_nodes = 0
+        self.peak_memory = 0
+        self.wall_time = 0.0
+        self.frontier_peak = 0
+        self.duplicates = 0
+        self.heuristic_calls = 0
+        self.heuristic_time = 0.0
+
+    def __repr__(self):
+        return repr(self.as_dict())
+
+    @property
+    def expansions_per_sec(self) -> float:
+        return self.expanded / self.wall_time if self.wall_time else 0.0
+
+    def as_dict(self) -> dict:
+        """Return the counters, and the expansion rate, as a flat dict"""
+        record = dict(vars(self))
+        record["expansions_per_sec"] = self.expansions_per_sec
+        return record
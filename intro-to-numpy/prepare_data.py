@@ -1,19 +1,39 @@
 import os
+import json
+import hashlib
 
 import pandas as pd
 import numpy as np
 
 COUNTRIES_W_MOST_CASES = ['United States', 'India', 'Brazil']
 
+DATA_FILE = 'OxCGRT_2020.csv'
+NUMERIC_COLUMNS = ['C1_School closing', 'C2_Workplace closing',\
+    'C6_Stay at home requirements', 'C8_International travel controls',\
+    'H4_Emergency investment in healthcare', 'ConfirmedCases',\
+    'ConfirmedDeaths']
+# bump whenever the layout of the cache changes
+CACHE_VERSION = 1
+
+_national_columns = {}
+_national_matrices = {}
+_national_frames = {}
+
 def get_data() -> pd.DataFrame:
   '''
   Returns national-level data that is sorted by country name and date such that
   the next row (if any) in the `DataFrame` is the entry of the same country but
   for the next day, if such an entry exists.
+
+  The CSV is parsed once per version of it, and every call returns a copy of
+  the frame kept in memory.
   '''
+  data_file_path = os.path.join(os.path.dirname(__file__), DATA_FILE)
+  stamp = _get_source_stamp(data_file_path)
+  cached = _national_frames.get(data_file_path)
+  if cached is not None and cached[0] == stamp:
+    return cached[1].copy()
 
-  dirname = os.path.dirname(__file__)
-  data_file_path = os.path.join(dirname, 'OxCGRT_2020.csv')
   df = pd.read_csv(data_file_path, dtype={'CountryName': str,\
       'CountryCode': str, 'RegionName': str, 'RegionCode': str,\
       'Jurisdiction': str, 'Date': np.float64, 'C1_School closing': np.float64,\
@@ -21,11 +41,137 @@ def get_data() -> pd.DataFrame:
       'C8_International travel controls': np.float64,\
       'H4_Emergency investment in healthcare': np.float64,\
       'ConfirmedCases': np.float64, 'ConfirmedDeaths': np.float64})
-  
+
+  df_national = df[df['Jurisdiction'] == 'NAT_TOTAL']
+  df_national = df_national.sort_values(by=['CountryName', 'Date'])
+
+  _national_frames[data_file_path] = (stamp, df_national)
+  return df_national.copy()
+
+def load_national_columns(data_file_path: str = None) -> dict:
+  '''
+  Returns the national-level rows of the CSV as a `dict` of column `ndarray`s,
+  sorted by country name and date: `country_names` holds the sorted unique
+  country names, `country_codes` the index of each row's country in it, `Date`
+  the dates as `int32` in YYYYMMDD form, and each of `NUMERIC_COLUMNS` its
+  `float64` values.
+
+  The CSV is only parsed when its `.npz` cache (next to it) is missing, of
+  another `CACHE_VERSION`, or stale: the size and modification time of the CSV
+  are checked first, and its SHA-1 only when they differ. The columns are kept
+  in memory after the first call.
+  '''
+  if data_file_path is None:
+    data_file_path = os.path.join(os.path.dirname(__file__), DATA_FILE)
+  stamp = _get_source_stamp(data_file_path)
+  cached = _national_columns.get(data_file_path)
+  if cached is not None and cached[0] == stamp:
+    return cached[1]
+
+  cache_path = data_file_path + '.npz'
+  meta_path = data_file_path + '.json'
+  meta = _read_cache_meta(meta_path)
+  if meta is None or meta['version'] != CACHE_VERSION or\
+      not os.path.exists(cache_path):
+    _build_cache(data_file_path, cache_path, meta_path)
+  elif meta['stamp'] != stamp:
+    if meta['sha1'] == _get_file_hash(data_file_path):
+      # touched but unchanged, only the stamp needs refreshing
+      meta['stamp'] = stamp
+      _write_cache_meta(meta_path, meta)
+    else:
+      _build_cache(data_file_path, cache_path, meta_path)
+
+  with np.load(cache_path, allow_pickle=False) as cache:
+    columns = {name: cache[name] for name in cache.files}
+  _national_columns[data_file_path] = (stamp, columns)
+  return columns
+
+def load_national_matrices(data_file_path: str = None) -> dict:
+  '''
+  Returns the national-level data as a `dict` of read-only `float64` matrices of
+  shape `(n_countries, n_days)`, one per column of `NUMERIC_COLUMNS`, laid out as
+  by `pivot_country_days` with 0 for missing days and values. `country_names`
+  holds the name of each row.
+
+  The matrices are pivoted straight from the cached columns of
+  `load_national_columns`, without building a `DataFrame`, and are kept in
+  memory until the CSV changes.
+  '''
+  columns = load_national_columns(data_file_path)
+  key = data_file_path or os.path.join(os.path.dirname(__file__), DATA_FILE)
+  cached = _national_matrices.get(key)
+  if cached is not None and cached[0] is columns:
+    return cached[1]
+
+  values = np.stack([columns[col_label] for col_label in NUMERIC_COLUMNS], axis=1)
+  tensor = _scatter_country_days(columns['country_codes'],\
+      len(columns['country_names']), columns['Date'], values, 0., np.float64)
+  tensor.flags.writeable = False
+  matrices = {'country_names': columns['country_names']}
+  matrices.update((col_label, tensor[:, :, k])\
+      for k, col_label in enumerate(NUMERIC_COLUMNS))
+  _national_matrices[key] = (columns, matrices)
+  return matrices
+
+def _build_cache(data_file_path: str, cache_path: str, meta_path: str) -> None:
+  '''
+  Parses the CSV, reading only the needed columns, keeps its national-level rows
+  sorted by country name and date, and writes them to `cache_path` as columns.
+  '''
+  dtypes = {'CountryName': str, 'Jurisdiction': str, 'Date': np.int32}
+  dtypes.update((col_label, np.float64) for col_label in NUMERIC_COLUMNS)
+  df = pd.read_csv(data_file_path, usecols=list(dtypes), dtype=dtypes)
+
   df_national = df[df['Jurisdiction'] == 'NAT_TOTAL']
   df_national = df_national.sort_values(by=['CountryName', 'Date'])
 
-  return df_national
+  country_names, country_codes = np.unique(\
+      df_national['CountryName'].to_numpy(dtype=str), return_inverse=True)
+  columns = {'country_names': country_names,\
+      'country_codes': country_codes.astype(np.int32),\
+      'Date': df_national['Date'].to_numpy(dtype=np.int32)}
+  columns.update((col_label, df_national[col_label].to_numpy(dtype=np.float64))\
+      for col_label in NUMERIC_COLUMNS)
+
+  # write then rename, so that a reader never loads a partial cache
+  tmp_path = '{}.{}.tmp.npz'.format(cache_path, os.getpid())
+  np.savez(tmp_path, **columns)
+  os.replace(tmp_path, cache_path)
+  _write_cache_meta(meta_path, {'version': CACHE_VERSION,\
+      'stamp': _get_source_stamp(data_file_path),\
+      'sha1': _get_file_hash(data_file_path)})
+
+def _get_source_stamp(path: str) -> list:
+  '''
+  Returns the size and modification time of the file at `path`.
+  '''
+  stat = os.stat(path)
+  return [stat.st_size, stat.st_mtime_ns]
+
+def _get_file_hash(path: str) -> str:
+  '''
+  Returns the SHA-1 of the contents of the file at `path`.
+  '''
+  sha1 = hashlib.sha1()
+  with open(path, 'rb') as f:
+    for block in iter(lambda: f.read(1 << 20), b''):
+      sha1.update(block)
+  return sha1.hexdigest()
+
+def _read_cache_meta(meta_path: str) -> dict:
+  try:
+    with open(meta_path, 'r') as f:
+      return json.load(f)
+  except (OSError, ValueError):
+    return None
+
+def _write_cache_meta(meta_path: str, meta: dict) -> None:
+  # write then rename, so that a reader never loads partial metadata
+  tmp_path = '{}.{}.tmp'.format(meta_path, os.getpid())
+  with open(tmp_path, 'w') as f:
+    json.dump(meta, f)
+  os.replace(tmp_path, meta_path)
 
 def get_n_cases_cumulative(df: pd.DataFrame) -> np.ndarray:
   '''
@@ -53,8 +199,19 @@ def get_n_cases_top_cumulative(df: pd.DataFrame) -> np.ndarray:
   In particular, each row represents a country while the columns of the row
   represent the time series data of that country.
   '''
-  df_most_cases = df[df['CountryName'].isin(COUNTRIES_W_MOST_CASES)]
-  return _convert_num_series_to_numpy(df_most_cases, 'ConfirmedCases')
+  most_cases = df['CountryName'].isin(COUNTRIES_W_MOST_CASES).to_numpy()
+  matrices = _get_national_matrices(df, ['ConfirmedCases'])
+  if matrices is None or not most_cases.any():
+    return _convert_num_series_to_numpy(df[most_cases], 'ConfirmedCases')
+
+  # the rows of these countries, over the days from their earliest to their
+  # latest date, as pivoting the filtered frame would give
+  rows = np.flatnonzero(np.isin(matrices['country_names'], COUNTRIES_W_MOST_CASES))
+  dates = df['Date'].to_numpy()
+  days = pd.to_datetime(np.array([dates.min(), dates[most_cases].min(),\
+      dates[most_cases].max()]).astype(np.int64).astype(str), format='%Y%m%d')
+  start, stop = (days[1] - days[0]).days, (days[2] - days[0]).days + 1
+  return np.array(matrices['ConfirmedCases'][rows, start:stop])
 
 def get_healthcare_spending(df: pd.DataFrame) -> np.ndarray:
   '''
@@ -75,23 +232,13 @@ def get_stringency_values(df: pd.DataFrame) -> np.ndarray:
   C2_Workplace closing, C6_Stay at home requirements and C8_International
   travel controls, respectively.
   '''
-  school_closing = _convert_num_series_to_numpy(df,\
-    'C1_School closing')
-  workplace_closing = _convert_num_series_to_numpy(df,\
-    'C2_Workplace closing')
-  stay_home = _convert_num_series_to_numpy(df,\
-    'C6_Stay at home requirements')
-  travel_controls = _convert_num_series_to_numpy(df,\
-    'C8_International travel controls')
-  
-  n_countries = _get_n_countries(df)
-  stringency_values = np.zeros((n_countries, school_closing.shape[1], 4))
-  stringency_values[:, :, 0] = school_closing
-  stringency_values[:, :, 1] = workplace_closing
-  stringency_values[:, :, 2] = stay_home
-  stringency_values[:, :, 3] = travel_controls
-
-  return stringency_values
+  col_labels = ['C1_School closing', 'C2_Workplace closing',\
+      'C6_Stay at home requirements', 'C8_International travel controls']
+  matrices = _get_national_matrices(df, col_labels)
+  if matrices is not None:
+    return np.stack([matrices[col_label] for col_label in col_labels],\
+        axis=2).astype(np.float32)
+  return pivot_country_days(df, col_labels)
 
 def get_mask_prices(n_prices: int) -> np.ndarray:
   '''
@@ -101,20 +248,84 @@ def get_mask_prices(n_prices: int) -> np.ndarray:
   rng = np.random.default_rng(2109)
   return rng.uniform(1, 5, n_prices) * 4
 
-def _get_n_countries(df: pd.DataFrame) -> int:
+def pivot_country_days(df: pd.DataFrame, col_labels: list,\
+    fill_value: float = 0., dtype=np.float32) -> np.ndarray:
+  '''
+  Returns the numerical columns of `df` with `col_labels` as one `ndarray` of
+  shape `(n_countries, n_days, len(col_labels))`, such that the (i, j, k) entry
+  is the value of the kth column for the ith country (by name) on the (j + 1)th
+  day since the earliest date in `df`.
+
+  Rows are placed by their country and date, so they may come in any order, and
+  every entry without a row, or whose value is missing, is `fill_value`. The
+  values of the kth column are the view `pivot_country_days(...)[:, :, k]`.
+  '''
+  country_codes, _ = pd.factorize(df['CountryName'], sort=True)
+  n_countries = country_codes.max() + 1 if len(country_codes) else 0
+  return _scatter_country_days(country_codes, n_countries,\
+      df['Date'].to_numpy(), df[col_labels].to_numpy(dtype=dtype), fill_value,\
+      dtype)
+
+def _scatter_country_days(country_codes: np.ndarray, n_countries: int,\
+    dates: np.ndarray, values: np.ndarray, fill_value: float,\
+    dtype) -> np.ndarray:
   '''
-  Returns the number of unique countries that are represented in `df`.
+  Scatters the rows of `values` into a `(n_countries, n_days, n_columns)`
+  tensor by their country code and their day since the earliest of `dates`
+  (YYYYMMDD integers), filling the rest and missing values with `fill_value`.
+  Without any rows the tensor has no days.
   '''
-  return pd.unique(df['CountryName']).size
+  if len(dates) == 0:
+    return np.zeros((n_countries, 0, values.shape[1]), dtype=dtype)
+
+  date_values, date_codes = np.unique(dates, return_inverse=True)
+  days = pd.to_datetime(date_values.astype(np.int64).astype(str),\
+      format='%Y%m%d')
+  day_offsets = np.asarray((days - days[0]).days, dtype=np.int64)
+
+  n_days = day_offsets[-1] + 1
+  tensor = np.full((n_countries, n_days, values.shape[1]), fill_value,\
+      dtype=dtype)
+  tensor[country_codes, day_offsets[date_codes]] = values
+  tensor[np.isnan(tensor)] = fill_value
+  return tensor
 
 def _convert_num_series_to_numpy(df: pd.DataFrame, col_label: str) -> np.ndarray:
   '''
   Gets the numerical `Series` from `df` with `col_label`, and returns an `ndarray`
   such that each row represents a country while the columns of the row represent
-  the time series data of that country.
+  the time series data of that country, with 0 for missing days and values.
 
-  NOTE: this assumes that the data in `df` is arranged such that entries from
-  the same country but of different dates are adjacent to each other. 
+  The values are kept as `float64`, in which the counts are exact. When `df`
+  holds the national data as returned by `get_data`, the matrix is copied from
+  `load_national_matrices` instead of pivoting `df` again.
+  '''
+  matrices = _get_national_matrices(df, [col_label])
+  if matrices is not None:
+    return np.array(matrices[col_label])
+  return pivot_country_days(df, [col_label], dtype=np.float64)[:, :, 0]
+
+def _get_national_matrices(df: pd.DataFrame, col_labels: list) -> dict:
+  '''
+  Returns `load_national_matrices()` if `df` holds exactly its data: the
+  national rows of the CSV in the order of `get_data`, with the same values in
+  `col_labels`. Returns `None` for any other frame (filtered, modified, or read
+  from elsewhere), whose matrices have to be pivoted from `df` itself.
   '''
-  n_countries = _get_n_countries(df)
-  return np.nan_to_num(df[col_label].to_numpy()).reshape(n_countries, -1)
+  if not set(['CountryName', 'Date'] + col_labels) <= set(df.columns):
+    return None
+  try:
+    columns = load_national_columns()
+  except OSError:
+    return None
+  if len(df) != len(columns['Date']) or\
+      not np.array_equal(df['Date'].to_numpy(dtype=np.float64), columns['Date']):
+    return None
+  names = columns['country_names'][columns['country_codes']]
+  if not (df['CountryName'].to_numpy(dtype=str) == names).all():
+    return None
+  for col_label in col_labels:
+    if not np.array_equal(df[col_label].to_numpy(dtype=np.float64),\
+        columns[col_label], equal_nan=True):
+      return None
+  return load_national_matrices()
@@ -0,0 +1,277 @@
+'''
+Minimax Wordle against an adversarial host.
+
+The host does not fix an answer: after every guess it picks the feedback,
+so the solver has to minimise the number of guesses in the worst case. The
+"largest" host keeps the largest bucket of the remaining candidates, as
+Absurdle does; the "any" host may keep any bucket, the true worst case. The
+cost of a candidate set C is
+
+    cost(C) = min over guesses g of max(1 if g is in C,
+                                        1 + cost(B) for the buckets B the
+                                        host may keep)
+
+with cost({w}) = 1. It is searched over the feedback matrix by iterative
+deepening on a limit, with
+
+    bucket-size bounds  a guess can give at most 3^5 - 1 codes other than
+                        all green, so a bucket of m words needs at least
+                        bound(m) guesses and a guess whose largest bucket
+                        cannot fit in the limit is skipped unsearched
+    cutoffs             guesses are tried by largest bucket first, and a
+                        guess is dropped at its first bucket that cannot
+                        be solved within the limit, largest buckets first
+    transpositions      the bounds proven for a candidate set are kept by a
+                        hash of the set, so every limit and every path
+                        reaching the same set reuse them
+
+In hard mode guesses must be consistent with all prior feedback, that is
+be one of the candidates. Sets where every guess only splits off itself
+(bills, fills, gills, ...) then cost exactly their size.
+
+The search is exact for a few hundred words. On the full words.txt,
+max_branch bounds the guesses searched per set (20: 5 guesses against the
+largest host in hard mode in a few seconds), and the costs are then the
+worst cases of the strategy found rather than proven optima.
+
+    solver = MinimaxSolver(word_list, max_branch=20)
+    cost, guess = solver.solve(np.arange(len(word_list)))
+    guesses = play_host(solver)
+'''
+import time
+import hashlib
+import argparse
+
+import numpy as np
+
+import feedback
+import guesser
+import dictionary
+
+
+def set_key(candidates):
+    '''
+    Returns the transposition key of a sorted index array of candidates.
+    '''
+    data = np.asarray(candidates, dtype=np.int32).tobytes()
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class MinimaxSolver:
+    '''
+    Minimises the worst-case number of guesses.
+
+    Parameters
+    ----------
+    word_list:
+        A list of strings of all words in the word list.
+    matrix:
+        The feedback matrix of word_list, loaded with feedback.load_matrix
+        by default.
+    hard_mode:
+        Whether guesses must be consistent with all prior feedback.
+    host:
+        "largest" if the host keeps the largest bucket, "any" if it may
+        keep any bucket.
+    max_branch:
+        Search only this many guesses per candidate set, those with the
+        smallest largest bucket, which makes the costs upper bounds rather
+        than exact. None searches every guess.
+    '''
+
+    def __init__(self, word_list, matrix=None, hard_mode=True, host="largest",
+            max_branch=None):
+        if host not in ("any", "largest"):
+            raise ValueError(f"unknown host {host}")
+        self.word_list = word_list
+        self.index = {word: i for i, word in enumerate(word_list)}
+        matrix = feedback.load_matrix(word_list) if matrix is None else matrix
+        # a plain view of the map, which fancy indexing is much faster on
+        self.matrix = np.asarray(matrix)
+        self.hard_mode = hard_mode
+        self.host = host
+        self.max_branch = max_branch
+        self.n_codes = 3 ** len(word_list[0])
+        self.solved_code = self.n_codes - 1
+        # capacity[d] is the most candidates d guesses can always solve
+        self.capacity = [0, 1]
+        while self.capacity[-1] < len(word_list):
+            self.capacity.append(1 + (self.n_codes - 1) * self.capacity[-1])
+        # key -> [lower bound, upper bound, guess achieving the upper bound]
+        self.table = {}
+        self.nodes = 0
+
+    def bound(self, n):
+        '''
+        Returns the fewest guesses that can solve any n candidates.
+        '''
+        return int(np.searchsorted(self.capacity, n))
+
+    def partitions(self, candidates):
+        '''
+        Returns the guesses of a candidate set, their codes against the
+        candidates and their largest bucket other than all green.
+        '''
+        if self.hard_mode:
+            guesses = candidates
+            codes = self.matrix[np.ix_(guesses, candidates)]
+        else:
+            # every word is a guess: only gather the candidate columns
+            guesses = np.arange(len(self.word_list))
+            codes = self.matrix[:, candidates]
+        worst = np.empty(len(guesses), dtype=np.int64)
+        rows = max(1, guesser.BLOCK // len(candidates))
+        for start in range(0, len(guesses), rows):
+            block = codes[start:start + rows].astype(np.int64)
+            block += (np.arange(len(block)) * self.n_codes)[:, None]
+            counts = np.bincount(block.ravel(), minlength=len(block) * self.n_codes)
+            counts = counts.reshape(len(block), self.n_codes)
+            worst[start:start + rows] = counts[:, :self.solved_code].max(axis=1)
+        return guesses, codes, worst
+
+    def _search(self, candidates, limit):
+        # whether candidates can always be solved within limit guesses;
+        # the bounds found are left in the table
+        n = len(candidates)
+        if n == 1:
+            return limit >= 1
+        if limit < self.bound(n):
+            return False
+        key = set_key(candidates)
+        entry = self.table.get(key)
+        if entry is None:
+            entry = self.table[key] = [self.bound(n), n if self.hard_mode else None, None]
+        if entry[2] is not None and entry[1] <= limit:
+            return True
+        if entry[0] > limit:
+            return False
+        self.nodes += 1
+
+        guesses, codes, worst = self.partitions(candidates)
+        if self.hard_mode and worst.min() == n - 1:
+            # no guess splits the others: one guess per candidate
+            entry[0] = entry[1] = n
+            entry[2] = int(guesses[0])
+            return n <= limit
+        order = np.argsort(worst, kind='stable')
+        if self.max_branch is not None:
+            order = order[:self.max_branch]
+        found = None
+        for g in order:
+            if 1 + self.bound(worst[g]) > limit:
+                # guesses are ordered by largest bucket, so none fit
+                break
+            if worst[g] == n:
+                # tells nothing apart
+                continue
+            row = codes[g]
+            values, sizes = np.unique(row[row != self.solved_code], return_counts=True)
+            order_buckets = np.argsort(-sizes, kind='stable')
+            if self.host == "largest":
+                order_buckets = order_buckets[:1]
+            for k in order_buckets:
+                if not self._search(candidates[row == values[k]], limit - 1):
+                    break
+            else:
+                found = int(guesses[g])
+                break
+        if found is None:
+            entry[0] = max(entry[0], limit + 1)
+            return False
+        entry[1], entry[2] = limit, found
+        return True
+
+    def solve(self, candidates):
+        '''
+        Returns (worst-case number of guesses, best guess) of a candidate
+        set, an index array.
+        '''
+        candidates = np.sort(np.asarray(candidates, dtype=np.int64))
+        if len(candidates) == 1:
+            return 1, int(candidates[0])
+        limit = self.bound(len(candidates))
+        while not self._search(candidates, limit):
+            limit += 1
+        cost, guess = self.table[set_key(candidates)][1:]
+        return cost, guess
+
+    def generate_guess(self, word_list, possible_words, nth_guess):
+        '''
+        Generates the guess with the best worst case, with the signature of
+        text.generate_smart_guess.
+
+        Parameters
+        ----------
+        word_list:
+            A list of strings of all words in the word list.
+        possible_words:
+            A list of strings of all possible remaining words in the word list.
+        nth_guess:
+            A number indicating how many guesses have been made so far inclusive of this one.
+
+        Returns
+        -------
+            A string of the guess.
+        '''
+        candidates = [self.index[word] for word in possible_words]
+        return self.word_list[self.solve(candidates)[1]]
+
+
+def host_code(matrix, guess, candidates, solved_code):
+    '''
+    Returns the feedback an adversarial host gives to guess: the code of
+    the largest bucket of candidates, all green only when nothing else is
+    left, the lowest code among ties.
+    '''
+    codes = np.asarray(matrix[guess, candidates])
+    counts = np.bincount(codes, minlength=solved_code + 1)
+    if counts[:solved_code].any():
+        counts[solved_code] = 0
+    return int(np.argmax(counts))
+
+
+def play_host(solver, max_guesses=None):
+    '''
+    Plays a MinimaxSolver against the host keeping the largest bucket.
+
+    Returns
+    -------
+        The list of guess indices, ending with the word the host was left
+        with.
+    '''
+    candidates = np.arange(len(solver.word_list))
+    guesses = []
+    while max_guesses is None or len(guesses) < max_guesses:
+        _, guess = solver.solve(candidates)
+        guesses.append(guess)
+        code = host_code(solver.matrix, guess, candidates, solver.solved_code)
+        if code == solver.solved_code:
+            break
+        candidates = candidates[np.asarray(solver.matrix[guess, candidates]) == code]
+    return guesses
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--easy", action="store_true",
+                        help="allow any word as a guess, not only consistent ones")
+    parser.add_argument("--host", choices=["largest", "any"], default="largest")
+    parser.add_argument("--max-branch", type=int, default=20,
+                        help="guesses searched per candidate set, 0 for every one")
+    parser.add_argument("--words", help="word list file, words.txt by default")
+    args = parser.parse_args(argv)
+
+    word_list = dictionary.load(args.words or dictionary.WORDS_PATH).word_list
+    solver = MinimaxSolver(word_list, hard_mode=not args.easy, host=args.host,
+                           max_branch=args.max_branch or None)
+    start = time.time()
+    cost, guess = solver.solve(np.arange(len(word_list)))
+    elapsed = time.time() - start
+    print(f"worst case {cost} guesses opening with {word_list[guess]}: "
+          f"{solver.nodes} sets searched, {len(solver.table)} in the table, {elapsed:.1f}s")
+    guesses = play_host(solver)
+    print("against the host: " + " ".join(word_list[g] for g in guesses))
+
+
+if __name__ == "__main__":
+    main()
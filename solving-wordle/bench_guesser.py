@@ -0,0 +1,48 @@
+'''
+Average number of guesses of the entropy guesser over the answers of
+words.txt (or a random sample of them), for each score, with guesses from
+the candidates only and from the full word list.
+
+    python bench_guesser.py [n_answers]
+'''
+import os
+import sys
+import time
+import random
+
+import numpy as np
+
+import feedback
+import guesser
+
+
+def main(n_answers=0):
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'words.txt')
+    with open(path, 'r') as f:
+        word_list = f.read().splitlines()
+    matrix = feedback.load_matrix(word_list)
+    answers = list(range(len(word_list)))
+    if n_answers:
+        answers = random.Random(2109).sample(answers, n_answers)
+
+    print(f"{'score':<9} {'guesses from':<13} {'opener':<7} {'mean':>6} {'max':>4} "
+          f"{'failed':>7} {'ms/game':>8}")
+    for score in ("entropy", "expected"):
+        for full_list in (False, True):
+            player = guesser.EntropyGuesser(word_list, matrix, score, full_list)
+            opener = word_list[player.best_guess(np.arange(len(word_list)))]
+            start = time.time()
+            lengths = []
+            failed = 0
+            for answer in answers:
+                guesses = guesser.play(player, answer, max_guesses=len(word_list))
+                lengths.append(len(guesses))
+                failed += len(guesses) > 6
+            elapsed = time.time() - start
+            source = "word list" if full_list else "candidates"
+            print(f"{score:<9} {source:<13} {opener:<7} {np.mean(lengths):>6.3f} "
+                  f"{max(lengths):>4d} {failed:>7d} {1000 * elapsed / len(answers):>8.2f}")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,68 @@
+'''
+Multi-board solver over word lists of several lengths: checks the feedback
+codes against text.make_evaluate_guess, then plays games on random word
+lists of each length and reports the turns taken.
+
+    python bench_multiboard.py [n_games] [n_boards]
+'''
+import sys
+import time
+import random
+import string
+
+import numpy as np
+
+import text
+import feedback
+import multiboard
+
+LENGTHS = (5, 6, 11)
+
+
+def random_words(length, n_words, rng):
+    '''
+    Returns n_words distinct random words of length, over a few letters so
+    that they share letters the way real words do.
+    '''
+    letters = string.ascii_lowercase[:12]
+    words = set()
+    while len(words) < n_words:
+        words.add(''.join(rng.choice(letters) for _ in range(length)))
+    return sorted(words)
+
+
+def check_codes(word_list, rng, n_pairs=2000):
+    letters = feedback.letter_matrix(word_list)
+    length = letters.shape[1]
+    for _ in range(n_pairs):
+        guess, answer = rng.randrange(len(word_list)), rng.randrange(len(word_list))
+        code = feedback.feedback_codes(letters[[guess]], letters[[answer]])[0, 0]
+        expected = text.make_evaluate_guess(word_list[answer], word_list)(word_list[guess])
+        assert feedback.decode(int(code), length) == expected, \
+            f"{word_list[guess]} against {word_list[answer]}: {code} != {expected}"
+
+
+def main(n_games=20, n_boards=4, n_words=2000):
+    rng = random.Random(2109)
+    print(f"{'length':>6} {'dtype':>7} {'mean turns':>11} {'failed':>7} {'ms/turn':>8}")
+    for length in LENGTHS:
+        word_list = random_words(length, n_words, rng)
+        check_codes(word_list, rng)
+        solver = multiboard.MultiBoardSolver(word_list, n_boards)
+        turns, failed, seconds = [], 0, 0.0
+        for _ in range(n_games):
+            answers = rng.sample(range(len(word_list)), n_boards)
+            start = time.perf_counter()
+            guesses, solved_on = multiboard.play(solver, answers, max_turns=len(word_list))
+            seconds += time.perf_counter() - start
+            # with no turn limit every board is solved, whatever the length
+            assert solved_on.all(), f"{length} letters: solved_on={solved_on}"
+            turns.append(len(guesses))
+            failed += len(guesses) > n_boards + 5
+        dtype = np.dtype(feedback.code_dtype(length)).name
+        print(f"{length:>6d} {dtype:>7} {np.mean(turns):>11.3f} {failed:>7d} "
+              f"{1000 * seconds / sum(turns):>8.2f}")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
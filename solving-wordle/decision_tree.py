@@ -0,0 +1,285 @@
+'''
+Precomputed Wordle decision trees.
+
+With a fixed word list and a deterministic guesser, the guess to make
+after any feedback history is fixed too, so it can be searched once
+offline. A tree node holds a guess; its edges are the feedback codes the
+remaining candidates can give, leading to the node of the next guess. The
+tree is stored in CSR form as three .npy arrays plus a .json file of
+metadata:
+
+    path.guess.npy   int32, the guess (word index) of every node
+    path.first.npy   int32, node i's edges are first[i]:first[i + 1]
+    path.edges.npy   int32 pairs (code, child node), sorted by code per node
+
+TreeSolver memory-maps the arrays on first use and answers each turn with
+a binary search among the edges of the current node. Histories that leave
+the tree (another guesser's guesses, a different word list) fall back to
+a live guesser.
+
+    python decision_tree.py build --score entropy
+    solver = TreeSolver(word_list, "trees/entropy")
+    guess = solver.generate_guess(word_list, possible_words, nth_guess)
+'''
+import os
+import json
+import time
+import argparse
+
+from collections import Counter, deque
+
+import numpy as np
+
+import feedback
+import guesser
+
+
+def build_tree(player, max_nodes=None):
+    '''
+    Searches the decision tree of a guesser over its whole word list.
+
+    Parameters
+    ----------
+    player:
+        A guesser.EntropyGuesser.
+    max_nodes:
+        Stop expanding after this many nodes, for partial trees.
+
+    Returns
+    -------
+        (guess, first, edges) arrays, in breadth first order of the nodes.
+    '''
+    matrix = player.matrix
+    solved = player.n_codes - 1
+    guesses, first, edges = [], [0], []
+    # node ids are assigned in the order the nodes are queued
+    queue = deque([np.arange(len(player.word_list))])
+    n_nodes = 1
+    while queue:
+        candidates = queue.popleft()
+        guess = player.best_guess(candidates)
+        guesses.append(guess)
+        if max_nodes is None or n_nodes < max_nodes:
+            codes = np.asarray(matrix[guess, candidates])
+            order = np.argsort(codes, kind='stable')
+            codes, candidates = codes[order], candidates[order]
+            split = np.flatnonzero(np.diff(codes)) + 1
+            for code, bucket in zip(codes[np.r_[0, split]], np.split(candidates, split)):
+                if code == solved:
+                    continue
+                edges.append((int(code), n_nodes))
+                queue.append(bucket)
+                n_nodes += 1
+        first.append(len(edges))
+    return (np.array(guesses, dtype=np.int32), np.array(first, dtype=np.int32),
+            np.array(edges, dtype=np.int32).reshape(-1, 2))
+
+
+def save_tree(path, arrays, meta):
+    '''
+    Writes a tree built by build_tree to path.guess.npy / .first.npy /
+    .edges.npy / .json. Every file is written aside and renamed into
+    place, and the metadata is removed first and written last, so that a
+    tree is only loaded once all of its arrays are complete.
+    '''
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    try:
+        os.remove(path + ".json")
+    except FileNotFoundError:
+        pass
+    tmp = f"{path}.{os.getpid()}.tmp"
+    for name, array in zip(("guess", "first", "edges"), arrays):
+        with open(tmp, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp, f"{path}.{name}.npy")
+    with open(tmp, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp, path + ".json")
+
+
+def tree_meta(player):
+    '''
+    What a tree is built for, as stored next to it on disk.
+    '''
+    return {"words": feedback.words_hash(player.word_list), "score": player.score,
+            "full_list": player.full_list}
+
+
+def depths(guess, first, edges, matrix, n_words):
+    '''
+    Returns the number of guesses the tree takes for every answer, 0 for
+    answers it never reaches.
+    '''
+    result = np.zeros(n_words, dtype=np.int64)
+    stack = [(0, np.arange(n_words), 1)]
+    while stack:
+        node, candidates, depth = stack.pop()
+        row = np.asarray(matrix[guess[node], candidates])
+        for start in range(first[node], first[node + 1]):
+            code, child = edges[start]
+            stack.append((child, candidates[row == code], depth + 1))
+        result[candidates[candidates == guess[node]]] = depth
+    return result
+
+
+def default_path(score="entropy", full_list=False):
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "trees",
+                        score + ("-full" if full_list else ""))
+
+
+def ensure_tree(word_list, score="entropy", full_list=False, path=None):
+    '''
+    Builds and saves the tree of an EntropyGuesser unless path already holds
+    one for the same word list and settings.
+
+    Returns
+    -------
+        The path of the tree.
+    '''
+    path = path or default_path(score, full_list)
+    player = guesser.EntropyGuesser(word_list, score=score, full_list=full_list)
+    try:
+        with open(path + ".json", "r") as f:
+            if json.load(f) == tree_meta(player):
+                return path
+    except FileNotFoundError:
+        pass
+    save_tree(path, build_tree(player), tree_meta(player))
+    return path
+
+
+class TreeSolver:
+    '''
+    Serves guesses from a decision tree built by build_tree.
+
+    Parameters
+    ----------
+    word_list:
+        A list of strings of all words in the word list.
+    path:
+        The tree, as given to save_tree.
+    fallback:
+        The guesser for histories the tree does not cover, an
+        EntropyGuesser by default.
+    '''
+
+    def __init__(self, word_list, path, fallback=None):
+        self.word_list = word_list
+        self.path = path
+        self.fallback = fallback
+        self.index = {word: i for i, word in enumerate(word_list)}
+        self.arrays = None
+        self.node = None
+        self.previous = None
+        self.hits = 0
+        self.misses = 0
+
+    def load(self):
+        '''
+        Memory-maps the tree, on first use.
+        '''
+        if self.arrays is None:
+            with open(self.path + ".json", "r") as f:
+                meta = json.load(f)
+            if meta["words"] != feedback.words_hash(self.word_list):
+                raise ValueError(f"{self.path} was built for another word list")
+            self.arrays = tuple(np.load(f"{self.path}.{name}.npy", mmap_mode='r')
+                                for name in ("guess", "first", "edges"))
+        return self.arrays
+
+    def child(self, node, code):
+        '''
+        Returns the node reached from node by feedback code, or None.
+        '''
+        _, first, edges = self.load()
+        codes = edges[first[node]:first[node + 1], 0]
+        k = int(np.searchsorted(codes, code))
+        if k < len(codes) and codes[k] == code:
+            return int(edges[first[node] + k, 1])
+        return None
+
+    def lookup(self, history):
+        '''
+        Returns the next guess (word index) after a feedback history, a list
+        of (guess index, feedback code) pairs, or None if the tree does not
+        cover it.
+        '''
+        guess = self.load()[0]
+        node = 0
+        for word, code in history:
+            if node is None or int(guess[node]) != word:
+                return None
+            node = self.child(node, code)
+        return None if node is None else int(guess[node])
+
+    def _fallback(self):
+        if self.fallback is None:
+            self.fallback = guesser.EntropyGuesser(self.word_list)
+        return self.fallback
+
+    def generate_guess(self, word_list, possible_words, nth_guess):
+        '''
+        Generates the next guess, with the signature of
+        text.generate_smart_guess. The solver follows the game from one call
+        to the next: the feedback to its previous guess is the one every
+        remaining possible word gives it.
+
+        Parameters
+        ----------
+        word_list:
+            A list of strings of all words in the word list.
+        possible_words:
+            A list of strings of all possible remaining words in the word list.
+        nth_guess:
+            A number indicating how many guesses have been made so far inclusive of this one.
+
+        Returns
+        -------
+            A string of the next guess.
+        '''
+        guess_of = self.load()[0]
+        if nth_guess == 1:
+            self.node = 0
+        elif self.node is not None and possible_words:
+            answer = self.index[possible_words[0]]
+            code = feedback.feedback_codes(
+                feedback.letter_matrix([self.word_list[self.previous]]),
+                feedback.letter_matrix([self.word_list[answer]]))[0, 0]
+            self.node = self.child(self.node, int(code))
+        if self.node is None:
+            self.misses += 1
+            return self._fallback().generate_guess(word_list, possible_words, nth_guess)
+        self.hits += 1
+        self.previous = int(guess_of[self.node])
+        return self.word_list[self.previous]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--score", choices=["entropy", "expected"], default="entropy")
+    parser.add_argument("--full-list", action="store_true",
+                        help="guess from the whole word list, not only the candidates")
+    parser.add_argument("--out", help="tree path, trees/<score>[-full] by default")
+    args = parser.parse_args(argv)
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(here, 'words.txt'), 'r') as f:
+        word_list = f.read().splitlines()
+    player = guesser.EntropyGuesser(word_list, score=args.score, full_list=args.full_list)
+    path = args.out or default_path(args.score, args.full_list)
+
+    start = time.time()
+    arrays = build_tree(player)
+    save_tree(path, arrays, tree_meta(player))
+    guess_depths = depths(*arrays, player.matrix, len(word_list))
+    print(f"{len(arrays[0])} nodes in {time.time() - start:.1f}s, written to {path}")
+    print(f"mean guesses {guess_depths.mean():.4f}, max {guess_depths.max()}")
+    for depth, count in sorted(Counter(guess_depths.tolist()).items()):
+        print(f"  {depth} guesses: {count:>6d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+'''
+Compiled binary Wordle dictionary.
+
+Parsing words.txt and deriving the letter matrix and letter counts from it
+in every process costs more than the games themselves for short runs. The
+word list is compiled once into one binary file, words.bin:
+
+    header      128 bytes: magic b"WDLE", format version, number of words,
+                word length, SHA-1 of the source text and SHA-256 of the
+                arrays below
+    letters     uint8 (words x length), the letters as 0-25
+    histograms  uint8 (26 x words), the copies of each letter in each word
+
+Dictionary maps the file read-only on first use, so that every process
+shares the same pages, and recompiles it when it is missing, was built by
+another format version, or its source has changed.
+
+    words = dictionary.load()
+    words.word_list, words.letters, words.histograms
+'''
+import os
+import struct
+import hashlib
+
+import numpy as np
+
+MAGIC = b"WDLE"
+VERSION = 1
+HEADER = struct.Struct("<4sIII20s32s")
+HEADER_SIZE = 128
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+WORDS_PATH = os.path.join(HERE, 'words.txt')
+
+
+def _layout(n_words, length):
+    # offsets of the arrays, aligned to 64 bytes
+    letters = HEADER_SIZE
+    histograms = letters + (n_words * length + 63) // 64 * 64
+    return letters, histograms, histograms + 26 * n_words
+
+
+def compile_dictionary(words_path=WORDS_PATH, out_path=None):
+    '''
+    Compiles a word list file into the binary dictionary.
+
+    Parameters
+    ----------
+    words_path:
+        The word list, one word per line.
+    out_path:
+        The binary file to write, words_path with a .bin extension by default.
+
+    Returns
+    -------
+        The path of the binary file.
+    '''
+    out_path = out_path or os.path.splitext(words_path)[0] + '.bin'
+    with open(words_path, 'rb') as f:
+        source = f.read()
+    words = source.decode('ascii').splitlines()
+    length = len(words[0]) if words else 0
+    if any(len(word) != length for word in words):
+        raise ValueError(f"{words_path} mixes word lengths")
+
+    data = np.frombuffer(''.join(words).encode('ascii'), dtype=np.uint8)
+    letters = (data.reshape(len(words), length) - ord('a')).astype(np.uint8)
+    cells = letters.T.astype(np.int64) * len(words) + np.arange(len(words))
+    histograms = np.bincount(cells.ravel(), minlength=26 * len(words)) \
+        .reshape(26, len(words)).astype(np.uint8)
+    checksum = hashlib.sha256(letters.tobytes() + histograms.tobytes()).digest()
+
+    letters_at, histograms_at, size = _layout(len(words), length)
+    buffer = bytearray(size)
+    HEADER.pack_into(buffer, 0, MAGIC, VERSION, len(words), length,
+                     hashlib.sha1(source).digest(), checksum)
+    buffer[letters_at:letters_at + letters.nbytes] = letters.tobytes()
+    buffer[histograms_at:size] = histograms.tobytes()
+    # write then rename, so that readers never map a partial file
+    tmp = f"{out_path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(buffer)
+    os.replace(tmp, out_path)
+    return out_path
+
+
+class Dictionary:
+    '''
+    A compiled dictionary, memory-mapped on first use.
+
+    Parameters
+    ----------
+    path:
+        The binary file.
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self._map = None
+        self._word_list = None
+
+    def _header(self):
+        with open(self.path, 'rb') as f:
+            return HEADER.unpack(f.read(HEADER.size))
+
+    def _load(self):
+        if self._map is None:
+            magic, version, n_words, length, source_hash, checksum = self._header()
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{self.path} is not a version {VERSION} dictionary")
+            self.n_words, self.length = n_words, length
+            self.source_hash, self.checksum = source_hash, checksum
+            self._map = np.memmap(self.path, dtype=np.uint8, mode='r')
+        return self._map
+
+    def __len__(self):
+        self._load()
+        return self.n_words
+
+    @property
+    def letters(self):
+        '''The uint8 (words x length) letter matrix, letters as 0-25.'''
+        data = self._load()
+        start, end, _ = _layout(self.n_words, self.length)
+        return data[start:start + self.n_words * self.length] \
+            .reshape(self.n_words, self.length)
+
+    @property
+    def histograms(self):
+        '''The uint8 (26 x words) letter counts.'''
+        data = self._load()
+        _, start, end = _layout(self.n_words, self.length)
+        return data[start:end].reshape(26, self.n_words)
+
+    @property
+    def word_list(self):
+        '''The words as a list of strings, decoded once.'''
+        if self._word_list is None:
+            text = (self.letters + ord('a')).tobytes().decode('ascii')
+            self._word_list = [text[i:i + self.length]
+                               for i in range(0, len(text), self.length)]
+        return self._word_list
+
+    def verify(self):
+        '''
+        Returns whether the arrays match the checksum in the header.
+        '''
+        self._load()
+        digest = hashlib.sha256(self.letters.tobytes() + self.histograms.tobytes()).digest()
+        return digest == self.checksum
+
+    def is_current(self, words_path):
+        '''
+        Returns whether the dictionary was compiled from the current
+        contents of words_path.
+        '''
+        try:
+            magic, version, _, _, source_hash, _ = self._header()
+        except (OSError, struct.error):
+            return False
+        if magic != MAGIC or version != VERSION:
+            return False
+        with open(words_path, 'rb') as f:
+            return hashlib.sha1(f.read()).digest() == source_hash
+
+    def word_index(self):
+        '''
+        Returns a word_index.WordIndex over the mapped arrays.
+        '''
+        import word_index
+        return word_index.WordIndex(self.word_list, self.letters, self.histograms)
+
+
+_loaded = {}
+
+
+def load(words_path=WORDS_PATH, path=None):
+    '''
+    Returns the Dictionary of a word list, compiling it first if it is
+    missing or stale. Dictionaries are shared within a process.
+
+    Parameters
+    ----------
+    words_path:
+        The word list, words.txt next to this module by default.
+    path:
+        The binary file, words_path with a .bin extension by default.
+    '''
+    path = path or os.path.splitext(words_path)[0] + '.bin'
+    if path not in _loaded:
+        dictionary = Dictionary(path)
+        if not dictionary.is_current(words_path):
+            compile_dictionary(words_path, path)
+        _loaded[path] = dictionary
+    return _loaded[path]
@@ -0,0 +1,183 @@
+'''
+Vectorised Wordle feedback.
+
+A feedback pattern such as "GYBBG" is stored as one byte, the base-3 number
+with digit i the colour of letter i (B = 0, Y = 1, G = 2), so the 3^5 = 243
+patterns of five-letter words fit in a uint8. Scoring follows
+make_evaluate_guess: greens first, then each remaining guess letter is
+yellow while the answer has unmatched copies of it, from left to right.
+
+The full matrix over words.txt (guess x answer, about 168 MB) is built
+once and cached next to the word list as feedback-<hash>.npy, named after
+a hash of the word list so that it is rebuilt whenever the list changes,
+and is memory-mapped on later loads:
+
+    matrix = feedback.load_matrix(word_list)
+    code = matrix[guess_index, answer_index]
+'''
+import os
+import hashlib
+
+import numpy as np
+
+COLOURS = "BYG"
+CHUNK = 256
+
+
+def encode(colours):
+    '''
+    Converts a colour string to its feedback code.
+
+    Parameters
+    ----------
+    colours:
+        A string of "B", "Y" and "G".
+
+    Returns
+    -------
+        The feedback code, an int.
+    '''
+    code = 0
+    for colour in reversed(colours):
+        code = code * 3 + COLOURS.index(colour)
+    return code
+
+
+def decode(code, length=5):
+    '''
+    Converts a feedback code back to its colour string.
+    '''
+    colours = []
+    for _ in range(length):
+        colours.append(COLOURS[code % 3])
+        code //= 3
+    return ''.join(colours)
+
+
+def letter_matrix(words):
+    '''
+    Returns a uint8 matrix with one row per word and one column per
+    position, holding the letters as 0-25.
+    '''
+    if not len(words):
+        return np.zeros((0, 5), dtype=np.uint8)
+    data = np.frombuffer(''.join(words).encode('ascii'), dtype=np.uint8)
+    return (data.reshape(len(words), -1) - ord('a')).astype(np.uint8)
+
+
+def feedback_codes(guesses, answers):
+    '''
+    Scores every guess against every answer.
+
+    Parameters
+    ----------
+    guesses:
+        A letter matrix (see letter_matrix) of the guess words.
+    answers:
+        A letter matrix of the answer words, of the same word length.
+
+    Returns
+    -------
+        A uint8 (or uint16 for words longer than 5 letters) matrix of
+        feedback codes, guesses along the rows.
+    '''
+    length = guesses.shape[1]
+    dtype = code_dtype(length)
+    g = guesses[:, None, :]
+    a = answers[None, :, :]
+    green = g == a
+    codes = np.zeros((len(guesses), len(answers)), dtype=dtype)
+    for i in range(length):
+        # unmatched copies of guess letter i in the answer, minus the ones
+        # claimed by earlier non-green copies in the guess
+        available = np.zeros(codes.shape, dtype=np.int8)
+        for j in range(length):
+            available += (a[:, :, j] == g[:, :, i]) & ~green[:, :, j]
+        for k in range(i):
+            available -= (g[:, :, k] == g[:, :, i]) & ~green[:, :, k]
+        colour = np.where(green[:, :, i], 2, (available > 0).astype(dtype))
+        codes += (colour * 3 ** i).astype(dtype)
+    return codes
+
+
+def code_dtype(length):
+    '''
+    Returns the smallest unsigned dtype holding the codes of words of length.
+    Codes of words longer than 20 letters do not fit in 32 bits.
+    '''
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if 3 ** length <= np.iinfo(dtype).max + 1:
+            return dtype
+    raise ValueError(f"feedback codes of {length}-letter words do not fit in 32 bits")
+
+
+def build_matrix(words, out=None):
+    '''
+    Builds the feedback matrix of every word against every word, a chunk of
+    guesses at a time, into out if given.
+    '''
+    letters = letter_matrix(words)
+    if out is None:
+        out = np.empty((len(words), len(words)), dtype=code_dtype(letters.shape[1]))
+    for start in range(0, len(words), CHUNK):
+        out[start:start + CHUNK] = feedback_codes(letters[start:start + CHUNK], letters)
+    return out
+
+
+def words_hash(words):
+    return hashlib.sha1('\n'.join(words).encode()).hexdigest()[:12]
+
+
+def matrix_path(words, directory):
+    return os.path.join(directory, f"feedback-{words_hash(words)}.npy")
+
+
+def load_matrix(words, directory=None):
+    '''
+    Returns the feedback matrix of words, memory-mapped from its cache file,
+    building the file first if it does not exist.
+
+    Parameters
+    ----------
+    words:
+        A list of strings of all words in the word list.
+    directory:
+        Where the cache file is kept, the directory of this module by default.
+
+    Returns
+    -------
+        A read-only matrix of code_dtype (uint8 for words of up to 5
+        letters), guesses along the rows.
+    '''
+    directory = directory or os.path.dirname(os.path.abspath(__file__))
+    path = matrix_path(words, directory)
+    dtype = code_dtype(len(words[0]))
+    # rebuilt too if written with a dtype too narrow for its codes
+    if not os.path.exists(path) or np.load(path, mmap_mode='r').dtype != dtype:
+        # write to a temporary file first, so that a crash or a concurrent
+        # reader never sees a partial matrix
+        tmp = f"{path}.{os.getpid()}.tmp"
+        out = np.lib.format.open_memmap(tmp, mode='w+', dtype=dtype,
+                                        shape=(len(words), len(words)))
+        build_matrix(words, out)
+        out.flush()
+        del out
+        os.replace(tmp, path)
+    return np.load(path, mmap_mode='r')
+
+
+def partition(matrix, guess, candidates, length=5):
+    '''
+    Returns the number of candidates giving each feedback code to guess,
+    an array of 3^length counts.
+
+    Parameters
+    ----------
+    matrix:
+        The feedback matrix.
+    guess:
+        The row index of the guess.
+    candidates:
+        An index array of the remaining candidate answers.
+    '''
+    return np.bincount(matrix[guess, candidates], minlength=3 ** length)
@@ -0,0 +1,159 @@
+'''
+Entropy-maximising Wordle guesser.
+
+A guess splits the remaining candidates into buckets by the feedback each
+candidate would give. The guesser scores every allowed guess by how well it
+splits them, from one np.bincount of its row of the feedback matrix:
+
+    "entropy"   the expected information of the feedback, in bits (higher
+                is better)
+    "expected"  the expected number of candidates left after the guess
+                (lower is better)
+
+Guesses are chosen from the candidates, or from the whole word list with
+full_list=True, which can split better with a word that cannot be the
+answer. Ties go to candidates, which might be the answer.
+
+    guesser = EntropyGuesser(word_list, full_list=True)
+    guess = guesser.generate_guess(word_list, possible_words, nth_guess)
+'''
+import numpy as np
+
+import feedback
+
+# rows x candidates scored per bincount, to bound memory
+BLOCK = 1 << 22
+
+
+class EntropyGuesser:
+    '''
+    Picks guesses from their feedback partitions of the candidates.
+
+    Parameters
+    ----------
+    word_list:
+        A list of strings of all words in the word list.
+    matrix:
+        The feedback matrix of word_list, loaded with feedback.load_matrix
+        by default.
+    score:
+        "entropy" or "expected".
+    full_list:
+        Whether guesses may be any word of word_list, rather than only the
+        remaining candidates.
+    '''
+
+    def __init__(self, word_list, matrix=None, score="entropy", full_list=False):
+        if score not in ("entropy", "expected"):
+            raise ValueError(f"unknown score {score}")
+        self.word_list = word_list
+        self.index = {word: i for i, word in enumerate(word_list)}
+        self.matrix = feedback.load_matrix(word_list) if matrix is None else matrix
+        self.score = score
+        self.full_list = full_list
+        self.n_codes = 3 ** len(word_list[0])
+        self.opener = None
+
+    def scores(self, guesses, candidates):
+        '''
+        Returns the score of every guess, higher is better.
+
+        Parameters
+        ----------
+        guesses:
+            An index array of the guesses to score.
+        candidates:
+            An index array of the remaining candidates.
+        '''
+        n = len(candidates)
+        n_codes = self.n_codes
+        rows = max(1, BLOCK // max(n, 1))
+        scores = np.empty(len(guesses))
+        for start in range(0, len(guesses), rows):
+            block = guesses[start:start + rows]
+            codes = self.matrix[block][:, candidates].astype(np.int64)
+            codes += (np.arange(len(block)) * n_codes)[:, None]
+            counts = np.bincount(codes.ravel(), minlength=len(block) * n_codes)
+            counts = counts.reshape(len(block), n_codes)
+            if self.score == "entropy":
+                p = counts / n
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    scores[start:start + rows] = -np.nansum(p * np.log2(p), axis=1)
+            else:
+                scores[start:start + rows] = -(counts * counts).sum(axis=1) / n
+        return scores
+
+    def best_guess(self, candidates):
+        '''
+        Returns the index of the best guess for an index array of candidates.
+        '''
+        candidates = np.asarray(candidates, dtype=np.int64)
+        if len(candidates) <= 2:
+            return int(candidates[0])
+        # the opener only depends on the word list, so it is computed once
+        opening = len(candidates) == len(self.word_list)
+        if opening and self.opener is not None:
+            return self.opener
+        guesses = np.arange(len(self.word_list)) if self.full_list else candidates
+        scores = self.scores(guesses, candidates)
+        ties = guesses[scores >= scores.max() - 1e-12]
+        in_candidates = np.isin(ties, candidates)
+        if in_candidates.any():
+            ties = ties[in_candidates]
+        guess = int(ties[0])
+        if opening:
+            self.opener = guess
+        return guess
+
+    def generate_guess(self, word_list, possible_words, nth_guess):
+        '''
+        Generates the best guess word, with the signature of
+        text.generate_smart_guess.
+
+        Parameters
+        ----------
+        word_list:
+            A list of strings of all words in the word list.
+        possible_words:
+            A list of strings of all possible remaining words in the word list.
+        nth_guess:
+            A number indicating how many guesses have been made so far inclusive of this one.
+
+        Returns
+        -------
+            A string of the best guess.
+        '''
+        candidates = np.array([self.index[word] for word in possible_words], dtype=np.int64)
+        return self.word_list[self.best_guess(candidates)]
+
+
+def play(guesser, answer, max_guesses=6):
+    '''
+    Plays one game against answer, filtering the candidates with the
+    feedback matrix.
+
+    Parameters
+    ----------
+    guesser:
+        An EntropyGuesser.
+    answer:
+        The index of the answer in the word list.
+    max_guesses:
+        The number of guesses allowed.
+
+    Returns
+    -------
+        The list of guess indices, ending with the answer if it was found.
+    '''
+    matrix = guesser.matrix
+    candidates = np.arange(len(guesser.word_list))
+    solved = guesser.n_codes - 1
+    guesses = []
+    while len(guesses) < max_guesses:
+        guess = guesser.best_guess(candidates)
+        guesses.append(guess)
+        code = matrix[guess, answer]
+        if code == solved:
+            break
+        candidates = candidates[matrix[guess, candidates] == code]
+    return guesses
@@ -0,0 +1,361 @@
+'''
+Candidate-set cache keyed by feedback history.
+
+Across games the same prefixes recur all the time: the opener and its
+common feedback, then the usual follow-ups. The candidates left after a
+history do not depend on the order of its (guess, feedback) pairs, and
+neither does the next guess of a guesser that only looks at the
+candidates, so a history is canonicalised to its sorted set of pairs and
+mapped to the surviving candidate index array and the next guess.
+
+HistoryCache is a bounded LRU of such entries, with hit metrics. Its
+entries can be written to a snapshot, sorted 64-bit key hashes and
+concatenated arrays in .npy files, which any number of worker processes
+memory-map read-only and consult after their own LRU. Every snapshot is
+written to a fresh directory, path.<version>/, and published by replacing
+path.json, which names that directory and records what the entries were
+built for (the word list and the guesser), so readers see either the old
+snapshot or the new one in full:
+
+    solver = CachedSolver(guesser.EntropyGuesser(word_list))
+    ...play games...
+    solver.cache.save_snapshot("cache/entropy")
+
+    # in every worker
+    cache = HistoryCache(snapshot="cache/entropy")
+    solver = CachedSolver(guesser.EntropyGuesser(word_list), cache)
+'''
+import os
+import json
+import time
+import random
+import shutil
+import hashlib
+import argparse
+
+from collections import OrderedDict
+
+import numpy as np
+
+import feedback
+import guesser
+
+
+def canonical(history):
+    '''
+    Returns the canonical key of a history of (guess index, feedback code)
+    pairs: the sorted tuple of its distinct pairs.
+    '''
+    return tuple(sorted(set((int(g), int(c)) for g, c in history)))
+
+
+def key_hash(key):
+    '''
+    Returns a 64-bit hash of a key that is stable across processes.
+    '''
+    data = np.asarray(key, dtype=np.int32).tobytes()
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+def cache_meta(player):
+    '''
+    What the entries of a guesser are built for, as stored next to a
+    snapshot.
+    '''
+    return {"words": feedback.words_hash(player.word_list),
+            "guesser": type(player).__name__,
+            "score": getattr(player, "score", None),
+            "full_list": getattr(player, "full_list", None)}
+
+
+ARRAYS = ("hashes", "key_start", "keys", "cand_start", "candidates", "guesses")
+
+
+def read_meta(path):
+    '''
+    Returns the metadata of the snapshot at path, None if there is none.
+    Besides cache_meta it holds "entries", the number of entries, and
+    "version", the directory of the arrays next to path.json.
+    '''
+    try:
+        with open(path + ".json", "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def default_snapshot():
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "entropy")
+
+
+class HistoryCache:
+    '''
+    LRU cache of (candidates, next guess) by canonical history, backed by
+    an optional read-only snapshot.
+
+    Parameters
+    ----------
+    capacity:
+        The number of entries kept in memory.
+    snapshot:
+        The path of a snapshot written by save_snapshot, memory-mapped on
+        first use.
+    meta:
+        What the entries are built for, from cache_meta. A snapshot built
+        for anything else is rejected; CachedSolver sets it by default.
+    '''
+
+    def __init__(self, capacity=100000, snapshot=None, meta=None):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.snapshot = snapshot
+        self.meta = meta
+        self.arrays = None
+        self.hits = 0
+        self.snapshot_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def load(self):
+        '''
+        Memory-maps the snapshot, on first use. Raises ValueError if there
+        is no snapshot at its path, or it was built for another word list
+        or guesser than meta.
+        '''
+        if self.arrays is None and self.snapshot is not None:
+            meta = read_meta(self.snapshot)
+            if meta is None or "version" not in meta:
+                raise ValueError(f"{self.snapshot} has no snapshot metadata")
+            entries, version = meta.pop("entries"), meta.pop("version")
+            if self.meta is not None and meta != self.meta:
+                raise ValueError(f"{self.snapshot} was built for another word list or guesser")
+            directory = os.path.join(os.path.dirname(self.snapshot), version)
+            arrays = {name: np.load(os.path.join(directory, name + ".npy"), mmap_mode='r')
+                      for name in ARRAYS}
+            if len(arrays["hashes"]) != entries:
+                raise ValueError(f"{self.snapshot} does not match its metadata")
+            self.arrays = arrays
+        return self.arrays
+
+    def _from_snapshot(self, key):
+        arrays = self.load()
+        if not arrays:
+            return None
+        hashes = arrays["hashes"]
+        k = int(np.searchsorted(hashes, np.uint64(key_hash(key))))
+        if k == len(hashes) or int(hashes[k]) != key_hash(key):
+            return None
+        stored = arrays["keys"][arrays["key_start"][k]:arrays["key_start"][k + 1]]
+        if tuple(map(tuple, np.asarray(stored).reshape(-1, 2).tolist())) != key:
+            return None
+        candidates = arrays["candidates"][arrays["cand_start"][k]:arrays["cand_start"][k + 1]]
+        return candidates, int(arrays["guesses"][k])
+
+    def get(self, key):
+        '''
+        Returns the (candidates, next guess) of a canonical key, or None.
+        '''
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        entry = self._from_snapshot(key)
+        if entry is not None:
+            self.snapshot_hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def put(self, key, candidates, guess):
+        self.entries[key] = (candidates, guess)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def metrics(self):
+        '''
+        Returns the hit counts and rate of the cache.
+        '''
+        lookups = self.hits + self.snapshot_hits + self.misses
+        return {"entries": len(self.entries), "hits": self.hits,
+                "snapshot_hits": self.snapshot_hits, "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.snapshot_hits) / lookups if lookups else 0.0}
+
+    def save_snapshot(self, path):
+        '''
+        Writes the in-memory entries (and those of the current snapshot) to
+        a new directory path.<version>/ and publishes it by replacing
+        path.json in one rename. Versions older than the one replaced are
+        removed.
+        '''
+        entries = {}
+        arrays = self.load()
+        if arrays:
+            key_start, cand_start = arrays["key_start"], arrays["cand_start"]
+            for k in range(len(arrays["hashes"])):
+                key = tuple(map(tuple, np.asarray(
+                    arrays["keys"][key_start[k]:key_start[k + 1]]).reshape(-1, 2).tolist()))
+                entries[key] = (np.array(arrays["candidates"][cand_start[k]:cand_start[k + 1]]),
+                                int(arrays["guesses"][k]))
+        entries.update(self.entries)
+
+        keys = sorted(entries, key=key_hash)
+        flat_keys = [np.asarray(key, dtype=np.int32).ravel() for key in keys]
+        candidates = [np.asarray(entries[key][0], dtype=np.int32) for key in keys]
+        data = {
+            "hashes": np.array([key_hash(key) for key in keys], dtype=np.uint64),
+            "key_start": np.cumsum([0] + [len(k) for k in flat_keys]).astype(np.int64),
+            "keys": np.concatenate(flat_keys or [np.zeros(0, np.int32)]),
+            "cand_start": np.cumsum([0] + [len(c) for c in candidates]).astype(np.int64),
+            "candidates": np.concatenate(candidates or [np.zeros(0, np.int32)]),
+            "guesses": np.array([entries[key][1] for key in keys], dtype=np.int32),
+        }
+        parent, name = os.path.split(path)
+        version = f"{name}.{time.time_ns()}-{os.getpid()}"
+        directory = os.path.join(parent, version)
+        # readers only find the directory once path.json names it
+        os.makedirs(directory)
+        for array_name, array in data.items():
+            np.save(os.path.join(directory, array_name + ".npy"), array)
+        previous = read_meta(path)
+        meta = dict(self.meta or {}, entries=len(keys), version=version)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, path + ".json")
+
+        # keep the version just replaced for readers that read path.json
+        # before the rename, drop older ones
+        keep = {version, (previous or {}).get("version")}
+        for entry in os.listdir(parent or "."):
+            if entry.startswith(name + ".") and entry not in keep and \
+                    os.path.isdir(os.path.join(parent, entry)):
+                shutil.rmtree(os.path.join(parent, entry), ignore_errors=True)
+        self.arrays = None
+        self.snapshot = path
+
+
+class CachedSolver:
+    '''
+    A guesser whose candidate sets and guesses are memoised by history.
+
+    Parameters
+    ----------
+    player:
+        A guesser.EntropyGuesser, or any guesser with its best_guess and
+        matrix.
+    cache:
+        A HistoryCache, a new one by default.
+    '''
+
+    def __init__(self, player, cache=None):
+        self.player = player
+        self.cache = HistoryCache() if cache is None else cache
+        if self.cache.meta is None:
+            self.cache.meta = cache_meta(player)
+        self.index = {word: i for i, word in enumerate(player.word_list)}
+        self.history = []
+
+    def step(self, history):
+        '''
+        Returns (candidates, next guess) after a history of (guess index,
+        feedback code) pairs.
+        '''
+        key = canonical(history)
+        entry = self.cache.get(key)
+        if entry is not None:
+            return entry
+        if not key:
+            candidates = np.arange(len(self.player.word_list), dtype=np.int32)
+        else:
+            # extend the entry of the history without its last pair, which
+            # is usually cached already
+            guess, code = history[-1]
+            parent, _ = self.step([pair for pair in history[:-1] if tuple(pair) != (guess, code)])
+            candidates = parent[np.asarray(self.player.matrix[guess, parent]) == code]
+        guess = self.player.best_guess(candidates) if len(candidates) else -1
+        self.cache.put(key, candidates, guess)
+        return candidates, guess
+
+    def generate_guess(self, word_list, possible_words, nth_guess):
+        '''
+        Generates the next guess, with the signature of
+        text.generate_smart_guess. The feedback to the previous guess is
+        the one every remaining possible word gives it.
+
+        Parameters
+        ----------
+        word_list:
+            A list of strings of all words in the word list.
+        possible_words:
+            A list of strings of all possible remaining words in the word list.
+        nth_guess:
+            A number indicating how many guesses have been made so far inclusive of this one.
+
+        Returns
+        -------
+            A string of the next guess.
+        '''
+        if nth_guess == 1:
+            self.history = []
+        elif self.history and possible_words:
+            previous = self.history[-1][0]
+            code = int(self.player.matrix[previous, self.index[possible_words[0]]])
+            self.history[-1] = (previous, code)
+        _, guess = self.step([pair for pair in self.history if pair[1] is not None])
+        self.history.append((guess, None))
+        return self.player.word_list[guess]
+
+
+def play(solver, answer, max_guesses=6):
+    '''
+    Plays one game with a CachedSolver, returning the guess indices.
+    '''
+    matrix = solver.player.matrix
+    solved = solver.player.n_codes - 1
+    history, guesses = [], []
+    while len(guesses) < max_guesses:
+        _, guess = solver.step(history)
+        guesses.append(guess)
+        code = int(matrix[guess, answer])
+        if code == solved:
+            break
+        history.append((guess, code))
+    return guesses
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sample", type=int, default=2000,
+                        help="games played to warm the cache, 0 for every answer")
+    parser.add_argument("--capacity", type=int, default=100000)
+    parser.add_argument("--out", help="snapshot path, cache/entropy by default")
+    args = parser.parse_args(argv)
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(here, 'words.txt'), 'r') as f:
+        word_list = f.read().splitlines()
+    answers = list(range(len(word_list)))
+    if args.sample:
+        answers = random.Random(2109).sample(answers, args.sample)
+    solver = CachedSolver(guesser.EntropyGuesser(word_list), HistoryCache(args.capacity))
+
+    start = time.time()
+    for answer in answers:
+        play(solver, answer)
+    elapsed = time.time() - start
+    path = args.out or default_snapshot()
+    solver.cache.save_snapshot(path)
+    print(f"{len(answers)} games in {elapsed:.1f}s ({1000 * elapsed / len(answers):.2f}ms/game)")
+    print(f"snapshot of {len(solver.cache)} entries written to {path}")
+    print(solver.cache.metrics())
+
+
+if __name__ == "__main__":
+    main()
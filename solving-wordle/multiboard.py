@@ -0,0 +1,267 @@
+'''
+Multi-board Wordle (Quordle, Octordle, ...) over words of any length.
+
+Every guess is played on all the boards still unsolved at once, so a guess
+is scored once against the union of their candidates: one block of
+feedback codes (from the feedback matrix, or computed with
+feedback.feedback_codes for word lists without one), from which every
+board's partition is counted with a single np.bincount. The boards are
+independent, so a guess is worth the sum of its information over the
+boards, in bits, plus its chance of solving each of them.
+
+At most max_pool guesses are scored per turn, which bounds the work
+whatever the number of boards: half are candidates spread evenly over the
+active boards, half are probes from the whole word list, the words whose
+letters best split the candidates. Codes of words up to 5 letters fit in a
+uint8, longer words use feedback.code_dtype (uint16 up to 10 letters, uint32
+up to 20) and are relabelled densely before counting.
+
+    solver = MultiBoardSolver(word_list, 8, feedback.load_matrix(word_list))
+    guesses, solved_on = play(solver, answers)
+
+    python multiboard.py --boards 8 --games 100
+    python multiboard.py --boards 4 --words words6.txt --live
+'''
+import time
+import random
+import argparse
+
+import numpy as np
+
+import feedback
+import dictionary
+
+# answers the opener is scored against, taken evenly over the word list
+OPENER_SAMPLE = 2048
+# bits a guess is worth per board it is expected to solve
+SOLVE_WEIGHT = 2.0
+
+
+class MultiBoardSolver:
+    '''
+    Picks guesses for several boards sharing one word list.
+
+    Parameters
+    ----------
+    word_list:
+        A list of strings of words of the same length.
+    n_boards:
+        The number of boards played at once.
+    matrix:
+        The feedback matrix of word_list (see feedback.load_matrix), or None
+        to compute the codes of each turn.
+    max_pool:
+        The number of guesses scored per turn.
+    '''
+
+    def __init__(self, word_list, n_boards, matrix=None, max_pool=256):
+        self.word_list = word_list
+        self.n_boards = n_boards
+        self.matrix = matrix
+        self.max_pool = max_pool
+        self.letters = feedback.letter_matrix(word_list)
+        # present[w, l] is 1 if word w has letter l
+        self.present = np.zeros((len(word_list), 26), dtype=np.float32)
+        self.present[np.arange(len(word_list))[:, None], self.letters] = 1
+        self.length = self.letters.shape[1]
+        self.n_codes = 3 ** self.length
+        self.solved_code = self.n_codes - 1
+        self.opener = None
+        self.reset()
+
+    def reset(self):
+        '''
+        Starts a new game: every board may be any word.
+        '''
+        everything = np.arange(len(self.word_list))
+        self.candidates = [everything] * self.n_boards
+        self.turn = 0
+
+    def active(self):
+        '''
+        Returns the numbers of the unsolved boards.
+        '''
+        return [b for b, c in enumerate(self.candidates) if c is not None]
+
+    def codes(self, guesses, answers):
+        '''
+        Returns the feedback codes of guesses (rows) against answers, both
+        index arrays.
+        '''
+        if self.matrix is not None:
+            return np.asarray(self.matrix[np.ix_(guesses, answers)])
+        out = np.empty((len(guesses), len(answers)), dtype=feedback.code_dtype(self.length))
+        answer_letters = self.letters[answers]
+        for start in range(0, len(guesses), feedback.CHUNK):
+            block = guesses[start:start + feedback.CHUNK]
+            out[start:start + len(block)] = feedback.feedback_codes(self.letters[block],
+                                                                    answer_letters)
+        return out
+
+    def scores(self, guesses, boards):
+        '''
+        Returns the combined score of every guess over the candidate sets of
+        boards: the summed information of its feedback, in bits, plus the
+        expected number of boards it solves.
+
+        Parameters
+        ----------
+        guesses:
+            An index array of the guesses to score.
+        boards:
+            A list of index arrays, the candidates of each board.
+        '''
+        union, columns = np.unique(np.concatenate(boards), return_inverse=True)
+        sizes = np.array([len(c) for c in boards])
+        codes = self.codes(guesses, union)[:, columns].astype(np.int64)
+        n_codes = self.n_codes
+        if n_codes > 256:
+            # long words: count over the codes that occur, not all 3^length
+            values, codes = np.unique(codes, return_inverse=True)
+            codes = codes.reshape(len(guesses), -1)
+            n_codes = len(values)
+        # one bincount over (guess, board, code)
+        board_of = np.repeat(np.arange(len(boards)), sizes)
+        codes += board_of * n_codes
+        codes += (np.arange(len(guesses)) * len(boards) * n_codes)[:, None]
+        counts = np.bincount(codes.ravel(), minlength=len(guesses) * len(boards) * n_codes)
+
+        # H = log2(n) - sum(c log2 c) / n for each board of n candidates,
+        # summing over the buckets that are not empty only
+        buckets = np.flatnonzero(counts)
+        filled = counts[buckets]
+        c_log_c = np.bincount(buckets // n_codes, weights=filled * np.log2(filled),
+                              minlength=len(guesses) * len(boards))
+        c_log_c = c_log_c.reshape(len(guesses), len(boards))
+        information = (np.log2(sizes) - c_log_c / sizes).sum(axis=1)
+        solves = np.zeros(len(guesses))
+        for board in boards:
+            solves += np.isin(guesses, board) / len(board)
+        return information + SOLVE_WEIGHT * solves
+
+    def pool(self, boards):
+        '''
+        Returns the guesses to score, at most max_pool of them: candidates
+        of every board, spread evenly, and as many probes from the whole
+        word list, the words whose letters best split the candidates.
+        '''
+        share = max(1, self.max_pool // (2 * len(boards)))
+        picks = [c[::-(-len(c) // share)] for c in boards]
+        # a letter splits a board best when half its candidates contain it
+        weight = np.zeros(26)
+        for board in boards:
+            having = self.present[board].sum(axis=0)
+            weight += having * (len(board) - having) / len(board) ** 2
+        probes = self.present @ weight
+        n_probes = min(len(probes), self.max_pool // 2)
+        picks.append(np.argpartition(-probes, n_probes - 1)[:n_probes])
+        return np.unique(np.concatenate(picks))
+
+    def best_guess(self):
+        '''
+        Returns the index of the best guess for the current candidates.
+        '''
+        boards = [self.candidates[b] for b in self.active()]
+        if self.turn == 0:
+            # every board is the whole word list, so they all score alike
+            if self.opener is None:
+                everything = np.arange(len(self.word_list))
+                sample = everything[::-(-len(everything) // OPENER_SAMPLE)]
+                # in blocks of guesses, as codes() builds the matrix
+                scores = np.concatenate([
+                    self.scores(everything[start:start + feedback.CHUNK], [sample])
+                    for start in range(0, len(everything), feedback.CHUNK)])
+                self.opener = int(everything[np.argmax(scores)])
+            return self.opener
+        guesses = self.pool(boards)
+        return int(guesses[np.argmax(self.scores(guesses, boards))])
+
+    def update(self, guess, codes):
+        '''
+        Narrows every active board to the candidates consistent with the
+        feedback code it gave to guess.
+
+        Parameters
+        ----------
+        guess:
+            The index of the guess.
+        codes:
+            The feedback code of every board, ignored for solved boards.
+        '''
+        for b in self.active():
+            if codes[b] == self.solved_code:
+                self.candidates[b] = None
+                continue
+            board = self.candidates[b]
+            row = self.codes(np.array([guess]), board)[0]
+            self.candidates[b] = board[row == codes[b]]
+        self.turn += 1
+
+
+def play(solver, answers, max_turns=None):
+    '''
+    Plays one game with one answer per board.
+
+    Parameters
+    ----------
+    solver:
+        A MultiBoardSolver.
+    answers:
+        The index of the answer of every board.
+    max_turns:
+        The number of guesses allowed, the number of boards plus 5 by
+        default (9 for Quordle, 13 for Octordle).
+
+    Returns
+    -------
+        (guesses, turn each board was solved on, 0 for unsolved boards).
+    '''
+    max_turns = max_turns or len(answers) + 5
+    answers = np.asarray(answers)
+    solver.reset()
+    solved_on = np.zeros(len(answers), dtype=np.int64)
+    guesses = []
+    while len(guesses) < max_turns and not solved_on.all():
+        guess = solver.best_guess()
+        guesses.append(guess)
+        codes = solver.codes(np.array([guess]), answers)[0]
+        solved_on[(codes == solver.solved_code) & (solved_on == 0)] = len(guesses)
+        solver.update(guess, codes)
+        if any(c is not None and not len(c) for c in solver.candidates):
+            break
+    return guesses, solved_on
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--boards", type=int, default=4)
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=2109)
+    parser.add_argument("--max-pool", type=int, default=256)
+    parser.add_argument("--words", help="word list file, words.txt by default")
+    parser.add_argument("--live", action="store_true",
+                        help="compute codes each turn instead of loading the feedback matrix")
+    args = parser.parse_args(argv)
+
+    word_list = dictionary.load(args.words or dictionary.WORDS_PATH).word_list
+    matrix = None if args.live else feedback.load_matrix(word_list)
+    solver = MultiBoardSolver(word_list, args.boards, matrix, args.max_pool)
+    solver.best_guess()
+
+    rng = random.Random(args.seed)
+    turns, failed, seconds = [], 0, 0.0
+    for _ in range(args.games):
+        answers = rng.sample(range(len(word_list)), args.boards)
+        start = time.perf_counter()
+        guesses, solved_on = play(solver, answers)
+        seconds += time.perf_counter() - start
+        turns.append(len(guesses))
+        failed += not solved_on.all()
+    print(f"{args.boards} boards of {solver.length} letters, opener {word_list[solver.opener]}")
+    print(f"  mean turns {np.mean(turns):.3f}, max {max(turns)}, "
+          f"failed {failed}/{args.games}")
+    print(f"  per turn: {1000 * seconds / sum(turns):.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+'''
+Wordle simulation harness.
+
+Plays every answer of words.txt (or a random sample of them) against a
+guess strategy on a process pool, and reports the distribution of the
+number of guesses, the failure rate and the time per game. One CSV row per
+game can be written for later comparison.
+
+A strategy is any function with the signature of text.generate_smart_guess,
+generate_guess(word_list, possible_words, nth_guess) -> guess, built in each
+worker by a factory registered in STRATEGIES, so it never has to be pickled.
+Games are refereed with the feedback codes of the feedback module (the
+rules of make_evaluate_guess) and candidates are filtered with a
+word_index.WordIndex (the rules of filter_available_words).
+
+    python simulate.py entropy --workers 8 --csv entropy.csv
+    python simulate.py smart --sample 500
+'''
+import csv
+import time
+import random
+import argparse
+import multiprocessing as mp
+
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import feedback
+import guesser
+import dictionary
+import adversarial
+import decision_tree
+import history_cache
+
+
+def _smart(word_list):
+    import text
+    return text.generate_smart_guess
+
+
+def _cached(word_list):
+    # every worker maps the shared snapshot, if one was written for this
+    # word list and guesser, and otherwise relies on its own LRU
+    player = guesser.EntropyGuesser(word_list)
+    cache = history_cache.HistoryCache(snapshot=history_cache.default_snapshot(),
+                                       meta=history_cache.cache_meta(player))
+    try:
+        cache.load()
+    except (OSError, ValueError):
+        cache.snapshot = None
+    return history_cache.CachedSolver(player, cache).generate_guess
+
+
+STRATEGIES = {
+    "smart": _smart,
+    "entropy": lambda word_list: guesser.EntropyGuesser(word_list).generate_guess,
+    "entropy-full": lambda word_list: guesser.EntropyGuesser(
+        word_list, full_list=True).generate_guess,
+    "expected": lambda word_list: guesser.EntropyGuesser(
+        word_list, score="expected").generate_guess,
+    "tree": lambda word_list: decision_tree.TreeSolver(
+        word_list, decision_tree.default_path()).generate_guess,
+    "cached": _cached,
+    "minimax": lambda word_list: adversarial.MinimaxSolver(
+        word_list, max_branch=20).generate_guess,
+}
+# strategies reading the feedback matrix, built by the parent before the
+# workers map it
+MATRIX_STRATEGIES = {"entropy", "entropy-full", "expected", "tree", "cached", "minimax"}
+
+# the word list, its index and the strategy of this worker process
+_game = {}
+
+
+def read_words(path=None):
+    '''
+    Returns the list of words in path, words.txt next to this module by
+    default, through its compiled dictionary.
+    '''
+    return dictionary.load(path or dictionary.WORDS_PATH).word_list
+
+
+def _init_worker(strategy, words_path):
+    # the parent compiled the dictionary, workers only map it
+    words = dictionary.load(words_path or dictionary.WORDS_PATH)
+    word_list = words.word_list
+    _game["word_list"] = word_list
+    _game["index"] = words.word_index()
+    _game["strategy"] = STRATEGIES[strategy](word_list)
+    # warm up, so that one-off work such as choosing the opener is not
+    # counted in the first game
+    _game["strategy"](word_list, word_list, 1)
+
+
+def play_game(answer, generate_guess, word_list, index, max_guesses=6):
+    '''
+    Plays one game.
+
+    Parameters
+    ----------
+    answer:
+        The hidden word.
+    generate_guess:
+        The guess strategy.
+    word_list:
+        A list of strings of all words in the word list.
+    index:
+        The word_index.WordIndex of word_list.
+    max_guesses:
+        The number of guesses allowed.
+
+    Returns
+    -------
+        The list of guesses made, ending with the answer if it was found.
+    '''
+    answer_letters = feedback.letter_matrix([answer])
+    solved = "G" * len(answer)
+    candidates = None
+    guesses = []
+    while len(guesses) < max_guesses:
+        possible_words = word_list if candidates is None else index.words(candidates)
+        guess = generate_guess(word_list, possible_words, len(guesses) + 1)
+        guesses.append(guess)
+        code = feedback.feedback_codes(feedback.letter_matrix([guess]), answer_letters)[0, 0]
+        colours = feedback.decode(int(code), len(answer))
+        if colours == solved:
+            break
+        candidates = index.filter(guess, colours, candidates)
+        if not len(candidates):
+            break
+    return guesses
+
+
+def _play_chunk(answers, max_guesses):
+    results = []
+    for answer in answers:
+        start = time.perf_counter()
+        guesses = play_game(answer, _game["strategy"], _game["word_list"],
+                            _game["index"], max_guesses)
+        elapsed = time.perf_counter() - start
+        results.append({"answer": answer,
+                        "guesses": len(guesses),
+                        "solved": guesses[-1] == answer,
+                        "seconds": elapsed,
+                        "sequence": " ".join(guesses)})
+    return results
+
+
+def simulate(strategy, answers=None, workers=0, max_guesses=6, words_path=None,
+        chunksize=64):
+    '''
+    Plays every answer against a strategy on a process pool.
+
+    Parameters
+    ----------
+    strategy:
+        A key of STRATEGIES.
+    answers:
+        A list of the hidden words to play, the whole word list by default.
+    workers:
+        The number of worker processes, all cores if 0.
+    max_guesses:
+        The number of guesses allowed per game.
+    words_path:
+        The word list file, words.txt by default.
+    chunksize:
+        The number of games sent to a worker at once.
+
+    Returns
+    -------
+        A list of one dict per game, in the order of answers.
+    '''
+    word_list = read_words(words_path)
+    answers = word_list if answers is None else answers
+    if strategy in MATRIX_STRATEGIES:
+        feedback.load_matrix(word_list)
+    if strategy == "tree":
+        decision_tree.ensure_tree(word_list)
+    chunks = [answers[i:i + chunksize] for i in range(0, len(answers), chunksize)]
+    with ProcessPoolExecutor(max_workers=workers or mp.cpu_count(),
+                             initializer=_init_worker,
+                             initargs=(strategy, words_path)) as pool:
+        results = []
+        for chunk in pool.map(_play_chunk, chunks, [max_guesses] * len(chunks)):
+            results.extend(chunk)
+    return results
+
+
+def summarise(results):
+    '''
+    Returns the guess distribution, failure rate and latency of games.
+    '''
+    seconds = np.array([r["seconds"] for r in results])
+    solved = [r for r in results if r["solved"]]
+    return {"games": len(results),
+            "distribution": dict(sorted(Counter(r["guesses"] for r in solved).items())),
+            "mean_guesses": float(np.mean([r["guesses"] for r in solved])) if solved else None,
+            "failure_rate": 1 - len(solved) / len(results) if results else 0.0,
+            "mean_ms": 1000 * float(seconds.mean()) if results else 0.0,
+            "p95_ms": 1000 * float(np.percentile(seconds, 95)) if results else 0.0}
+
+
+def write_csv(results, path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=["answer", "guesses", "solved",
+                                               "seconds", "sequence"])
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("strategy", choices=sorted(STRATEGIES))
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--sample", type=int, default=0,
+                        help="play a random sample of this many answers")
+    parser.add_argument("--seed", type=int, default=2109)
+    parser.add_argument("--max-guesses", type=int, default=6)
+    parser.add_argument("--words", help="word list file, words.txt by default")
+    parser.add_argument("--csv", help="write one row per game to this file")
+    args = parser.parse_args(argv)
+
+    answers = read_words(args.words)
+    if args.sample:
+        answers = random.Random(args.seed).sample(answers, args.sample)
+    start = time.time()
+    results = simulate(args.strategy, answers, args.workers, args.max_guesses, args.words)
+    elapsed = time.time() - start
+    if args.csv:
+        write_csv(results, args.csv)
+
+    summary = summarise(results)
+    print(f"{args.strategy}: {summary['games']} games in {elapsed:.1f}s")
+    for n_guesses, count in summary["distribution"].items():
+        print(f"  {n_guesses} guesses: {count:>6d}")
+    print(f"  mean guesses (solved): {summary['mean_guesses']}")
+    print(f"  failure rate: {100 * summary['failure_rate']:.2f}%")
+    print(f"  per game: {summary['mean_ms']:.2f}ms mean, {summary['p95_ms']:.2f}ms p95")
+
+
+if __name__ == "__main__":
+    main()
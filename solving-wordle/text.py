@@ -1,11 +1,24 @@
-import os
-from time import sleep
+import numpy as np
 
-dir_path = os.getcwd()
-word_list = open(os.path.join(dir_path, 'words.txt'), 'r').read().splitlines()
-print(f"original length: {len(word_list)}")
+import dictionary
+import feedback
+import word_index
 
-from turtle import pos
+# words.txt next to this module, through its compiled dictionary
+_dictionary = dictionary.load()
+word_list = _dictionary.word_list
+
+
+_word_index = None
+
+def get_word_index():
+    '''
+    Returns the word_index.WordIndex of word_list, built on first use.
+    '''
+    global _word_index
+    if _word_index is None:
+        _word_index = _dictionary.word_index()
+    return _word_index
 
 
 def filter_available_words(guess_word, colours, possible_words):
@@ -34,67 +47,18 @@ def filter_available_words(guess_word, colours, possible_words):
         # Guess is the correct word
         return [guess_word]
     
-    # Key: letter
-    # Value: Array containing the index where the letter occured, and the number of non-black occurences
-    occurence_dict = {}
-    for index in range(len(guess_word)):
-        letter = guess_word[index]
-        if letter not in occurence_dict.keys():
-            occurence_dict[letter] = [[], 0]
-        occurence_dict[letter][0].append(index)
-        if colours[index] != black:
-            occurence_dict[letter][1] += 1
-    # print(occurence_dict)
-
-    for index in range(len(guess_word)):
-        current_colour = colours[index]
-        current_letter = guess_word[index]
-
-        if current_colour == green:
-            green_filter = lambda word : word[index] == current_letter
-            possible_words = list(filter(green_filter, possible_words))
-            # print(f"current length: {len(possible_words)}")
-            # print(possible_words)
-
-        elif current_colour == yellow:
-            def yellow_filter(word):
-                # Check if current letter is either not in word OR in the same index as guess word
-                if current_letter not in word or word[index] == current_letter:
-                    return False
-                letter_occurence = occurence_dict[current_letter]
-                min_num_of_letters = letter_occurence[1]
-                if min_num_of_letters == 1:
-                    return True
-                # Reaching here means that the curr letter IS in word, NOT in curr index, and its repeated
-                if word.count(current_letter) < min_num_of_letters:
-                    return False
-                return True
-            possible_words = list(filter(yellow_filter, possible_words))
-            # print(f"current length: {len(possible_words)}")
-            # print(possible_words)
-
-        elif current_colour == black:
-            def black_filter(word):
-                # Check if current letter is not in word
-                if current_letter not in word:
-                    return True
-                if current_letter == word[index]:
-                    return False
-                # Curr letter is in this word
-                letter_occurence = occurence_dict[current_letter]
-                max_num_of_letters = letter_occurence[1]
-                if max_num_of_letters == 0:
-                    # Letter is not repeated or it is repeated but does not belong in word
-                    return False
-                # Reaching here means that the curr letter is repeated and IS in CORRECT word and should not be filtered out
-                if word.count(current_letter) > max_num_of_letters:
-                    return False
-                return True
-            possible_words = list(filter(black_filter, possible_words))
-            # print(f"current length: {len(possible_words)}")
-            # print(possible_words)
-    
-    return possible_words
+    # The constraints are evaluated as masks over the index of the word
+    # list, built once; other word lists get an index of their own
+    index = get_word_index()
+    if possible_words is word_list:
+        candidates = None
+    else:
+        positions = index.positions
+        candidates = np.fromiter((positions.get(word, -1) for word in possible_words),
+                                 dtype=np.int64, count=len(possible_words))
+        if len(candidates) and candidates.min() < 0:
+            index, candidates = word_index.WordIndex(possible_words), None
+    return index.words(index.filter(guess_word, colours, candidates))
 
 # print(filter_available_words("CECRY", "YGGBB", word_list))
 # print(filter_available_words("CECRC", "GGYYB", word_list))
@@ -309,19 +273,12 @@ def generate_smart_guess(word_list, possible_words, nth_guess):
             letter_set.add(letter)
         return points / len(letter_set)
 
-    def heuristic_high(guess_word, potential_answer):
-        colours = make_evaluate_guess(potential_answer, word_list)(guess_word)
-        # result = filter_available_words(guess_word, colours, possible_words)
-        # G = 10, Y = 5, B = 1
-        points = 0
-        for colour in colours:
-            if colour == "G":
-                points += 10
-            if colour == "Y":
-                points += 5
-            if colour == "B":
-                points += 1
-        return points
+    # G = 10, Y = 5, B = 1, summed over the letters of every feedback code
+    colour_points = np.array([1, 5, 10])
+    code_points = np.zeros(3 ** 5, dtype=np.int64)
+    for code in range(3 ** 5):
+        for i in range(5):
+            code_points[code] += colour_points[code // 3 ** i % 3]
   
     # if nth_guess == 1:
     #     return "salet"
@@ -338,39 +295,57 @@ def generate_smart_guess(word_list, possible_words, nth_guess):
         length = len(sorted_dict)
         return sorted_dict[length // 2][0]
     
-    for possible_guess in possible_words:
-        total_points = 0
-        for potential_answer in possible_words:
-            total_points += heuristic_high(possible_guess, potential_answer)
-        guess_points_dict[possible_guess] = total_points
+    # Score every possible guess against every possible answer, a block of
+    # guesses at a time so that the temporaries stay small
+    letters = feedback.letter_matrix(possible_words)
+    total_points = np.empty(len(possible_words), dtype=np.int64)
+    for start in range(0, len(possible_words), feedback.CHUNK):
+        codes = feedback.feedback_codes(letters[start:start + feedback.CHUNK], letters)
+        total_points[start:start + feedback.CHUNK] = code_points[codes].sum(axis=1)
 
     # if nth_guess <= 2:
     #     sorted_dict = sorted(guess_points_dict.items(), key=lambda kv: kv[1])
     #     length = len(sorted_dict)
     #     return sorted_dict[length // 2][0]
     
-    v = list(guess_points_dict.values())
-    k = list(guess_points_dict.keys())
-    return k[v.index(max(v))]
-
-print(generate_smart_guess(word_list, list_test, 4))
-
-def smart_solver(word_list, evaluate_guess_func, max_guess):
-    possible_words = word_list.copy()
-    for num in range(max_guess):
-        print(f"Try {num}")
-        sleep(4)
-        guess = generate_smart_guess(word_list, possible_words, num)
+    return possible_words[int(np.argmax(total_points))]
+
+def smart_solver(word_list, evaluate_guess_func, max_guess, generate_guess=None):
+    '''
+    Plays one game of Wordle.
+
+    Parameters
+    ----------
+    word_list:
+        A list of strings of all words in the word list.
+    evaluate_guess_func:
+        The function returned by make_evaluate_guess for the hidden word.
+    max_guess:
+        The number of guesses allowed.
+    generate_guess:
+        The guess strategy, with the signature of generate_smart_guess,
+        generate_smart_guess by default.
+
+    Returns
+    -------
+        The hidden word if it was found within max_guess guesses, otherwise
+        "NOT POSSIBLE".
+    '''
+    generate_guess = generate_guess or generate_smart_guess
+    possible_words = word_list
+    for num in range(1, max_guess + 1):
+        guess = generate_guess(word_list, possible_words, num)
         colours = evaluate_guess_func(guess)
+        if "B" not in colours and "Y" not in colours:
+            return guess
         possible_words = filter_available_words(guess, colours, possible_words)
-    
-    if len(word_list) == 0:
-        return "NOT POSSIBLE"
-    
-    # if len(word_list) > 1:
-    #     return "Whats going on"
+        if len(possible_words) == 0:
+            break
 
-    return word_list
+    return "NOT POSSIBLE"
 
-# cases_game = make_evaluate_guess("cases", word_list)
-# print(smart_solver(word_list, cases_game, 5))
\ No newline at end of file
+if __name__ == "__main__":
+    print(f"original length: {len(word_list)}")
+    print(generate_smart_guess(word_list, list_test, 4))
+    # cases_game = make_evaluate_guess("cases", word_list)
+    # print(smart_solver(word_list, cases_game, 5))
\ No newline at end of file
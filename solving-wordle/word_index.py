@@ -0,0 +1,150 @@
+'''
+Bitmask constraint index over a Wordle dictionary.
+
+Every word is stored as one letter bit (1 << letter) per position and a
+count per letter, in NumPy arrays stored position- and letter-major so
+that every constraint reads one contiguous row. The feedback to a guess
+compiles into a few constraints with the rules of
+text.filter_available_words:
+
+    green at i      the letter at i is the guess letter
+    yellow at i     the letter at i is not the guess letter, and the word has
+                    at least as many copies of it as the guess has non-black
+    black at i      the letter at i is not the guess letter, and the word has
+                    at most as many copies of it as the guess has non-black
+
+which are evaluated as boolean masks over the whole dictionary, or over an
+index array of candidates, returning index arrays rather than word lists:
+
+    index = WordIndex(word_list)
+    candidates = index.filter("crane", "BYBBG")
+    candidates = index.filter("sloth", "BBBYB", candidates)
+'''
+import numpy as np
+
+import feedback
+
+ALL_LETTERS = (1 << 26) - 1
+
+
+class WordIndex:
+    '''
+    Per-position letter bitsets and per-letter counts of a word list.
+
+    Parameters
+    ----------
+    words:
+        A list of strings of words of the same length.
+    letters, counts:
+        The letter matrix and letter counts of the words, as stored by
+        dictionary.Dictionary, computed from the words by default.
+    '''
+
+    def __init__(self, words, letters=None, counts=None):
+        self.word_list = list(words)
+        self.positions = {word: i for i, word in enumerate(self.word_list)}
+        if letters is None:
+            letters = feedback.letter_matrix(self.word_list)
+        n, length = letters.shape
+        self.length = length
+        self.letters = letters
+        # bits[i, w] is 1 << (letter i of word w), counts[l, w] the copies
+        # of letter l in word w
+        self.bits = np.ascontiguousarray(
+            np.left_shift(np.uint32(1), letters.T.astype(np.uint32)))
+        if counts is None:
+            cells = letters.T.astype(np.int64) * n + np.arange(n)
+            counts = np.bincount(cells.ravel(), minlength=26 * n) \
+                .reshape(26, n).astype(np.uint8)
+        self.counts = counts
+
+    def __len__(self):
+        return len(self.word_list)
+
+    def words(self, indices):
+        '''
+        Returns the list of words at an index array.
+        '''
+        return [self.word_list[i] for i in indices]
+
+    def compile(self, guess_word, colours):
+        '''
+        Compiles the feedback to a guess into constraints.
+
+        Returns
+        -------
+            (allowed, counts): allowed is a list with the bitset of letters
+            allowed at each position, counts maps a letter to its (minimum,
+            maximum) number of copies, None for no maximum.
+        '''
+        guess_word = guess_word.lower()
+        non_black = {}
+        for letter, colour in zip(guess_word, colours):
+            non_black[letter] = non_black.get(letter, 0) + (colour != "B")
+
+        allowed = [ALL_LETTERS] * len(guess_word)
+        counts = {}
+        for i, (letter, colour) in enumerate(zip(guess_word, colours)):
+            bit = 1 << (ord(letter) - ord('a'))
+            low, high = counts.get(letter, (0, None))
+            if colour == "G":
+                allowed[i] = bit
+            else:
+                allowed[i] &= ~bit
+                if colour == "Y":
+                    low = max(low, non_black[letter], 1)
+                else:
+                    high = non_black[letter]
+            counts[letter] = (low, high)
+        return allowed, counts
+
+    def mask(self, guess_word, colours, candidates=None):
+        '''
+        Returns the boolean mask of the words (or of the candidates, an
+        index array) consistent with the feedback.
+        '''
+        allowed, counts = self.compile(guess_word, colours)
+        if candidates is None:
+            row = lambda array, i: array[i]
+            keep = np.ones(len(self), dtype=bool)
+        else:
+            # only gather the rows a constraint reads
+            row = lambda array, i: array[i][candidates]
+            keep = np.ones(len(candidates), dtype=bool)
+        for i, allowed_bits in enumerate(allowed):
+            if allowed_bits != ALL_LETTERS:
+                keep &= (row(self.bits, i) & np.uint32(allowed_bits)) != 0
+        for letter, (low, high) in counts.items():
+            column = row(self.counts, ord(letter) - ord('a'))
+            if low:
+                keep &= column >= low
+            if high is not None:
+                keep &= column <= high
+        return keep
+
+    def filter(self, guess_word, colours, candidates=None):
+        '''
+        Filters the words after making a guess.
+
+        Parameters
+        ----------
+        guess_word:
+            A string of the guess word.
+        colours:
+            A string representation of the colours of the result of the guess word.
+        candidates:
+            An index array of the possible words before this guess, the
+            whole word list by default.
+
+        Returns
+        -------
+            An index array of the possible words after making this guess.
+        '''
+        if "B" not in colours and "Y" not in colours:
+            # Guess is the correct word
+            index = self.positions.get(guess_word.lower())
+            return np.array([] if index is None else [index], dtype=np.int64)
+        keep = self.mask(guess_word, colours, candidates)
+        if candidates is None:
+            return np.flatnonzero(keep)
+        return np.asarray(candidates)[keep]